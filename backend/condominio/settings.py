@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -37,27 +38,49 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'corsheaders',
+    'django_filters',
     'rest_framework',
     'rest_framework_simplejwt',  
     'modulos.usuarios',
     'modulos.bitacora',
     'modulos.residentes',
-    'modulos.propiedades'
+    'modulos.propiedades',
+    'modulos.invitados',
+    'modulos.trabajadores',
+    'modulos.metricas',
+    'modulos.rendimiento',
 ]
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'modulos.usuarios.autenticacion.JWTAuthenticationCacheada',
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated', # <-- Asegura que solo usuarios autenticados accedan
         # O 'rest_framework.permissions.IsAuthenticatedOrReadOnly' si quieres permitir GET sin auth
-    ]
+    ],
+    # Misma salida que JSONRenderer, codificada con orjson (ver modulos/comun/renderizadores.py)
+    'DEFAULT_RENDERER_CLASSES': [
+        'modulos.comun.renderizadores.JSONRapidoRenderer',
+        # Accept: application/msgpack o ?format=msgpack
+        'modulos.comun.renderizadores.MessagePackRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'rest_framework.parsers.JSONParser',
+        'modulos.comun.renderizadores.MessagePackParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
 MIDDLEWARE = [
+    'modulos.metricas.middleware.MetricasMiddleware',
+    # Antes que el resto: comprime la respuesta ya terminada (ver modulos/comun/compresion.py)
+    'modulos.comun.compresion.CompresionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -100,9 +123,36 @@ DATABASES = {
         'PASSWORD': '1234',
         'HOST': 'localhost',
         'PORT': '5432',
+        # Conexiones persistentes por hilo, verificadas antes de reutilizarse.
+        # psycopg2 no tiene pool propio: bajo ASGI usar DB_CONN_MAX_AGE=0 y pgbouncer.
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+# Réplica de lectura opcional (ver modulos/comun/replicas.py). Exige una caché
+# compartida (CACHE_URL, check comun.E001). Para probar en local basta otra base:
+# DB_REPLICA_NAME=condominio_replica CACHE_URL=redis://localhost:6379/0 python manage.py runserver
+if os.environ.get('DB_REPLICA_HOST') or os.environ.get('DB_REPLICA_NAME'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': os.environ.get('DB_REPLICA_NAME', DATABASES['default']['NAME']),
+        'HOST': os.environ.get('DB_REPLICA_HOST', DATABASES['default']['HOST']),
+        'PORT': os.environ.get('DB_REPLICA_PORT', DATABASES['default']['PORT']),
+        'USER': os.environ.get('DB_REPLICA_USER', DATABASES['default']['USER']),
+        'PASSWORD': os.environ.get('DB_REPLICA_PASSWORD', DATABASES['default']['PASSWORD']),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['modulos.comun.replicas.RouterReplicas']
+
+# Segundos que un usuario lee de la primaria después de escribir (la marca
+# vive en CACHES).
+BASES_REPLICA = {
+    'ALIAS': 'replica',
+    'FIJACION': 5,
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -154,4 +204,108 @@ CORS_ALLOW_CREDENTIALS = True
 
 """ CORS_ALLOWED_ORIGINS = [
     "http://localhost:5173",
-] """
\ No newline at end of file
+] """
+
+# Mantiene Propiedad.numero_residentes/habitada desde las señales de Residente.
+# Si se desactiva, la API calcula el conteo con una anotación por consulta.
+PROPIEDADES_OCUPACION_DENORMALIZADA = True
+
+# Escritura de la bitácora en lotes (ver modulos/bitacora/escritor.py).
+# 'MODO': 'sincrono' inserta cada entrada en el momento.
+BITACORA_ESCRITOR = {
+    'MODO': 'lotes',
+    'TAMANO_LOTE': 200,
+    'INTERVALO': 1.0,
+    'MAX_COLA': 50000,
+}
+
+# Histogramas por acción de ViewSet expuestos en /api/metricas/ (formato Prometheus).
+# Con False el middleware no se carga. Se leen con 'Authorization: Bearer <METRICAS_TOKEN>'
+# o con una sesión de staff; METRICAS_PUBLICAS = True las deja abiertas a cualquiera.
+METRICAS_HABILITADAS = True
+METRICAS_TOKEN = os.environ.get('METRICAS_TOKEN')
+METRICAS_PUBLICAS = False
+
+# list/retrieve de propiedades, residentes, vehículos, bitácora y usuarios como
+# vistas async (ver modulos/comun/asincrono.py). Activar al servir con ASGI
+# (uvicorn condominio.asgi:application); bajo WSGI dejar en False.
+API_LECTURAS_ASINCRONAS = False
+
+# En la caché viven las versiones de catálogos, placas y pases y la fijación a
+# la primaria tras escribir: con más de un worker tiene que ser compartida o
+# cada proceso ve solo sus propios cambios (y sirve 304 viejos hasta
+# CATALOGOS_CACHE_TIMEOUT). CACHE_URL elige el backend:
+#   redis://host:6379/0                  Redis (paquete redis)
+#   memcached://host:11211[,host2:11211] Memcached (paquete pymemcache)
+# Sin CACHE_URL se usa LocMemCache, por proceso: solo para runserver y tests.
+CACHE_URL = os.environ.get('CACHE_URL', '')
+if CACHE_URL.startswith(('redis://', 'rediss://', 'unix://')):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_URL,
+        }
+    }
+elif CACHE_URL.startswith('memcached://'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+            'LOCATION': CACHE_URL.removeprefix('memcached://').split(','),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'condominio',
+        }
+    }
+
+# Segundos que viven las respuestas cacheadas de tipos y marcas de vehículo
+# (ver modulos/comun/cache.py); guardar o borrar una fila las invalida antes.
+CATALOGOS_CACHE_TIMEOUT = 3600
+
+# Usuario y permisos del token JWT cacheados por proceso (ver modulos/usuarios/autenticacion.py).
+USUARIOS_CACHE_AUTENTICACION = {
+    'TTL': 60,
+    'MAXIMO': 2048,
+}
+
+# Archivo de la bitácora (ver modulos/bitacora/archivo.py y el comando
+# archivar_bitacora): las entradas de más de RETENCION_DIAS pasan a
+# DIRECTORIO/bitacora-AAAA-MM.ndjson.gz y la API las sigue leyendo con ?mes=AAAA-MM.
+BITACORA_ARCHIVO = {
+    'DIRECTORIO': BASE_DIR / 'archivo' / 'bitacora',
+    'RETENCION_DIAS': 365,
+    'TAMANO_LOTE': 5000,
+}
+
+# Segundos que se reutilizan las cifras de /api/propiedades/estadisticas/
+# (ver modulos/propiedades/estadisticas.py).
+ESTADISTICAS_CACHE_TIMEOUT = 30
+
+# Segundos máximos que un proceso usa su mapa de placas sin recargarlo, aunque
+# su versión no cambie (ver modulos/residentes/placas.py).
+PLACAS_RECARGA_SEGUNDOS = 30
+
+# Duración máxima de un pase de invitado (ver modulos/invitados/tokens.py).
+INVITADOS_DURACION_MAXIMA_HORAS = 72
+
+# Segundos máximos que un proceso usa su conjunto de pases habilitados sin
+# recargarlo, aunque su versión no cambie (ver modulos/invitados/tokens.py).
+INVITADOS_RECARGA_SEGUNDOS = 5
+
+# Un turno (entrada -> salida) cuenta para el día de la entrada si la salida
+# llega antes de estas horas (ver modulos/trabajadores/asistencia.py).
+TRABAJADORES_TURNO_MAXIMO_HORAS = 16
+
+# Listados de bitácora, residentes y vehículos con values() y conversores
+# precompilados en lugar de ModelSerializer (ver modulos/comun/lectura.py).
+API_LECTURA_RAPIDA = True
+
+# Compresión de respuestas con brotli o gzip según Accept-Encoding (ver
+# modulos/comun/compresion.py); las de menos de MINIMO_BYTES van sin comprimir.
+API_COMPRESION = {
+    'MINIMO_BYTES': 1024,
+    'CALIDAD_BROTLI': 4,
+}
@@ -28,4 +28,7 @@ urlpatterns = [
     path('api/usuarios/', include('modulos.usuarios.api.urls')),
     path('api/residentes/', include('modulos.residentes.api.urls')),
     path('api/bitacora/', include('modulos.bitacora.api.urls')),
+    path('api/invitados/', include('modulos.invitados.api.urls')),
+    path('api/trabajadores/', include('modulos.trabajadores.api.urls')),
+    path('api/metricas/', include('modulos.metricas.urls')),
 ]
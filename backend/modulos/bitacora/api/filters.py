@@ -0,0 +1,54 @@
+import ipaddress
+from datetime import datetime, time, timedelta
+
+import django_filters
+from django.contrib.postgres.search import SearchQuery, SearchVector
+from rest_framework.exceptions import ValidationError
+from modulos.bitacora.models import Bitacora
+
+# Debe coincidir con la expresión del índice bitacora_accion_fts_idx
+VECTOR_ACCION = SearchVector('accion_realizada', config='spanish')
+
+
+class BitacoraFilter(django_filters.FilterSet):
+    """
+    Filtros de auditoría respaldados por índices.
+
+    usuario acepta el id o el username; las fechas son rangos semiabiertos
+    sobre hora_fecha (nunca __date, que impediría usar el índice).
+    """
+    usuario = django_filters.CharFilter(method='filtrar_usuario')
+    fecha_inicio = django_filters.DateFilter(method='filtrar_fecha_inicio')
+    fecha_fin = django_filters.DateFilter(method='filtrar_fecha_fin')
+    tipo_accion = django_filters.ChoiceFilter(choices=Bitacora.tipoAccion)
+    modelo = django_filters.CharFilter()
+    ip = django_filters.CharFilter(method='filtrar_ip')
+    accion_realizada = django_filters.CharFilter(method='filtrar_texto')
+    search = django_filters.CharFilter(method='filtrar_texto')
+
+    class Meta:
+        model = Bitacora
+        fields = ['usuario', 'fecha_inicio', 'fecha_fin', 'tipo_accion', 'modelo', 'ip']
+
+    def filtrar_usuario(self, queryset, name, value):
+        if value.isdigit():
+            return queryset.filter(usuario_id=int(value))
+        return queryset.filter(usuario__username=value)
+
+    def filtrar_fecha_inicio(self, queryset, name, value):
+        return queryset.filter(hora_fecha__gte=datetime.combine(value, time.min))
+
+    def filtrar_fecha_fin(self, queryset, name, value):
+        return queryset.filter(hora_fecha__lt=datetime.combine(value + timedelta(days=1), time.min))
+
+    def filtrar_ip(self, queryset, name, value):
+        try:
+            if '/' in value:
+                return queryset.filter(ip_origen__en_red=str(ipaddress.ip_network(value, strict=False)))
+            return queryset.filter(ip_origen=str(ipaddress.ip_address(value)))
+        except ValueError:
+            raise ValidationError({'ip': 'Debe ser una IP o una red CIDR (ej. 10.0.0.0/8).'})
+
+    def filtrar_texto(self, queryset, name, value):
+        consulta = SearchQuery(value, config='spanish', search_type='websearch')
+        return queryset.alias(vector_accion=VECTOR_ACCION).filter(vector_accion=consulta)
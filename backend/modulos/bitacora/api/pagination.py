@@ -0,0 +1,154 @@
+import base64
+from datetime import datetime
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from modulos.comun.lectura import ConteoRapidoMixin
+
+
+class StandardResultsSetPagination(ConteoRapidoMixin, PageNumberPagination):
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginación por cursor sobre (hora_fecha, id), del más reciente al más antiguo.
+
+    No hace COUNT ni OFFSET: cada página es un rango del índice compuesto,
+    así que cuesta lo mismo la primera que la página un millón.
+    """
+    cursor_query_param = 'cursor'
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    invalid_cursor_message = 'Cursor inválido'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        cursor = self.decode_cursor(request)
+
+        # El orden lo fija el cursor; se ignora cualquier ?ordering=
+        queryset = queryset.order_by()
+        if cursor is None:
+            self.reverse = False
+            filas = list(queryset.order_by('-hora_fecha', '-id')[:self.page_size + 1])
+        else:
+            hora_fecha, pk, self.reverse = cursor
+            if self.reverse:
+                # Página anterior: lo inmediatamente más nuevo que el cursor
+                queryset = queryset.filter(hora_fecha__gte=hora_fecha).filter(
+                    Q(hora_fecha__gt=hora_fecha) | Q(id__gt=pk)
+                ).order_by('hora_fecha', 'id')
+            else:
+                queryset = queryset.filter(hora_fecha__lte=hora_fecha).filter(
+                    Q(hora_fecha__lt=hora_fecha) | Q(id__lt=pk)
+                ).order_by('-hora_fecha', '-id')
+            filas = list(queryset[:self.page_size + 1])
+
+        hay_mas = len(filas) > self.page_size
+        filas = filas[:self.page_size]
+        if self.reverse:
+            filas.reverse()
+            self.has_next, self.has_previous = True, hay_mas
+        else:
+            self.has_next, self.has_previous = hay_mas, cursor is not None
+        self.page = filas
+        return filas
+
+    def get_page_size(self, request):
+        try:
+            tamano = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(tamano, self.max_page_size))
+
+    def decode_cursor(self, request):
+        codificado = request.query_params.get(self.cursor_query_param)
+        if not codificado:
+            return None
+        try:
+            texto = base64.urlsafe_b64decode(codificado.encode('ascii')).decode('ascii')
+            direccion, hora_fecha, pk = texto.split('|')
+            return datetime.fromisoformat(hora_fecha), int(pk), direccion == 'p'
+        except (TypeError, ValueError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, instancia, reverse):
+        if isinstance(instancia, dict):
+            # Filas de values() (ver comun/lectura.py)
+            hora_fecha, pk = instancia['hora_fecha'], instancia['id']
+        else:
+            hora_fecha, pk = instancia.hora_fecha, instancia.pk
+        texto = '|'.join(['p' if reverse else 'n', hora_fecha.isoformat(), str(pk)])
+        cursor = base64.urlsafe_b64encode(texto.encode('ascii')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+
+class BitacoraPagination(BasePagination):
+    """
+    Números de página por defecto (lo que usa el frontend) y keyset con
+    ?paginacion=cursor o cuando la petición ya trae un ?cursor=.
+    """
+    def __init__(self):
+        self.paginas = StandardResultsSetPagination()
+        self.keyset = KeysetPagination()
+        self.activa = self.paginas
+
+    def paginate_queryset(self, queryset, request, view=None):
+        usar_cursor = (
+            request.query_params.get('paginacion') == 'cursor'
+            or self.keyset.cursor_query_param in request.query_params
+        )
+        self.activa = self.keyset if usar_cursor else self.paginas
+        return self.activa.paginate_queryset(queryset, request, view)
+
+    @property
+    def display_page_controls(self):
+        return getattr(self.activa, 'display_page_controls', False)
+
+    def get_paginated_response(self, data):
+        return self.activa.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        return self.paginas.get_paginated_response_schema(schema)
+
+    def to_html(self):
+        return self.activa.to_html()
@@ -1,10 +1,11 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from modulos.bitacora.api.views import BitacoraViewSet
+from modulos.bitacora.api.views import ActividadView, BitacoraViewSet
 
 router = DefaultRouter()
 router.register(r'bitacora', BitacoraViewSet, basename='bitacora')
 
 urlpatterns = [
+    path('actividad/', ActividadView.as_view(), name='bitacora-actividad'),
     path('', include(router.urls)),
 ]
\ No newline at end of file
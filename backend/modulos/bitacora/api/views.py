@@ -1,19 +1,118 @@
+from datetime import date, datetime, time, timedelta
+
+from asgiref.sync import sync_to_async
+from django.db.models import Sum
+from django.db.models.functions import Trunc
 from rest_framework import viewsets, filters
-from modulos.bitacora.models import Bitacora
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from django_filters.rest_framework import DjangoFilterBackend
+from modulos.bitacora.archivo import FilasArchivadas, meses_consultados
+from modulos.bitacora.models import Bitacora, ResumenBitacora
 from modulos.bitacora.api.serializer import (
     BitacoraSerializer
 )
-from rest_framework.pagination import PageNumberPagination
-
-class StandardResultsSetPagination(PageNumberPagination):
-    page_size = 10
-    page_size_query_param = 'page_size'
-    max_page_size = 100
+from modulos.bitacora.api.filters import BitacoraFilter
+from modulos.bitacora.api.pagination import BitacoraPagination
+from modulos.comun.asincrono import LecturaAsincronaMixin
+from modulos.comun.campos import CamposDinamicosMixin
+from modulos.comun.exportacion import ExportarMixin
+from modulos.comun.lectura import LecturaRapidaMixin
 
-class BitacoraViewSet(viewsets.ModelViewSet):
-    queryset = Bitacora.objects.all().order_by('-hora_fecha')
+class BitacoraViewSet(LecturaRapidaMixin, LecturaAsincronaMixin, ExportarMixin, CamposDinamicosMixin, viewsets.ModelViewSet):
+    # -id desempata entradas con la misma hora; ambos van en el índice compuesto
+    queryset = Bitacora.objects.all().order_by('-hora_fecha', '-id')
     serializer_class = BitacoraSerializer
-    pagination_class = StandardResultsSetPagination
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
-    search_fields = ['usuario', 'hora_fecha', 'accion_realizada', 'ip_origen']
+    pagination_class = BitacoraPagination
+    # Filtros estructurados (ver BitacoraFilter) en lugar de icontains sobre todas las columnas
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    filterset_class = BitacoraFilter
     ordering_fields = ['hora_fecha', 'accion_realizada', 'usuario']
+    # La paginación por cursor lee hora_fecha aunque ?fields= no la pida
+    campos_requeridos = ['hora_fecha']
+
+    def list(self, request, *args, **kwargs):
+        meses = meses_consultados(request.query_params)
+        if meses is not None:
+            return self.listar_archivo(request, meses)
+        return super().list(request, *args, **kwargs)
+
+    async def alist(self, request, *args, **kwargs):
+        meses = meses_consultados(request.query_params)
+        if meses is not None:
+            return await sync_to_async(self.listar_archivo)(request, meses)
+        return await super().alist(request, *args, **kwargs)
+
+    def listar_archivo(self, request, meses):
+        """Meses ya archivados (ver bitacora/archivo.py): se leen del archivo, con paginación por números."""
+        # Valida los filtros igual que el listado normal (400 si alguno es inválido)
+        self.filter_queryset(self.get_queryset())
+        filas = FilasArchivadas(meses, request.query_params)
+        paginador = self.paginator.paginas
+        pagina = paginador.paginate_queryset(filas, request, view=self)
+        response = paginador.get_paginated_response(self.get_serializer(pagina, many=True).data)
+        response['X-Bitacora-Origen'] = 'archivo'
+        return response
+
+
+class ActividadView(APIView):
+    """
+    Actividad de la bitácora para gráficos, desde el resumen por hora
+    (ResumenBitacora), nunca desde Bitacora.
+
+    ?desde=AAAA-MM-DD&hasta=AAAA-MM-DD (incluido; por defecto los últimos 7 días)
+    ?agrupar=hora|dia|semana|mes (por defecto dia)
+    ?por=usuario,modelo,tipo_accion  series separadas por esas columnas
+    ?usuario=&modelo=&tipo_accion=   filtros
+    """
+    AGRUPACIONES = {'hora': 'hour', 'dia': 'day', 'semana': 'week', 'mes': 'month'}
+    SERIES = ('usuario', 'modelo', 'tipo_accion')
+    MAX_FILAS = 5000
+
+    def get(self, request):
+        parametros = request.query_params
+        hasta = self.fecha(parametros, 'hasta') or date.today()
+        desde = self.fecha(parametros, 'desde') or hasta - timedelta(days=6)
+        agrupar = parametros.get('agrupar', 'dia')
+        if agrupar not in self.AGRUPACIONES:
+            raise ValidationError({'agrupar': f"Use uno de: {', '.join(self.AGRUPACIONES)}."})
+        por = [columna for columna in parametros.get('por', '').split(',') if columna]
+        desconocidas = set(por) - set(self.SERIES)
+        if desconocidas:
+            raise ValidationError({'por': f"Columnas desconocidas: {', '.join(sorted(desconocidas))}."})
+
+        resumen = ResumenBitacora.objects.filter(
+            hora__gte=datetime.combine(desde, time.min),
+            hora__lt=datetime.combine(hasta + timedelta(days=1), time.min),
+        )
+        if parametros.get('usuario'):
+            if not parametros['usuario'].isdigit():
+                raise ValidationError({'usuario': 'Debe ser un id.'})
+            resumen = resumen.filter(usuario_id=parametros['usuario'])
+        for columna in ('modelo', 'tipo_accion'):
+            if parametros.get(columna):
+                resumen = resumen.filter(**{columna: parametros[columna]})
+
+        columnas = ['usuario_id' if columna == 'usuario' else columna for columna in por]
+        filas = list(
+            resumen.annotate(periodo=Trunc('hora', self.AGRUPACIONES[agrupar]))
+            .values('periodo', *columnas)
+            .annotate(total=Sum('total'))
+            .order_by('periodo', *columnas)[:self.MAX_FILAS + 1]
+        )
+        return Response({
+            'desde': desde,
+            'hasta': hasta,
+            'agrupar': agrupar,
+            'truncado': len(filas) > self.MAX_FILAS,
+            'resultados': filas[:self.MAX_FILAS],
+        })
+
+    def fecha(self, parametros, nombre):
+        if not parametros.get(nombre):
+            return None
+        try:
+            return date.fromisoformat(parametros[nombre])
+        except ValueError:
+            raise ValidationError({nombre: 'Use el formato AAAA-MM-DD.'})
@@ -3,3 +3,5 @@ from django.apps import AppConfig
 class BitacoraConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'modulos.bitacora'
+    def ready(self):
+        import modulos.bitacora.lookups
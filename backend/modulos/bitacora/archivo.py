@@ -0,0 +1,293 @@
+"""
+Archivo de la bitácora por meses.
+
+Las filas con más de RETENCION_DIAS se pasan a archivos gzip NDJSON, uno
+por mes (bitacora-2025-03.ndjson.gz en DIRECTORIO), y se borran de la tabla.
+Se archivan solo meses completos: un mes se lee entero de la tabla o entero
+de su archivo.
+
+El mes se escribe en lotes (TAMANO_LOTE filas, en orden de hora_fecha) a un
+archivo parcial (.parcial) sin borrar nada, y recién completo se renombra al
+nombre final: hasta ese momento el mes no cuenta como archivado y se lee de
+la tabla, que todavía lo tiene entero. Después se borran de la tabla, en
+transacciones cortas, los id que quedaron en el archivo. Si el proceso se
+corta antes del renombre, el siguiente intento descarta el parcial y
+empieza de nuevo; si se corta durante el borrado, el siguiente solo
+termina de borrar.
+
+La lectura (FilasArchivadas) recorre el archivo filtrando en Python: sirve
+para consultar un mes viejo desde la API, no para hacerlo seguido.
+"""
+import gzip
+import ipaddress
+import json
+import os
+import time as reloj
+from datetime import date, datetime, time, timedelta
+from itertools import islice
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Bitacora
+
+CONFIGURACION_POR_DEFECTO = {
+    'DIRECTORIO': os.path.join(settings.BASE_DIR, 'archivo', 'bitacora'),
+    'RETENCION_DIAS': 365,
+    'TAMANO_LOTE': 5000,
+}
+COLUMNAS = ['id', 'hora_fecha', 'id_accion', 'accion_realizada', 'tipo_accion', 'modelo',
+            'ip_origen', 'usuario_id', 'cambios']
+
+
+def configuracion():
+    return {**CONFIGURACION_POR_DEFECTO, **getattr(settings, 'BITACORA_ARCHIVO', {})}
+
+
+def ruta_mes(mes):
+    return os.path.join(configuracion()['DIRECTORIO'], f'bitacora-{mes:%Y-%m}.ndjson.gz')
+
+
+def ruta_parcial(mes):
+    return ruta_mes(mes) + '.parcial'
+
+
+def esta_archivado(mes):
+    return os.path.exists(ruta_mes(mes))
+
+
+def inicio_mes(fecha):
+    return date(fecha.year, fecha.month, 1)
+
+
+def mes_siguiente(mes):
+    return date(mes.year + mes.month // 12, mes.month % 12 + 1, 1)
+
+
+def meses_entre(desde, hasta):
+    """Primer día de cada mes entre las dos fechas, ambas incluidas."""
+    mes = inicio_mes(desde)
+    while mes <= hasta:
+        yield mes
+        mes = mes_siguiente(mes)
+
+
+def meses_archivados():
+    directorio = configuracion()['DIRECTORIO']
+    if not os.path.isdir(directorio):
+        return []
+    meses = []
+    for nombre in os.listdir(directorio):
+        if nombre.startswith('bitacora-') and nombre.endswith('.ndjson.gz'):
+            anio, mes = nombre[len('bitacora-'):-len('.ndjson.gz')].split('-')
+            meses.append(date(int(anio), int(mes), 1))
+    return sorted(meses)
+
+
+# --- Archivado --------------------------------------------------------
+
+def fecha_corte(dias=None):
+    """Inicio del mes que contiene el límite de retención: lo anterior se archiva."""
+    dias = configuracion()['RETENCION_DIAS'] if dias is None else dias
+    return datetime.combine(inicio_mes(timezone.now() - timedelta(days=dias)), time.min)
+
+
+def archivar(dias=None, tamano_lote=None, pausa=0, informar=None):
+    """
+    Archiva y borra, mes por mes, las filas anteriores a fecha_corte(dias).
+    Devuelve {mes: filas archivadas}. No correr dos archivados a la vez.
+    """
+    tamano_lote = tamano_lote or configuracion()['TAMANO_LOTE']
+    corte = fecha_corte(dias)
+    primera = Bitacora.objects.filter(hora_fecha__lt=corte).order_by('hora_fecha').values_list('hora_fecha', flat=True).first()
+    if primera is None:
+        return {}
+    os.makedirs(configuracion()['DIRECTORIO'], exist_ok=True)
+
+    resumen = {}
+    for mes in meses_entre(primera.date(), corte.date() - timedelta(days=1)):
+        # Un mes ya archivado es un borrado que quedó a medias
+        if not esta_archivado(mes) and not _escribir_mes(mes, tamano_lote, pausa, informar):
+            continue
+        total = _borrar_mes(mes, tamano_lote, pausa)
+        if total:
+            resumen[mes] = total
+    return resumen
+
+
+def _lotes_del_mes(mes, tamano_lote):
+    """Filas del mes en orden de (hora_fecha, id), en consultas cortas de tamano_lote filas."""
+    filas = Bitacora.objects.filter(
+        hora_fecha__gte=datetime.combine(mes, time.min),
+        hora_fecha__lt=datetime.combine(mes_siguiente(mes), time.min),
+    ).order_by('hora_fecha', 'id')
+    pendientes = filas
+    while True:
+        lote = list(pendientes.values(*COLUMNAS)[:tamano_lote])
+        if not lote:
+            return
+        hora, id_fila = lote[-1]['hora_fecha'], lote[-1]['id']
+        pendientes = filas.filter(Q(hora_fecha__gt=hora) | Q(hora_fecha=hora, id__gt=id_fila))
+        yield lote
+
+
+def _escribir_mes(mes, tamano_lote, pausa, informar):
+    """Escribe el mes al archivo parcial y lo renombra al terminar. Devuelve cuántas filas escribió."""
+    parcial = ruta_parcial(mes)
+    total = 0
+    # 'wb': el parcial de un intento cortado se descarta, sus filas siguen en la tabla
+    with open(parcial, 'wb') as archivo:
+        for lote in _lotes_del_mes(mes, tamano_lote):
+            # Cada lote es un miembro gzip nuevo al final del archivo; gzip.open lee todos seguidos
+            archivo.write(gzip.compress(_ndjson(lote)))
+            total += len(lote)
+            if informar:
+                informar(mes, total)
+            if pausa:
+                reloj.sleep(pausa)
+        archivo.flush()
+        # Las filas se borran después del renombre: tienen que estar en disco antes
+        os.fsync(archivo.fileno())
+    if not total:
+        os.remove(parcial)
+        return 0
+    os.replace(parcial, ruta_mes(mes))
+    _sincronizar_directorio()
+    return total
+
+
+def _ndjson(filas):
+    codificador = DjangoJSONEncoder(ensure_ascii=False)
+    # DjangoJSONEncoder recorta a milisegundos; el cursor del listado necesita la hora exacta
+    return ''.join(
+        codificador.encode({**fila, 'hora_fecha': fila['hora_fecha'].isoformat()}) + '\n' for fila in filas
+    ).encode('utf-8')
+
+
+def _sincronizar_directorio():
+    # Sin esto el renombre puede perderse en un corte de luz aunque el archivo esté en disco
+    descriptor = os.open(configuracion()['DIRECTORIO'], os.O_RDONLY)
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
+
+
+def _borrar_mes(mes, tamano_lote, pausa):
+    """Borra de la tabla, en lotes, las filas que están en el archivo del mes."""
+    ids = [fila['id'] for fila in leer_mes(mes)]
+    total = 0
+    for inicio in range(0, len(ids), tamano_lote):
+        borradas, _ = Bitacora.objects.filter(id__in=ids[inicio:inicio + tamano_lote]).delete()
+        total += borradas
+        if pausa and borradas:
+            reloj.sleep(pausa)
+    return total
+
+
+# --- Lectura ----------------------------------------------------------
+
+def leer_mes(mes):
+    vistos = set()
+    with gzip.open(ruta_mes(mes), 'rt', encoding='utf-8') as archivo:
+        for linea in archivo:
+            fila = json.loads(linea)
+            if fila['id'] in vistos:
+                continue
+            vistos.add(fila['id'])
+            fila['hora_fecha'] = datetime.fromisoformat(fila['hora_fecha'])
+            yield fila
+
+
+def meses_consultados(parametros):
+    """
+    Meses archivados que pide la consulta: ?mes=AAAA-MM, o un rango
+    fecha_inicio/fecha_fin cuyos meses están todos archivados. None si la
+    consulta va a la tabla (también si el rango mezcla meses archivados y
+    meses en la tabla: solo se devuelve lo que está en la tabla).
+    """
+    try:
+        if parametros.get('mes'):
+            mes = datetime.strptime(parametros['mes'], '%Y-%m').date()
+            return [mes] if esta_archivado(mes) else None
+        if parametros.get('fecha_inicio') and parametros.get('fecha_fin'):
+            desde = date.fromisoformat(parametros['fecha_inicio'])
+            hasta = date.fromisoformat(parametros['fecha_fin'])
+        else:
+            return None
+    except ValueError:
+        return None
+    meses = list(meses_entre(desde, hasta))
+    if meses and all(esta_archivado(mes) for mes in meses):
+        return meses
+    return None
+
+
+def _filtro(parametros):
+    """
+    Versión en Python de BitacoraFilter para las filas archivadas. La
+    búsqueda de texto exige que aparezcan todas las palabras (sin raíces).
+    """
+    condiciones = []
+    if parametros.get('fecha_inicio'):
+        desde = datetime.combine(date.fromisoformat(parametros['fecha_inicio']), time.min)
+        condiciones.append(lambda fila: fila['hora_fecha'] >= desde)
+    if parametros.get('fecha_fin'):
+        hasta = datetime.combine(date.fromisoformat(parametros['fecha_fin']) + timedelta(days=1), time.min)
+        condiciones.append(lambda fila: fila['hora_fecha'] < hasta)
+    if parametros.get('usuario'):
+        valor = parametros['usuario']
+        if valor.isdigit():
+            id_usuario = int(valor)
+        else:
+            id_usuario = get_user_model().objects.filter(username=valor).values_list('id', flat=True).first()
+        condiciones.append(lambda fila: fila['usuario_id'] == id_usuario)
+    for campo in ('tipo_accion', 'modelo'):
+        if parametros.get(campo):
+            valor = parametros[campo]
+            condiciones.append(lambda fila, campo=campo, valor=valor: fila[campo] == valor)
+    if parametros.get('ip'):
+        red = ipaddress.ip_network(parametros['ip'], strict=False)
+        condiciones.append(lambda fila: fila['ip_origen'] is not None and ipaddress.ip_address(fila['ip_origen']) in red)
+    texto = parametros.get('search') or parametros.get('accion_realizada')
+    if texto:
+        palabras = texto.lower().split()
+        condiciones.append(lambda fila: all(p in fila['accion_realizada'].lower() for p in palabras))
+    return lambda fila: all(condicion(fila) for condicion in condiciones)
+
+
+class FilasArchivadas:
+    """
+    Secuencia perezosa de las filas archivadas que cumplen los filtros, de
+    la más reciente a la más antigua, como el listado. len() recorre los
+    archivos una vez y cada rebanada otra: el Paginator de Django (y por lo
+    tanto la paginación por números) funciona sin cargar el mes en memoria.
+    """
+    def __init__(self, meses, parametros):
+        self.meses = sorted(meses)
+        self.cumple = _filtro(parametros)
+        self._total = None
+
+    def _filas(self):
+        # Los archivos están en orden ascendente de (hora_fecha, id)
+        for mes in self.meses:
+            for fila in leer_mes(mes):
+                if self.cumple(fila):
+                    yield fila
+
+    def __len__(self):
+        if self._total is None:
+            self._total = sum(1 for _ in self._filas())
+        return self._total
+
+    def __getitem__(self, indice):
+        if not isinstance(indice, slice):
+            return self[indice:indice + 1][0]
+        inicio, fin, _ = indice.indices(len(self))
+        # Las posiciones del listado descendente se cuentan desde el final
+        desde, hasta = len(self) - fin, len(self) - inicio
+        filas = list(islice(self._filas(), desde, hasta))
+        return [Bitacora(**fila) for fila in reversed(filas)]
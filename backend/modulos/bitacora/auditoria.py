@@ -0,0 +1,171 @@
+"""
+Registro de modelos auditados.
+
+Solo se auditan los modelos registrados (en el ready() de cada app):
+
+    auditoria.registrar(Residente, excluir=['fechaCreacion', 'fechaModificacion'])
+    auditoria.registrar(User, campos=['username', 'email', 'password'], ocultar=['password'])
+
+Al cargar una instancia se guarda una copia de los campos seguidos. Al
+guardar se comparan y solo se registra lo que cambió, con el antes y el
+después en Bitacora.cambios; un save() sin cambios no deja entrada.
+
+    with auditoria.suspendida():       # cargas masivas, scripts de mantenimiento
+        ...
+    with auditoria.agrupada():         # una sola escritura al final del bloque
+        ...
+    with auditoria.agrupada(resumir=True):  # una entrada por (modelo, acción)
+        ...
+
+Las migraciones usan modelos históricos, que no están registrados, así
+que RunPython y post_migrate no generan bitácora.
+"""
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db.models.signals import post_delete, post_init, post_save
+
+from .escritor import escritor
+
+OCULTO = '***'
+ACCIONES = {'C': 'Creó', 'M': 'Modificó', 'E': 'Eliminó'}
+
+_suspendida = ContextVar('auditoria_suspendida', default=False)
+_grupo = ContextVar('auditoria_grupo', default=None)
+
+
+class RegistroAuditoria:
+    def __init__(self):
+        self._modelos = {}
+
+    def registrar(self, modelo, campos=None, excluir=(), ocultar=()):
+        """campos: nombres a seguir (por defecto todos los concretos menos la pk y los calculados por la base)."""
+        seguidos = {
+            campo.attname: campo.name
+            for campo in modelo._meta.concrete_fields
+            if not campo.primary_key
+            and not campo.generated
+            and (campos is None or campo.name in campos)
+            and campo.name not in excluir
+        }
+        self._modelos[modelo] = {'campos': seguidos, 'ocultar': set(ocultar)}
+        uid = modelo._meta.label_lower
+        post_init.connect(self._al_iniciar, sender=modelo, dispatch_uid=f'auditoria_init_{uid}')
+        post_save.connect(self._al_guardar, sender=modelo, dispatch_uid=f'auditoria_save_{uid}')
+        post_delete.connect(self._al_eliminar, sender=modelo, dispatch_uid=f'auditoria_delete_{uid}')
+
+    def esta_registrado(self, modelo):
+        return modelo in self._modelos
+
+    def cambios(self, instancia, solo=None):
+        """{campo: [antes, después]} de los campos seguidos que cambiaron desde la carga."""
+        config = self._modelos[type(instancia)]
+        original = getattr(instancia, '_auditoria_original', {})
+        actual = instancia.__dict__
+        cambios = {}
+        for attname, nombre in config['campos'].items():
+            if solo is not None and nombre not in solo and attname not in solo:
+                continue
+            if attname not in actual:
+                # Campo diferido que no se tocó
+                continue
+            antes = original.get(attname)
+            if attname in original and antes == actual[attname]:
+                continue
+            if nombre in config['ocultar']:
+                cambios[nombre] = [OCULTO, OCULTO]
+            else:
+                cambios[nombre] = [antes, actual[attname]]
+        return cambios
+
+    # --- Contextos ----------------------------------------------------
+
+    @contextmanager
+    def suspendida(self):
+        token = _suspendida.set(True)
+        try:
+            yield
+        finally:
+            _suspendida.reset(token)
+
+    @contextmanager
+    def agrupada(self, resumir=False):
+        """Junta las entradas del bloque y las registra al salir con una sola escritura."""
+        entradas = []
+        token = _grupo.set(entradas)
+        try:
+            yield entradas
+        finally:
+            _grupo.reset(token)
+        if resumir:
+            entradas = _resumir(entradas)
+        escritor.registrar_varias(entradas)
+
+    # --- Receptores ---------------------------------------------------
+
+    def _al_iniciar(self, sender, instance, **kwargs):
+        # Se lee de __dict__ para no disparar la carga de campos diferidos
+        datos = instance.__dict__
+        instance._auditoria_original = {a: datos[a] for a in self._modelos[sender]['campos'] if a in datos}
+
+    def _al_guardar(self, sender, instance, created, raw=False, update_fields=None, **kwargs):
+        if raw or _suspendida.get():
+            instance._auditoria_original = self._copia(instance)
+            return
+        if created:
+            self.emitir(instance, 'C')
+        else:
+            cambios = self.cambios(instance, solo=update_fields)
+            if cambios:
+                self.emitir(instance, 'M', cambios)
+        instance._auditoria_original = self._copia(instance)
+
+    def _al_eliminar(self, sender, instance, **kwargs):
+        if not _suspendida.get():
+            self.emitir(instance, 'E')
+
+    def _copia(self, instancia):
+        datos = instancia.__dict__
+        return {a: datos[a] for a in self._modelos[type(instancia)]['campos'] if a in datos}
+
+    def emitir(self, instancia, tipo, cambios=None):
+        """Registra una entrada para la instancia; lo usan también las operaciones en lote (sin señales)."""
+        from modulos.usuarios.middleware import get_current_ip, get_current_user
+
+        modelo = type(instancia)
+        texto = f"{ACCIONES[tipo]} {modelo.__name__} con ID {instancia.pk}"
+        if cambios:
+            texto += ': ' + ', '.join(cambios)
+        entrada = {
+            'accion_realizada': texto,
+            'tipo_accion': tipo,
+            'modelo': modelo.__name__,
+            'id_accion': instancia.pk,
+            'ip_origen': get_current_ip(),
+            'usuario': get_current_user(),
+            'cambios': cambios,
+        }
+        grupo = _grupo.get()
+        if grupo is not None:
+            grupo.append(entrada)
+        else:
+            escritor.registrar(**entrada)
+
+
+def _resumir(entradas):
+    conteo = Counter((e['modelo'], e['tipo_accion']) for e in entradas)
+    referencia = {(e['modelo'], e['tipo_accion']): e for e in entradas}
+    return [
+        {
+            'accion_realizada': f"{ACCIONES.get(tipo, 'Registró')} {total} {modelo}",
+            'tipo_accion': tipo,
+            'modelo': modelo,
+            'ip_origen': referencia[(modelo, tipo)]['ip_origen'],
+            'usuario': referencia[(modelo, tipo)]['usuario'],
+        }
+        for (modelo, tipo), total in conteo.items()
+    ]
+
+
+auditoria = RegistroAuditoria()
@@ -0,0 +1,239 @@
+"""
+Escritor de bitácora en lotes.
+
+Las entradas se encolan cuando la transacción que las generó se confirma
+(si se revierte, se descartan) y se insertan con bulk_create al llenarse
+un lote o al vencer la ventana de tiempo. Un hilo en segundo plano hace
+las escrituras y vacía la cola al terminar el proceso. Con MODO='sincrono'
+cada entrada se inserta en el momento, como antes. Cada lote suma también
+sus entradas al resumen por hora (ver resumen.py).
+
+Si un lote falla por una fila inválida (p. ej. un usuario que se borró
+mientras su entrada esperaba en la cola), se parte en mitades hasta aislarla;
+esa fila se registra en el log y se descarta, y el resto se escribe. Si falla
+por otra causa (la base no responde) se reintenta entero en la próxima vuelta,
+hasta REINTENTOS veces seguidas; después se descarta.
+"""
+import atexit
+import ipaddress
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.db import DataError, IntegrityError, close_old_connections, transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+CONFIGURACION_POR_DEFECTO = {
+    'MODO': 'lotes',        # 'lotes' o 'sincrono'
+    'TAMANO_LOTE': 200,     # entradas por INSERT
+    'INTERVALO': 1.0,       # segundos máximos que una entrada espera en la cola
+    'MAX_COLA': 50000,      # por encima se descartan entradas (y se cuentan)
+    'REINTENTOS': 5,        # fallos seguidos de un lote antes de descartarlo
+}
+
+
+def configuracion():
+    return {**CONFIGURACION_POR_DEFECTO, **getattr(settings, 'BITACORA_ESCRITOR', {})}
+
+
+class EscritorBitacora:
+    def __init__(self):
+        self._cola = deque()
+        self._lock = threading.Lock()
+        self._despertar = threading.Event()
+        self._hilo = None
+        self._pid = None
+        self._detenido = False
+        self._fallos = 0
+        self._contadores = {
+            'encoladas': 0,
+            'escritas': 0,
+            'descartadas': 0,
+            'errores': 0,
+            'lotes': 0,
+            'latencia_ultima_ms': 0.0,
+            'latencia_max_ms': 0.0,
+            'latencia_total_ms': 0.0,
+        }
+
+    # --- API pública ---------------------------------------------------
+
+    def registrar(self, accion_realizada, id_accion=None, ip_origen=None, usuario=None,
+                  tipo_accion='O', modelo='', cambios=None):
+        """Agenda una entrada de bitácora para cuando se confirme la transacción actual."""
+        entrada = _entrada(accion_realizada, id_accion, ip_origen, usuario, tipo_accion, modelo, cambios)
+        transaction.on_commit(lambda: self.encolar(entrada))
+
+    def registrar_varias(self, entradas):
+        """
+        Como registrar(), para las entradas de una operación en lote (lista de
+        dicts con los mismos argumentos): se encolan juntas al confirmar y en
+        modo síncrono se insertan con un solo INSERT.
+        """
+        entradas = [_entrada(**datos) for datos in entradas]
+        if entradas:
+            transaction.on_commit(lambda: self.encolar_varias(entradas))
+
+    def encolar(self, entrada):
+        self.encolar_varias([entrada])
+
+    def encolar_varias(self, entradas):
+        conf = configuracion()
+        if conf['MODO'] == 'sincrono':
+            self._escribir(entradas)
+            return
+        with self._lock:
+            espacio = max(conf['MAX_COLA'] - len(self._cola), 0)
+            if len(entradas) > espacio:
+                self._contadores['descartadas'] += len(entradas) - espacio
+                logger.warning("Cola de bitácora llena, se descartan %d entradas", len(entradas) - espacio)
+                entradas = entradas[:espacio]
+            if not entradas:
+                return
+            self._cola.extend(entradas)
+            self._contadores['encoladas'] += len(entradas)
+            lleno = len(self._cola) >= conf['TAMANO_LOTE']
+        self._asegurar_hilo()
+        if lleno:
+            self._despertar.set()
+
+    def vaciar(self):
+        """Escribe todo lo pendiente en el hilo actual. Devuelve cuántas entradas escribió."""
+        tamano = configuracion()['TAMANO_LOTE']
+        total = 0
+        while True:
+            with self._lock:
+                lote = [self._cola.popleft() for _ in range(min(tamano, len(self._cola)))]
+            if not lote or not self._escribir(lote):
+                return total
+            total += len(lote)
+
+    def detener(self):
+        self._detenido = True
+        self._despertar.set()
+        if self._hilo is not None and self._hilo.is_alive():
+            self._hilo.join(timeout=configuracion()['INTERVALO'] * 5)
+        self.vaciar()
+
+    def estadisticas(self):
+        with self._lock:
+            datos = dict(self._contadores)
+            datos['en_cola'] = len(self._cola)
+        return datos
+
+    # --- Internos -----------------------------------------------------
+
+    def _escribir(self, lote):
+        inicio = time.perf_counter()
+        # Pila de tramos por escribir, el siguiente al final
+        pendientes = [lote]
+        escritas = 0
+        while pendientes:
+            tramo = pendientes.pop()
+            try:
+                self._insertar(tramo)
+            except (DataError, IntegrityError):
+                if len(tramo) > 1:
+                    mitad = len(tramo) // 2
+                    pendientes += [tramo[mitad:], tramo[:mitad]]
+                    continue
+                logger.exception("Se descarta una entrada de bitácora que no se puede escribir: %r", tramo[0])
+                with self._lock:
+                    self._contadores['errores'] += 1
+                    self._contadores['descartadas'] += 1
+                continue
+            except Exception:
+                logger.exception("No se pudo escribir un lote de %d entradas de bitácora", len(lote))
+                self._reintentar(tramo + [entrada for resto in reversed(pendientes) for entrada in resto])
+                return False
+            escritas += len(tramo)
+
+        latencia = (time.perf_counter() - inicio) * 1000
+        with self._lock:
+            self._fallos = 0
+            self._contadores['escritas'] += escritas
+            self._contadores['lotes'] += 1
+            self._contadores['latencia_ultima_ms'] = latencia
+            self._contadores['latencia_total_ms'] += latencia
+            self._contadores['latencia_max_ms'] = max(self._contadores['latencia_max_ms'], latencia)
+        return True
+
+    def _insertar(self, lote):
+        from modulos.bitacora.models import Bitacora
+        from modulos.bitacora.resumen import sumar_entradas
+
+        # El resumen por hora se actualiza en la misma transacción que el lote
+        with transaction.atomic():
+            Bitacora.objects.bulk_create([Bitacora(**entrada) for entrada in lote])
+            sumar_entradas(lote)
+
+    def _reintentar(self, entradas):
+        conf = configuracion()
+        with self._lock:
+            self._contadores['errores'] += 1
+            self._fallos += 1
+            if self._fallos > conf['REINTENTOS']:
+                self._fallos = 0
+                self._contadores['descartadas'] += len(entradas)
+                logger.error("Se descartan %d entradas de bitácora tras %d intentos", len(entradas), conf['REINTENTOS'] + 1)
+                return
+            # Se reintenta en la próxima vuelta si hay espacio en la cola
+            espacio = max(conf['MAX_COLA'] - len(self._cola), 0)
+            self._cola.extendleft(reversed(entradas[:espacio]))
+            self._contadores['descartadas'] += max(len(entradas) - espacio, 0)
+
+    def _asegurar_hilo(self):
+        # Tras un fork (p. ej. gunicorn --preload) el hilo del padre no existe en el hijo
+        if self._hilo is not None and self._hilo.is_alive() and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._hilo is not None and self._hilo.is_alive() and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._detenido = False
+            self._hilo = threading.Thread(target=self._bucle, name='bitacora-escritor', daemon=True)
+            self._hilo.start()
+
+    def _bucle(self):
+        while not self._detenido:
+            self._despertar.wait(configuracion()['INTERVALO'])
+            self._despertar.clear()
+            close_old_connections()
+            self.vaciar()
+
+
+def _entrada(accion_realizada, id_accion=None, ip_origen=None, usuario=None, tipo_accion='O', modelo='',
+             cambios=None):
+    return {
+        'accion_realizada': accion_realizada[:255],
+        'tipo_accion': tipo_accion,
+        'modelo': modelo[:50],
+        'id_accion': id_accion,
+        'ip_origen': _ip(ip_origen),
+        'usuario_id': _id_usuario(usuario),
+        'hora_fecha': timezone.now(),
+        'cambios': cambios or None,
+    }
+
+
+def _ip(valor):
+    # Viene de X-Forwarded-For, que controla el cliente: una IP inválida haría fallar el INSERT
+    try:
+        return str(ipaddress.ip_address(valor.strip()))
+    except (AttributeError, ValueError):
+        return None
+
+
+def _id_usuario(usuario):
+    if usuario is None or not getattr(usuario, 'is_authenticated', False):
+        return None
+    return usuario.pk
+
+
+escritor = EscritorBitacora()
+atexit.register(escritor.detener)
@@ -0,0 +1,16 @@
+from django.db.models import GenericIPAddressField, Lookup
+
+
+@GenericIPAddressField.register_lookup
+class EnRed(Lookup):
+    """ip_origen__en_red='10.0.0.0/8': la IP pertenece a la red (operador inet <<= de Postgres)."""
+    lookup_name = 'en_red'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} <<= {rhs}::inet', lhs_params + rhs_params
+
+    def get_prep_lookup(self):
+        # El valor es una red, no una IP: no pasa por la validación del campo
+        return str(self.rhs)
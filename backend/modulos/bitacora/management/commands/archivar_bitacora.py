@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+from modulos.bitacora.archivo import archivar, configuracion, fecha_corte
+
+
+class Command(BaseCommand):
+    help = (
+        "Pasa a archivos gzip NDJSON mensuales las entradas de bitácora más viejas "
+        "que la retención (BITACORA_ARCHIVO) y las borra de la tabla en lotes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dias', type=int, default=None,
+                            help="Días de retención (por defecto BITACORA_ARCHIVO['RETENCION_DIAS']).")
+        parser.add_argument('--lote', type=int, default=None,
+                            help="Filas por lote (por defecto BITACORA_ARCHIVO['TAMANO_LOTE']).")
+        parser.add_argument('--pausa', type=float, default=0,
+                            help="Segundos de espera entre lotes, para no cargar la base.")
+
+    def handle(self, *args, **options):
+        corte = fecha_corte(options['dias'])
+        self.stdout.write(f"Archivando entradas anteriores a {corte:%Y-%m-%d} en {configuracion()['DIRECTORIO']}")
+
+        def informar(mes, total):
+            if options['verbosity'] > 1:
+                self.stdout.write(f"  {mes:%Y-%m}: {total} filas")
+
+        resumen = archivar(options['dias'], options['lote'], options['pausa'], informar)
+        for mes, total in resumen.items():
+            self.stdout.write(f"{mes:%Y-%m}: {total} filas archivadas")
+        self.stdout.write(self.style.SUCCESS(f"{sum(resumen.values())} filas archivadas"))
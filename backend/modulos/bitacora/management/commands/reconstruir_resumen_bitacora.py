@@ -0,0 +1,34 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from modulos.bitacora.resumen import inicio_reconstruible, reconstruir
+
+
+def _fecha(valor, opcion):
+    if valor is None:
+        return None
+    try:
+        return datetime.fromisoformat(valor)
+    except ValueError:
+        raise CommandError(f"{opcion} debe tener el formato AAAA-MM-DD[THH:MM]")
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula el resumen por hora de la bitácora desde la tabla. Nunca empieza antes "
+        "de la entrada más vieja ni dentro de un mes archivado: esos meses conservan su resumen."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--desde', help="Inicio del rango (AAAA-MM-DD[THH:MM]).")
+        parser.add_argument('--hasta', help="Fin del rango, excluido (AAAA-MM-DD[THH:MM]).")
+
+    def handle(self, *args, **options):
+        desde, hasta = _fecha(options['desde'], '--desde'), _fecha(options['hasta'], '--hasta')
+        inicio = inicio_reconstruible()
+        if desde is not None and inicio is not None and desde < inicio:
+            self.stdout.write(self.style.WARNING(
+                f"--desde se ajusta a {inicio:%Y-%m-%d %H:%M}: lo anterior ya no está en la tabla"
+            ))
+        total = reconstruir(desde, hasta)
+        self.stdout.write(self.style.SUCCESS(f"{total} filas de resumen"))
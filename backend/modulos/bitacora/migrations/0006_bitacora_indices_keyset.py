@@ -0,0 +1,65 @@
+# Generated by Django 5.2.6 on 2026-10-18 06:12
+
+import django.db.models.deletion
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+TABLA = 'bitacora_bitacora'
+
+
+def _indices_usuario(schema_editor):
+    """Nombre del índice que Django crea para la FK usuario (solo la columna usuario_id)."""
+    conexion = schema_editor.connection
+    with conexion.cursor() as cursor:
+        restricciones = conexion.introspection.get_constraints(cursor, TABLA)
+    return [
+        nombre for nombre, datos in restricciones.items()
+        if datos['index'] and not datos['unique'] and datos['columns'] == ['usuario_id']
+    ]
+
+
+def borrar_indice_usuario(apps, schema_editor):
+    # Lo reemplaza el prefijo de bitacora_usuario_fecha_idx, que ya existe a esta altura
+    for nombre in _indices_usuario(schema_editor):
+        schema_editor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {schema_editor.quote_name(nombre)}')
+
+
+def crear_indice_usuario(apps, schema_editor):
+    nombre = schema_editor._create_index_name(TABLA, ['usuario_id'], suffix='')
+    schema_editor.execute(
+        f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {schema_editor.quote_name(nombre)} ON {TABLA} (usuario_id)'
+    )
+
+
+class Migration(migrations.Migration):
+    # La tabla puede ser muy grande: los índices se crean sin bloquear escrituras
+    atomic = False
+
+    dependencies = [
+        ('bitacora', '0005_bitacora_hora_fecha_default'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='bitacora',
+            index=models.Index(fields=['hora_fecha', 'id'], name='bitacora_fecha_id_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='bitacora',
+            index=models.Index(fields=['usuario', 'hora_fecha'], name='bitacora_usuario_fecha_idx'),
+        ),
+        # Recién con el índice compuesto creado se quita el de la FK, también
+        # sin bloquear: el AlterField solo cambia el estado de la migración
+        migrations.SeparateDatabaseAndState(
+            database_operations=[migrations.RunPython(borrar_indice_usuario, crear_indice_usuario)],
+            state_operations=[
+                migrations.AlterField(
+                    model_name='bitacora',
+                    name='usuario',
+                    field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='bitacoras', to=settings.AUTH_USER_MODEL),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,75 @@
+# Generated by Django 5.2.6 on 2026-10-18 06:13
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+# Las entradas existentes tienen la forma "<Creó|Modificó|Eliminó> <Modelo> con ID <n>".
+# Se clasifican por rangos de id, cada uno en su propia transacción (la migración
+# no es atómica): un solo UPDATE de toda la tabla bloquearía todas sus filas y
+# dejaría una transacción larga con las tuplas viejas sin poder limpiarse.
+CLASIFICAR_RANGO = """
+UPDATE bitacora_bitacora SET
+    tipo_accion = CASE split_part(accion_realizada, ' ', 1)
+        WHEN 'Creó' THEN 'C'
+        WHEN 'Modificó' THEN 'M'
+        WHEN 'Eliminó' THEN 'E'
+        ELSE 'O'
+    END,
+    modelo = left(split_part(accion_realizada, ' ', 2), 50)
+WHERE id >= %s AND id < %s
+  AND accion_realizada ~ '^(Creó|Modificó|Eliminó) [A-Za-z_]+ con ID'
+"""
+
+FILAS_POR_RANGO = 10000
+
+
+def clasificar_existentes(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute('SELECT min(id), max(id) FROM bitacora_bitacora')
+        minimo, maximo = cursor.fetchone()
+        if minimo is None:
+            return
+        for desde in range(minimo, maximo + 1, FILAS_POR_RANGO):
+            cursor.execute(CLASIFICAR_RANGO, [desde, desde + FILAS_POR_RANGO])
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('bitacora', '0006_bitacora_indices_keyset'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bitacora',
+            name='modelo',
+            field=models.CharField(blank=True, default='', max_length=50),
+        ),
+        migrations.AddField(
+            model_name='bitacora',
+            name='tipo_accion',
+            field=models.CharField(choices=[('C', 'Creación'), ('M', 'Modificación'), ('E', 'Eliminación'), ('O', 'Otra')], default='O', max_length=1),
+        ),
+        migrations.RunPython(clasificar_existentes, migrations.RunPython.noop),
+        AddIndexConcurrently(
+            model_name='bitacora',
+            index=models.Index(fields=['tipo_accion', 'hora_fecha'], name='bitacora_tipo_fecha_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='bitacora',
+            index=models.Index(fields=['modelo', 'hora_fecha'], name='bitacora_modelo_fecha_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='bitacora',
+            index=models.Index(fields=['ip_origen'], name='bitacora_ip_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='bitacora',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.search.SearchVector('accion_realizada', config='spanish'), name='bitacora_accion_fts_idx'),
+        ),
+    ]
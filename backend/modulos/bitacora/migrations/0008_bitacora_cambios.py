@@ -0,0 +1,19 @@
+# Generated by Django 5.2.6 on 2026-10-18 06:34
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bitacora', '0007_bitacora_filtros_estructurados'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bitacora',
+            name='cambios',
+            field=models.JSONField(blank=True, encoder=django.core.serializers.json.DjangoJSONEncoder, null=True),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.6 on 2026-10-18 06:45
+
+import django.db.models.deletion
+import django.db.models.functions.comparison
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bitacora', '0008_bitacora_cambios'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumenBitacora',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('hora', models.DateTimeField()),
+                ('modelo', models.CharField(blank=True, default='', max_length=50)),
+                ('tipo_accion', models.CharField(choices=[('C', 'Creación'), ('M', 'Modificación'), ('E', 'Eliminación'), ('O', 'Otra')], max_length=1)),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('usuario', models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['usuario', 'hora'], name='resumen_bitacora_usuario_idx')],
+                'constraints': [models.UniqueConstraint(models.F('hora'), django.db.models.functions.comparison.Coalesce(models.F('usuario'), models.Value(0)), models.F('modelo'), models.F('tipo_accion'), name='resumen_bitacora_unico')],
+            },
+        ),
+    ]
@@ -1,18 +1,73 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce
 from django.contrib.auth.models import User
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 
 User = get_user_model()
 
 class Bitacora(models.Model) :
     id = models.AutoField(primary_key=True)
-    hora_fecha = models.DateTimeField(auto_now_add=True)
+    # La hora la fija quien genera la entrada: el escritor en lotes inserta más tarde
+    hora_fecha = models.DateTimeField(default=timezone.now, editable=False)
     id_accion = models.IntegerField(null=True, blank=True)
     accion_realizada = models.CharField(max_length=255)
+    tipoAccion = [('C', 'Creación'), ('M', 'Modificación'), ('E', 'Eliminación'), ('O', 'Otra')]
+    tipo_accion = models.CharField(max_length=1, choices=tipoAccion, default='O')
+    modelo = models.CharField(max_length=50, blank=True, default='')
     ip_origen = models.GenericIPAddressField(null=True, blank=True)
-    usuario = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True, related_name='bitacoras')
+    # Sin índice propio: lo cubre el prefijo de bitacora_usuario_fecha_idx
+    usuario = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True, related_name='bitacoras', db_index=False)
+    # {campo: [antes, después]} de las modificaciones (ver auditoria.py)
+    cambios = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+
+    class Meta:
+        indexes = [
+            # Paginación por cursor (hora_fecha, id) y listado "más recientes primero"
+            models.Index(fields=['hora_fecha', 'id'], name='bitacora_fecha_id_idx'),
+            # Historial de un usuario ordenado por fecha
+            models.Index(fields=['usuario', 'hora_fecha'], name='bitacora_usuario_fecha_idx'),
+            # Filtros estructurados de auditoría
+            models.Index(fields=['tipo_accion', 'hora_fecha'], name='bitacora_tipo_fecha_idx'),
+            models.Index(fields=['modelo', 'hora_fecha'], name='bitacora_modelo_fecha_idx'),
+            # inet en btree: sirve para igualdad y para <<= (contenido en una red CIDR)
+            models.Index(fields=['ip_origen'], name='bitacora_ip_idx'),
+            # Búsqueda de texto completo sobre la acción
+            GinIndex(SearchVector('accion_realizada', config='spanish'), name='bitacora_accion_fts_idx'),
+        ]
 
     def __str__(self):
         txt = "{0} - {1} - ID : {2} - {3}"
         # return f"{self.usuario} - {self.accion_realizada} - ID : {self.id_accion} - {self.hora_fecha_ingreso}"
-        return txt.format(self.usuario, self.accion_realizada, self.id_accion, self.hora_fecha)
\ No newline at end of file
+        return txt.format(self.usuario, self.accion_realizada, self.id_accion, self.hora_fecha)
+
+
+class ResumenBitacora(models.Model):
+    """
+    Entradas de bitácora por hora, usuario, modelo y tipo de acción. Lo
+    mantiene el escritor al insertar cada lote (ver resumen.py); los
+    gráficos de actividad leen esta tabla, no Bitacora. Sobrevive al
+    archivado de la bitácora.
+    """
+    id = models.BigAutoField(primary_key=True)
+    hora = models.DateTimeField()
+    usuario = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True, related_name='+', db_index=False)
+    modelo = models.CharField(max_length=50, blank=True, default='')
+    tipo_accion = models.CharField(max_length=1, choices=Bitacora.tipoAccion)
+    total = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            # COALESCE para que las entradas sin usuario también choquen en el upsert
+            models.UniqueConstraint(
+                F('hora'), Coalesce(F('usuario'), Value(0)), F('modelo'), F('tipo_accion'),
+                name='resumen_bitacora_unico',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['usuario', 'hora'], name='resumen_bitacora_usuario_idx'),
+        ]
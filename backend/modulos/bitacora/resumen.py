@@ -0,0 +1,117 @@
+"""
+Resumen de actividad de la bitácora por hora, usuario, modelo y tipo.
+
+El escritor suma cada lote en la misma transacción en que lo inserta
+(sumar_entradas): un upsert que incrementa los contadores, así el resumen
+nunca se adelanta ni se atrasa respecto de Bitacora. reconstruir() lo
+vuelve a calcular desde la tabla para un rango (p. ej. tras sembrar datos
+o insertar filas por fuera del escritor); los meses ya archivados no están
+en la tabla, por eso nunca se reconstruye antes de la fila más vieja ni
+dentro de un mes archivado (inicio_reconstruible), aunque se pida.
+"""
+from collections import Counter
+from datetime import datetime, time
+
+from django.db import connection, transaction
+from django.db.models import Count
+from django.db.models.functions import TruncHour
+
+from .archivo import mes_siguiente, meses_archivados
+from .models import Bitacora, ResumenBitacora
+
+FILAS_POR_INSERT = 1000
+
+
+def truncar_hora(fecha):
+    return fecha.replace(minute=0, second=0, microsecond=0)
+
+
+def sumar_entradas(entradas):
+    """Suma al resumen las entradas (dicts del escritor) que se acaban de insertar."""
+    conteo = Counter(
+        (truncar_hora(e['hora_fecha']), e['usuario_id'], e['modelo'], e['tipo_accion'])
+        for e in entradas
+    )
+    # Mismo orden de filas en todos los procesos: dos lotes concurrentes no se bloquean en cruz
+    filas = sorted(conteo.items(), key=lambda item: (item[0][0], item[0][1] or 0, item[0][2], item[0][3]))
+    _upsert([(*clave, total) for clave, total in filas], sumar=True)
+
+
+def _upsert(filas, sumar):
+    tabla = connection.ops.quote_name(ResumenBitacora._meta.db_table)
+    actualizar = f'{tabla}.total + EXCLUDED.total' if sumar else 'EXCLUDED.total'
+    with connection.cursor() as cursor:
+        for inicio in range(0, len(filas), FILAS_POR_INSERT):
+            tramo = filas[inicio:inicio + FILAS_POR_INSERT]
+            valores = ', '.join(['(%s, %s, %s, %s, %s)'] * len(tramo))
+            cursor.execute(
+                f"""
+                INSERT INTO {tabla} (hora, usuario_id, modelo, tipo_accion, total)
+                VALUES {valores}
+                ON CONFLICT (hora, (COALESCE(usuario_id, 0)), modelo, tipo_accion)
+                DO UPDATE SET total = {actualizar}
+                """,
+                [valor for fila in tramo for valor in fila],
+            )
+
+
+def inicio_reconstruible():
+    """
+    Primera hora cuyo resumen se puede recalcular desde la tabla: la de la
+    fila más vieja, y no antes del mes siguiente al último archivado (un
+    mes archivado puede tener filas sueltas en la tabla si el borrado se
+    cortó). None si la tabla está vacía.
+    """
+    primera = Bitacora.objects.order_by('hora_fecha').values_list('hora_fecha', flat=True).first()
+    if primera is None:
+        return None
+    archivados = meses_archivados()
+    if archivados:
+        primera = max(primera, datetime.combine(mes_siguiente(archivados[-1]), time.min))
+    return truncar_hora(primera)
+
+
+def reconstruir(desde=None, hasta=None):
+    """
+    Recalcula el resumen de [desde, hasta) desde Bitacora. desde se ajusta
+    a inicio_reconstruible(): lo anterior solo está en el resumen y se
+    conserva. Bloquea las escrituras del resumen mientras dura: un lote
+    del escritor que llegue a la vez espera y suma encima del valor
+    reconstruido.
+    """
+    entradas = Bitacora.objects.order_by()
+    inicio = inicio_reconstruible()
+    if inicio is None:
+        return 0
+    desde = inicio if desde is None else max(truncar_hora(desde), inicio)
+    if hasta is not None and truncar_hora(hasta) <= desde:
+        return 0
+    entradas = entradas.filter(hora_fecha__gte=desde)
+    resumenes = ResumenBitacora.objects.filter(hora__gte=desde)
+    if hasta is not None:
+        hasta = truncar_hora(hasta)
+        entradas = entradas.filter(hora_fecha__lt=hasta)
+        resumenes = resumenes.filter(hora__lt=hasta)
+
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'LOCK TABLE {connection.ops.quote_name(ResumenBitacora._meta.db_table)} IN SHARE ROW EXCLUSIVE MODE'
+            )
+        resumenes.delete()
+        filas = (
+            entradas.annotate(hora=TruncHour('hora_fecha'))
+            .values_list('hora', 'usuario_id', 'modelo', 'tipo_accion')
+            .annotate(total=Count('id'))
+            .order_by()
+        )
+        total = 0
+        tramo = []
+        for fila in filas.iterator(chunk_size=FILAS_POR_INSERT):
+            tramo.append(fila)
+            if len(tramo) >= FILAS_POR_INSERT:
+                _upsert(tramo, sumar=False)
+                total += len(tramo)
+                tramo = []
+        _upsert(tramo, sumar=False)
+        return total + len(tramo)
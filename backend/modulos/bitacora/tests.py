@@ -1,3 +1,365 @@
-from django.test import TestCase
+import os
+import shutil
+import tempfile
+from datetime import date, datetime, timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.db import OperationalError, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from modulos.comun import lectura
+from modulos.propiedades.models import Propiedad
+from . import archivo, resumen
+from .auditoria import auditoria
+from .escritor import EscritorBitacora, _entrada, escritor
+from .models import Bitacora, ResumenBitacora
+
+
+# TransactionTestCase: la FK a usuario se verifica al confirmar (DEFERRABLE),
+# y el escritor escribe con su propia transacción como en producción
+@override_settings(BITACORA_ESCRITOR={'TAMANO_LOTE': 10, 'REINTENTOS': 2})
+class EscritorBitacoraTests(TransactionTestCase):
+    def setUp(self):
+        self.escritor = EscritorBitacora()
+
+    def encolar(self, entradas):
+        # Sin pasar por encolar_varias: no se levanta el hilo de fondo
+        self.escritor._cola.extend(entradas)
+
+    def entradas(self, cantidad, **datos):
+        return [_entrada(f'Entrada {i}', **datos) for i in range(cantidad)]
+
+    def test_fila_invalida_no_frena_el_lote(self):
+        lote = self.entradas(4)
+        lote.insert(2, _entrada('Tipo inválido', tipo_accion='XX'))
+        self.encolar(lote)
+
+        self.escritor.vaciar()
+
+        self.assertEqual(Bitacora.objects.count(), 4)
+        self.assertNotIn('Tipo inválido', Bitacora.objects.values_list('accion_realizada', flat=True))
+        estadisticas = self.escritor.estadisticas()
+        self.assertEqual(estadisticas['en_cola'], 0)
+        self.assertEqual(estadisticas['descartadas'], 1)
+        self.assertEqual(estadisticas['escritas'], 4)
+
+    def test_usuario_borrado_con_entradas_en_cola(self):
+        # Sin auditar: el escritor global levantaría su hilo con una conexión abierta
+        with auditoria.suspendida():
+            usuario = User.objects.create_user('borrado')
+            lote = self.entradas(3) + self.entradas(1, usuario=usuario) + self.entradas(3)
+            usuario.delete()
+        self.encolar(lote)
+
+        self.escritor.vaciar()
+
+        self.assertEqual(Bitacora.objects.count(), 6)
+        self.assertEqual(self.escritor.estadisticas()['descartadas'], 1)
+
+    def test_lotes_siguientes_se_escriben(self):
+        lote = self.entradas(9) + [_entrada('Tipo inválido', tipo_accion='XX')] + self.entradas(10)
+        self.encolar(lote)
+
+        self.escritor.vaciar()
+
+        self.assertEqual(Bitacora.objects.count(), 19)
+        self.assertEqual(self.escritor.estadisticas()['en_cola'], 0)
+
+    def test_falla_de_la_base_reintenta_y_luego_descarta(self):
+        self.encolar(self.entradas(3))
+        with mock.patch.object(self.escritor, '_insertar', side_effect=OperationalError('sin conexión')):
+            # El lote vuelve a la cola en los dos primeros fallos...
+            for _ in range(2):
+                self.escritor.vaciar()
+                self.assertEqual(self.escritor.estadisticas()['en_cola'], 3)
+            # ...y se descarta al tercero
+            self.escritor.vaciar()
+        estadisticas = self.escritor.estadisticas()
+        self.assertEqual(estadisticas['en_cola'], 0)
+        self.assertEqual(estadisticas['descartadas'], 3)
+
+    def test_ip_invalida_se_guarda_vacia(self):
+        self.assertIsNone(_entrada('x', ip_origen='no-es-una-ip')['ip_origen'])
+        self.assertIsNone(_entrada('x', ip_origen='')['ip_origen'])
+        self.assertEqual(_entrada('x', ip_origen=' 10.0.0.1')['ip_origen'], '10.0.0.1')
+        self.assertEqual(_entrada('x', ip_origen='2001:db8::1')['ip_origen'], '2001:db8::1')
+
+
+class ArchivoBitacoraTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_user('auditor', is_staff=True, is_superuser=True)
+        filas = []
+        for dia in range(1, 29, 3):
+            for hora in (8, 8, 17):
+                filas.append(Bitacora(
+                    hora_fecha=datetime(2024, 1, dia, hora, 15, 30, 123456), accion_realizada=f'Entrada {dia}-{hora}',
+                    tipo_accion='M', modelo='Residente', ip_origen='10.0.0.1', usuario=cls.usuario,
+                    cambios={'nombre': ['Ana', 'Ana Maria']},
+                ))
+        filas.append(Bitacora(hora_fecha=datetime(2024, 2, 10, 9), accion_realizada='Sin usuario'))
+        filas.append(Bitacora(hora_fecha=timezone.now(), accion_realizada='Reciente'))
+        Bitacora.objects.bulk_create(filas)
+
+    def setUp(self):
+        directorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directorio)
+        configuracion = override_settings(BITACORA_ARCHIVO={'DIRECTORIO': directorio, 'TAMANO_LOTE': 4})
+        configuracion.enable()
+        self.addCleanup(configuracion.disable)
+        self.enero, self.febrero = date(2024, 1, 1), date(2024, 2, 1)
+
+    def filas(self, **filtro):
+        return list(Bitacora.objects.filter(**filtro).order_by('hora_fecha', 'id').values(*archivo.COLUMNAS))
+
+    def archivar(self, **kwargs):
+        dias = (timezone.now().date() - date(2024, 3, 1)).days
+        return archivo.archivar(dias=dias, **kwargs)
+
+    def test_ida_y_vuelta(self):
+        enero = self.filas(hora_fecha__lt=datetime(2024, 2, 1))
+        febrero = self.filas(hora_fecha__range=(datetime(2024, 2, 1), datetime(2024, 3, 1)))
+
+        self.assertEqual(self.archivar(), {self.enero: len(enero), self.febrero: 1})
+
+        self.assertEqual(list(archivo.leer_mes(self.enero)), enero)
+        self.assertEqual(list(archivo.leer_mes(self.febrero)), febrero)
+        self.assertEqual(list(Bitacora.objects.values_list('accion_realizada', flat=True)), ['Reciente'])
+        self.assertEqual(archivo.meses_archivados(), [self.enero, self.febrero])
+        self.assertEqual(os.listdir(archivo.configuracion()['DIRECTORIO']).count('bitacora-2024-01.ndjson.gz'), 1)
+        # Otra corrida no tiene nada que archivar
+        self.assertEqual(self.archivar(), {})
+
+    def test_mes_en_curso_se_lee_de_la_tabla(self):
+        total = Bitacora.objects.filter(hora_fecha__lt=datetime(2024, 2, 1)).count()
+        vistos = []
+
+        def informar(mes, escritas):
+            if mes == self.enero:
+                # Mientras se escribe, el mes sigue entero en la tabla y no cuenta como archivado
+                vistos.append(escritas)
+                self.assertFalse(archivo.esta_archivado(mes))
+                self.assertIsNone(archivo.meses_consultados({'mes': '2024-01'}))
+                self.assertEqual(Bitacora.objects.filter(hora_fecha__lt=datetime(2024, 2, 1)).count(), total)
+
+        self.archivar(informar=informar)
+        self.assertEqual(vistos, [4, 8, 12, 16, 20, 24, 28, 30])
+        self.assertEqual(archivo.meses_consultados({'mes': '2024-01'}), [self.enero])
+
+    def test_parcial_de_un_intento_cortado_se_descarta(self):
+        with open(archivo.ruta_parcial(self.enero), 'wb') as parcial:
+            parcial.write(b'basura')
+        enero = self.filas(hora_fecha__lt=datetime(2024, 2, 1))
+        self.archivar()
+        self.assertEqual(list(archivo.leer_mes(self.enero)), enero)
+        self.assertFalse(os.path.exists(archivo.ruta_parcial(self.enero)))
+
+    def test_borrado_cortado_se_termina(self):
+        enero = self.filas(hora_fecha__lt=datetime(2024, 2, 1))
+        with mock.patch.object(archivo, '_borrar_mes', side_effect=OperationalError('corte')):
+            with self.assertRaises(OperationalError):
+                self.archivar()
+        # El archivo quedó completo: las lecturas ya van a él aunque las filas sigan en la tabla
+        self.assertTrue(archivo.esta_archivado(self.enero))
+        self.assertEqual(len(self.filas(hora_fecha__lt=datetime(2024, 2, 1))), len(enero))
+
+        self.assertEqual(self.archivar()[self.enero], len(enero))
+        self.assertEqual(list(archivo.leer_mes(self.enero)), enero)
+        self.assertFalse(Bitacora.objects.filter(hora_fecha__lt=datetime(2024, 2, 1)).exists())
+
+    def test_listado_desde_el_archivo(self):
+        client = APIClient()
+        client.force_authenticate(self.usuario)
+        consulta = '/api/bitacora/bitacora/?fecha_inicio=2024-01-01&fecha_fin=2024-01-31&page_size=100'
+        antes = client.get(consulta)
+        self.archivar()
+        despues = client.get(consulta)
+        self.assertEqual(despues.status_code, 200)
+        self.assertEqual(despues['X-Bitacora-Origen'], 'archivo')
+        self.assertNotIn('X-Bitacora-Origen', antes)
+        self.assertEqual(despues.json()['count'], 30)
+        self.assertEqual(despues.json()['results'], antes.json()['results'])
+
+    def resumenes(self):
+        return list(ResumenBitacora.objects.order_by('hora', 'tipo_accion').values_list('hora', 'usuario_id', 'total'))
+
+    def test_reconstruir_conserva_el_resumen_de_meses_archivados(self):
+        resumen.reconstruir()
+        antes = self.resumenes()
+        self.archivar()
+        # Un --desde anterior a la tabla se ajusta a la fila más vieja que queda
+        self.assertEqual(resumen.reconstruir(desde=datetime(2023, 1, 1)), 1)
+        self.assertEqual(self.resumenes(), antes)
+
+    def test_reconstruir_no_entra_en_un_mes_archivado_a_medio_borrar(self):
+        resumen.reconstruir()
+        antes = self.resumenes()
+        with mock.patch.object(archivo, '_borrar_mes', side_effect=OperationalError('corte')):
+            with self.assertRaises(OperationalError):
+                self.archivar()
+        Bitacora.objects.filter(hora_fecha__lt=datetime(2024, 1, 15)).delete()
+
+        self.assertEqual(resumen.inicio_reconstruible(), datetime(2024, 2, 1))
+        resumen.reconstruir(desde=datetime(2024, 1, 1))
+        self.assertEqual(self.resumenes(), antes)
+
+
+class LecturaRapidaBitacoraTests(TestCase):
+    """El listado con values() tiene que responder lo mismo que el serializer, también con cursor."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_user('auditor', is_staff=True, is_superuser=True)
+        inicio = timezone.now() - timedelta(days=2)
+        Bitacora.objects.bulk_create([
+            Bitacora(
+                # Varias filas con la misma hora: el cursor desempata por id
+                hora_fecha=inicio + timedelta(minutes=i // 3), accion_realizada=f'Entrada {i}',
+                tipo_accion='CMEO'[i % 4], modelo='Residente', id_accion=i if i % 2 else None,
+                ip_origen='10.0.0.1' if i % 5 else None,
+                usuario=cls.usuario if i % 3 else None,
+                cambios={'nombre': ['Ana', f'Ana {i}']} if i % 4 == 1 else None,
+            )
+            for i in range(25)
+        ])
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.usuario)
+
+    def obtener(self, url, rapida):
+        with self.settings(API_LECTURA_RAPIDA=rapida), \
+                mock.patch.object(lectura, 'convertir', wraps=lectura.convertir) as convertir:
+            respuesta = self.client.get(url)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(convertir.called, rapida)
+        return respuesta.json()
+
+    def test_paginacion_por_numeros(self):
+        for consulta in ('', '?page=3', '?fields=id,hora_fecha,usuario', '?exclude=cambios&tipo_accion=M'):
+            with self.subTest(consulta=consulta):
+                url = f'/api/bitacora/bitacora/{consulta}'
+                self.assertEqual(self.obtener(url, True), self.obtener(url, False))
+
+    def test_paginacion_por_cursor(self):
+        for consulta in ('?paginacion=cursor', '?paginacion=cursor&fields=id,accion_realizada'):
+            with self.subTest(consulta=consulta):
+                url, vistas = f'http://testserver/api/bitacora/bitacora/{consulta}', 0
+                while url:
+                    rapida, normal = self.obtener(url, True), self.obtener(url, False)
+                    self.assertEqual(rapida, normal)
+                    vistas += len(rapida['results'])
+                    url = rapida['next']
+                self.assertEqual(vistas, 25)
+                # Y de vuelta hacia atrás desde la última página
+                anterior = self.obtener(normal['previous'], True)
+                self.assertEqual(anterior, self.obtener(normal['previous'], False))
+
+
+@override_settings(BITACORA_ESCRITOR={'MODO': 'sincrono'})
+class AuditoriaTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        with auditoria.suspendida():
+            cls.propiedad = Propiedad.objects.create(numero_unidad='A-101', direccion='Calle 1')
+            cls.usuario = User.objects.create_user('portero', password='clave-1')
+
+    def entradas(self, modelo):
+        return list(Bitacora.objects.filter(modelo=modelo).order_by('id'))
+
+    def guardar(self, instancia, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            instancia.save(**kwargs)
+
+    def test_solo_los_campos_cambiados(self):
+        propiedad = Propiedad.objects.get(pk=self.propiedad.pk)
+        propiedad.direccion = 'Calle 2'
+        propiedad.tipo_propiedad = 'V'
+        self.guardar(propiedad)
+
+        entrada, = self.entradas('Propiedad')
+        self.assertEqual(entrada.tipo_accion, 'M')
+        self.assertEqual(entrada.id_accion, propiedad.pk)
+        self.assertEqual(entrada.cambios, {'direccion': ['Calle 1', 'Calle 2']})
+
+        # La copia se renueva tras guardar: el siguiente cambio parte de 'Calle 2'
+        propiedad.direccion = 'Calle 3'
+        self.guardar(propiedad)
+        self.assertEqual(self.entradas('Propiedad')[-1].cambios, {'direccion': ['Calle 2', 'Calle 3']})
+
+    def test_guardar_sin_cambios_no_registra(self):
+        propiedad = Propiedad.objects.get(pk=self.propiedad.pk)
+        self.guardar(propiedad)
+        # Los campos excluidos (ocupación) tampoco cuentan como cambio
+        propiedad.numero_residentes = 3
+        self.guardar(propiedad)
+        self.assertEqual(self.entradas('Propiedad'), [])
+
+    def test_update_fields_limita_la_comparacion(self):
+        propiedad = Propiedad.objects.get(pk=self.propiedad.pk)
+        propiedad.direccion = 'Calle 2'
+        propiedad.descripcion = 'Esquina'
+        self.guardar(propiedad, update_fields=['descripcion'])
+        self.assertEqual(self.entradas('Propiedad')[0].cambios, {'descripcion': [None, 'Esquina']})
+
+    def test_campos_ocultos(self):
+        usuario = User.objects.get(pk=self.usuario.pk)
+        usuario.set_password('clave-2')
+        usuario.email = 'portero@condominio.bo'
+        self.guardar(usuario)
+
+        entrada, = self.entradas('User')
+        self.assertEqual(entrada.cambios, {'email': ['', 'portero@condominio.bo'], 'password': ['***', '***']})
+        self.assertNotIn(usuario.password, str(entrada.cambios))
+
+    def test_campos_no_seguidos(self):
+        # last_login no está entre los campos registrados de User
+        usuario = User.objects.get(pk=self.usuario.pk)
+        usuario.last_login = timezone.now()
+        self.guardar(usuario)
+        self.assertEqual(self.entradas('User'), [])
+
+    def test_suspendida(self):
+        with self.captureOnCommitCallbacks(execute=True), auditoria.suspendida():
+            propiedad = Propiedad.objects.create(numero_unidad='B-201', direccion='Calle 9')
+            propiedad.direccion = 'Calle 10'
+            propiedad.save()
+            propiedad.delete()
+        self.assertEqual(self.entradas('Propiedad'), [])
+
+    def test_creacion_y_borrado(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            propiedad = Propiedad.objects.create(numero_unidad='B-201', direccion='Calle 9')
+            pk = propiedad.pk
+            propiedad.delete()
+        self.assertEqual([(e.tipo_accion, e.id_accion) for e in self.entradas('Propiedad')], [('C', pk), ('E', pk)])
+
+    def test_agrupada_una_sola_escritura(self):
+        with mock.patch.object(escritor, '_insertar', wraps=escritor._insertar) as insertar, \
+                self.captureOnCommitCallbacks(execute=True), auditoria.agrupada():
+            for i in range(5):
+                Propiedad.objects.create(numero_unidad=f'C-{i}', direccion='Calle 5')
+        self.assertEqual(insertar.call_count, 1)
+        self.assertEqual(len(self.entradas('Propiedad')), 5)
+
+    def test_agrupada_resumida(self):
+        with self.captureOnCommitCallbacks(execute=True), auditoria.agrupada(resumir=True):
+            for i in range(5):
+                Propiedad.objects.create(numero_unidad=f'C-{i}', direccion='Calle 5')
+            Propiedad.objects.get(pk=self.propiedad.pk).delete()
+
+        entradas = self.entradas('Propiedad')
+        self.assertEqual(
+            sorted((e.tipo_accion, e.accion_realizada) for e in entradas),
+            [('C', 'Creó 5 Propiedad'), ('E', 'Eliminó 1 Propiedad')],
+        )
+
+    def test_revertida_no_registra(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                Propiedad.objects.create(numero_unidad='B-201', direccion='Calle 9')
+                raise RuntimeError
+        self.assertEqual(self.entradas('Propiedad'), [])
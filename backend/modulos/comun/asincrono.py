@@ -0,0 +1,104 @@
+"""
+list y retrieve asíncronos para los ViewSets de solo lectura más usados.
+
+Bajo ASGI, Django corre las vistas síncronas en un único hilo compartido
+(sync_to_async con thread_sensitive): una petición lenta frena a las demás.
+Con API_LECTURAS_ASINCRONAS = True, GET/HEAD de list y retrieve se atienden
+con una vista async: la consulta del detalle usa el ORM async (aget) y el
+resto del trabajo con la base (autenticación, página, serialización) se hace
+en tramos cortos con sync_to_async, dejando libre el event loop mientras
+tanto. Las escrituras y acciones extra siguen por el camino síncrono de DRF.
+
+Bajo WSGI conviene dejarlo en False: Django tendría que levantar un event
+loop por cada petición para correr la vista async.
+"""
+from functools import update_wrapper
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.http import Http404
+from django.utils.decorators import classonlymethod
+from rest_framework.response import Response
+
+ACCIONES_ASINCRONAS = ('list', 'retrieve')
+
+
+def lecturas_asincronas():
+    return getattr(settings, 'API_LECTURAS_ASINCRONAS', False)
+
+
+class LecturaAsincronaMixin:
+    @classonlymethod
+    def as_view(cls, actions=None, **initkwargs):
+        vista = super().as_view(actions, **initkwargs)
+        if not lecturas_asincronas() or not set(actions.values()) & set(ACCIONES_ASINCRONAS):
+            return vista
+        vista_sync = sync_to_async(vista)
+        if 'get' in actions and 'head' not in actions:
+            actions['head'] = actions['get']
+
+        async def vista_asincrona(request, *args, **kwargs):
+            if actions.get(request.method.lower()) not in ACCIONES_ASINCRONAS:
+                return await vista_sync(request, *args, **kwargs)
+            self = cls(**initkwargs)
+            self.action_map = actions
+            self.request = request
+            return await self.adispatch(request, *args, **kwargs)
+
+        # Los atributos que DRF deja en la vista (cls, actions, csrf_exempt...) los
+        # usan el router, las métricas y CsrfViewMiddleware
+        update_wrapper(vista_asincrona, vista, assigned=(), updated=('__dict__',))
+        vista_asincrona.__name__ = vista.__name__
+        vista_asincrona.__doc__ = vista.__doc__
+        return vista_asincrona
+
+    async def adispatch(self, request, *args, **kwargs):
+        """Equivalente async de APIView.dispatch para list/retrieve."""
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+        try:
+            # Autenticación, permisos y throttling pueden consultar la base
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            manejador = self.alist if self.action == 'list' else self.aretrieve
+            response = await manejador(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def alist(self, request, *args, **kwargs):
+        # Construir el queryset no toca la base; evaluarlo sí
+        queryset = self.filter_queryset(self.get_queryset())
+        if self.paginator is None:
+            objetos = [objeto async for objeto in queryset]
+            return Response(await self.aserializar(objetos, many=True))
+
+        def paginar_y_serializar():
+            pagina = self.paginate_queryset(queryset)
+            return self.get_serializer(pagina, many=True).data
+
+        datos = await sync_to_async(paginar_y_serializar)()
+        return self.get_paginated_response(datos)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        instancia = await self.aget_object()
+        return Response(await self.aserializar(instancia))
+
+    async def aget_object(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        filtro = {self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        try:
+            objeto = await queryset.aget(**filtro)
+        except (queryset.model.DoesNotExist, TypeError, ValueError, ValidationError):
+            raise Http404
+        await sync_to_async(self.check_object_permissions)(self.request, objeto)
+        return objeto
+
+    async def aserializar(self, instancia, many=False):
+        # Un serializer puede leer relaciones no precargadas: se evalúa fuera del loop
+        return await sync_to_async(lambda: self.get_serializer(instancia, many=many).data)()
@@ -0,0 +1,143 @@
+"""
+Caché versionada para catálogos pequeños que casi no cambian.
+
+Cada modelo tiene un estado (versión, fecha de modificación) guardado en la
+caché. Las respuestas se guardan bajo una clave que incluye la versión, así
+que invalidar es solo cambiar de versión: las entradas viejas dejan de
+leerse y expiran solas. La versión sirve también como ETag, y la fecha como
+Last-Modified, para responder 304 sin tocar la base de datos.
+
+CacheTTL es un LRU en memoria del proceso, para objetos que se leen en
+cada petición (p. ej. el usuario autenticado).
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+from .replicas import leer_de_primaria
+
+
+class CacheTTL:
+    """
+    LRU en memoria del proceso con vencimiento por entrada. Para datos
+    calientes que se leen en cada petición y no conviene serializar.
+    """
+    def __init__(self, maximo=1024, ttl=60):
+        self.maximo = maximo
+        self.ttl = ttl
+        self._datos = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obtener(self, clave):
+        with self._lock:
+            entrada = self._datos.get(clave)
+            if entrada is None:
+                return None
+            vence, valor = entrada
+            if vence <= time.monotonic():
+                del self._datos[clave]
+                return None
+            self._datos.move_to_end(clave)
+            return valor
+
+    def guardar(self, clave, valor, ttl=None):
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._datos[clave] = (time.monotonic() + ttl, valor)
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.maximo:
+                self._datos.popitem(last=False)
+
+    def descartar(self, condicion):
+        """Quita las entradas para las que condicion(clave, valor) es verdadera."""
+        with self._lock:
+            for clave in [c for c, (_, v) in self._datos.items() if condicion(c, v)]:
+                del self._datos[clave]
+
+    def limpiar(self):
+        with self._lock:
+            self._datos.clear()
+
+    def __len__(self):
+        return len(self._datos)
+
+
+def _timeout():
+    return getattr(settings, 'CATALOGOS_CACHE_TIMEOUT', 3600)
+
+
+def _clave_estado(modelo):
+    return f'catalogo:{modelo._meta.label_lower}:estado'
+
+
+def estado_catalogo(modelo):
+    """Devuelve (versión, segundos epoch de la última modificación)."""
+    clave = _clave_estado(modelo)
+    estado = cache.get(clave)
+    if estado is None:
+        # Sin estado (caché fría o expirada) se arranca una versión nueva
+        cache.add(clave, (format(time.time_ns(), 'x'), int(time.time())), _timeout())
+        estado = cache.get(clave) or (format(time.time_ns(), 'x'), int(time.time()))
+    return estado
+
+
+def invalidar_catalogo(modelo):
+    """Cambia la versión del catálogo cuando la transacción en curso confirma."""
+    def cambiar_version():
+        cache.set(_clave_estado(modelo), (format(time.time_ns(), 'x'), int(time.time())), _timeout())
+    transaction.on_commit(cambiar_version)
+
+
+class CatalogoCacheMixin:
+    """
+    list y retrieve servidos desde la caché versionada, con ETag y
+    Last-Modified. Las escrituras pasan directo; la invalidación la hacen
+    las señales del modelo (ver invalidar_catalogo).
+    """
+    def list(self, request, *args, **kwargs):
+        return self.respuesta_cacheada(request, 'lista', super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        clave = f"detalle:{kwargs.get(self.lookup_url_kwarg or self.lookup_field)}"
+        return self.respuesta_cacheada(request, clave, super().retrieve, *args, **kwargs)
+
+    def respuesta_cacheada(self, request, clave, vista, *args, **kwargs):
+        modelo = self.get_queryset().model
+        version, modificado = estado_catalogo(modelo)
+        # La representación depende de la acción y de los parámetros (búsqueda, orden, formato)
+        variante = hashlib.md5(
+            f'{clave}?{request.META.get("QUERY_STRING", "")}|{request.accepted_media_type}'.encode()
+        ).hexdigest()
+        etag = quote_etag(f'{version}-{variante[:12]}')
+
+        no_modificado = get_conditional_response(request._request, etag=etag, last_modified=modificado)
+        if no_modificado is not None:
+            return no_modificado
+
+        clave_cache = f'catalogo:{modelo._meta.label_lower}:{version}:{variante}'
+        datos = cache.get(clave_cache)
+        if datos is None:
+            # Se guarda bajo la versión actual: se arma con lo que ve la primaria
+            with leer_de_primaria():
+                respuesta = vista(request, *args, **kwargs)
+            if respuesta.status_code != 200:
+                return respuesta
+            cache.set(clave_cache, respuesta.data, _timeout())
+        else:
+            respuesta = Response(datos)
+
+        respuesta['ETag'] = etag
+        respuesta['Last-Modified'] = http_date(modificado)
+        # Endpoint autenticado: el navegador puede guardarlo pero debe revalidar cada vez
+        respuesta['Cache-Control'] = 'private, no-cache'
+        return respuesta
@@ -0,0 +1,129 @@
+"""
+Campos a pedido (sparse fieldsets) para los ViewSets.
+
+    GET /api/residentes/residentes/?fields=id,nombre,apPaterno
+    GET /api/bitacora/bitacora/?exclude=accion_realizada
+
+Solo en lecturas: recorta la salida del serializer y además lleva la
+selección a la consulta, con only() sobre las columnas que respaldan los
+campos pedidos, select_related solo de las relaciones que se usan y
+prefetch solo de las colecciones que se muestran.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+
+PARAMETRO_CAMPOS = 'fields'
+PARAMETRO_EXCLUIR = 'exclude'
+
+
+def _lista(valor):
+    return [nombre.strip() for nombre in (valor or '').split(',') if nombre.strip()]
+
+
+def _raiz_prefetch(lookup):
+    lookup = getattr(lookup, 'prefetch_through', lookup)
+    return lookup.split('__')[0]
+
+
+def columnas_de_campo(modelo, campo, calculadas):
+    """
+    Traduce un campo del serializer a (columnas, select_related, prefetch).
+    Devuelve None si no se puede saber qué columnas usa (p. ej. un método);
+    en ese caso la consulta no se poda.
+    """
+    if campo.field_name in calculadas:
+        return list(calculadas[campo.field_name]), [], []
+    if isinstance(campo, serializers.SerializerMethodField) or campo.source == '*':
+        return None
+    if isinstance(campo, (serializers.ListSerializer, serializers.ManyRelatedField)):
+        return [], [], [campo.source.split('.')[0]]
+
+    actual, ruta = modelo, []
+    partes = campo.source.split('.')
+    for indice, parte in enumerate(partes):
+        try:
+            campo_modelo = actual._meta.get_field(parte)
+        except FieldDoesNotExist:
+            return None
+        ruta.append(parte)
+        if indice == len(partes) - 1:
+            if campo_modelo.many_to_many or campo_modelo.one_to_many:
+                return [], [], ['__'.join(ruta)]
+            if not campo_modelo.concrete:
+                return None
+            return ['__'.join(ruta)], ['__'.join(ruta[:-1])] if len(ruta) > 1 else [], []
+        if not (campo_modelo.many_to_one or campo_modelo.one_to_one) or not campo_modelo.concrete:
+            return None
+        actual = campo_modelo.related_model
+    return None
+
+
+class CamposDinamicosMixin:
+    """
+    ?fields= y ?exclude= en cualquier ViewSet de modelo.
+
+    campos_requeridos: columnas que la vista necesita aunque no se muestren
+    (p. ej. las que usa la paginación por cursor).
+    Un serializer puede declarar en su Meta `columnas_calculadas`
+    {campo: [columnas]} para que sus SerializerMethodField también poden.
+    """
+    campos_requeridos = ()
+
+    def campos_pedidos(self):
+        if self.request is None or self.request.method not in ('GET', 'HEAD'):
+            return None, None
+        parametros = self.request.query_params
+        return _lista(parametros.get(PARAMETRO_CAMPOS)) or None, _lista(parametros.get(PARAMETRO_EXCLUIR))
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        incluir, excluir = self.campos_pedidos()
+        if incluir or excluir:
+            destino = getattr(serializer, 'child', serializer)
+            for nombre in self.campos_a_quitar(destino, incluir, excluir):
+                destino.fields.pop(nombre)
+        return serializer
+
+    def campos_a_quitar(self, serializer, incluir, excluir):
+        disponibles = list(serializer.fields)
+        desconocidos = [n for n in (incluir or []) + excluir if n not in disponibles]
+        if desconocidos:
+            raise ValidationError({
+                PARAMETRO_CAMPOS: f"Campos desconocidos: {', '.join(desconocidos)}. "
+                                  f"Disponibles: {', '.join(disponibles)}."
+            })
+        return [n for n in disponibles if (incluir is not None and n not in incluir) or n in excluir]
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        incluir, excluir = self.campos_pedidos()
+        if not (incluir or excluir):
+            return queryset
+        return self.podar_queryset(queryset)
+
+    def podar_queryset(self, queryset):
+        serializer = self.get_serializer()
+        serializer = getattr(serializer, 'child', serializer)
+        modelo = queryset.model
+        calculadas = getattr(getattr(serializer, 'Meta', None), 'columnas_calculadas', {})
+
+        columnas, relaciones, colecciones = set(self.campos_requeridos), set(), set()
+        for campo in serializer.fields.values():
+            if campo.write_only:
+                continue
+            traducido = columnas_de_campo(modelo, campo, calculadas)
+            if traducido is None:
+                # No sabemos qué lee este campo: se deja la consulta completa
+                return queryset
+            columnas.update(traducido[0])
+            relaciones.update(traducido[1])
+            colecciones.update(traducido[2])
+
+        # Las colecciones que no se muestran no se precargan
+        precargas = [p for p in queryset._prefetch_related_lookups if _raiz_prefetch(p) in colecciones]
+        queryset = queryset.select_related(None).prefetch_related(None).prefetch_related(*precargas)
+        if relaciones:
+            # select_related() sin argumentos seguiría todas las FK
+            queryset = queryset.select_related(*relaciones)
+        return queryset.only(modelo._meta.pk.name, *columnas)
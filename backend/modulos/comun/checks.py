@@ -0,0 +1,46 @@
+"""
+Checks de sistema de la configuración compartida (se registran al importar
+el módulo, desde UsuariosConfig.ready).
+"""
+from django.conf import settings
+from django.core import checks
+
+LOCMEM = 'django.core.cache.backends.locmem.LocMemCache'
+
+
+def _cache_local():
+    return settings.CACHES.get('default', {}).get('BACKEND') == LOCMEM
+
+
+@checks.register(checks.Tags.caches, deploy=True)
+def cache_compartida(app_configs, **kwargs):
+    if settings.DEBUG or not _cache_local():
+        return []
+    return [
+        checks.Warning(
+            'CACHES usa LocMemCache: con varios workers cada uno ve solo sus '
+            'propias invalidaciones de catálogos, placas y pases.',
+            hint='Definir CACHE_URL (redis://... o memcached://...).',
+            id='comun.W001',
+        )
+    ]
+
+
+@checks.register(checks.Tags.caches, checks.Tags.database)
+def fijacion_compartida(app_configs, **kwargs):
+    # La fijación a la primaria tras escribir vive en la caché: por proceso,
+    # la siguiente lectura la puede atender otro worker y llegar a la réplica
+    from .replicas import _config
+
+    alias = _config()['ALIAS']
+    if alias not in settings.DATABASES or not _cache_local():
+        return []
+    return [
+        checks.Error(
+            f"Hay réplica de lectura ('{alias}') y CACHES usa LocMemCache: un usuario "
+            'puede no leer sus propias escrituras si la lectura la atiende otro worker.',
+            hint='Definir CACHE_URL (redis://... o memcached://...). Con un solo proceso '
+                 "se puede silenciar con SILENCED_SYSTEM_CHECKS = ['comun.E001'].",
+            id='comun.E001',
+        )
+    ]
@@ -0,0 +1,134 @@
+"""
+Compresión negociada de las respuestas: brotli o gzip.
+
+Como GZipMiddleware de Django (al que delega gzip, con su mitigación de
+BREACH), pero:
+
+- elige por Accept-Encoding, respetando q: brotli si el cliente lo prefiere
+  o lo acepta igual que gzip y está instalado, si no gzip;
+- no comprime respuestas de menos de API_COMPRESION['MINIMO_BYTES']: en un
+  detalle de unos cientos de bytes se gana poco y se paga CPU en los dos
+  extremos.
+
+Las respuestas en flujo (exportaciones) se comprimen a medida que salen,
+sin esperar al final.
+"""
+from django.conf import settings
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+BROTLI, GZIP = 'br', 'gzip'
+
+
+def configuracion():
+    return {'MINIMO_BYTES': 1024, 'CALIDAD_BROTLI': 4, **getattr(settings, 'API_COMPRESION', {})}
+
+
+def codificaciones_aceptadas(cabecera):
+    """{codificación: q} de un Accept-Encoding."""
+    aceptadas = {}
+    for parte in cabecera.split(','):
+        nombre, _, parametros = parte.partition(';')
+        nombre = nombre.strip().lower()
+        if not nombre:
+            continue
+        q = 1.0
+        for parametro in parametros.split(';'):
+            clave, _, valor = parametro.partition('=')
+            if clave.strip().lower() == 'q':
+                try:
+                    q = float(valor)
+                except ValueError:
+                    q = 0.0
+        aceptadas[nombre] = q
+    return aceptadas
+
+
+def elegir_codificacion(cabecera):
+    """BROTLI, GZIP o None si el cliente no acepta ninguna."""
+    aceptadas = codificaciones_aceptadas(cabecera)
+    comodin = aceptadas.get('*', 0.0)
+    disponibles = [BROTLI, GZIP] if brotli is not None else [GZIP]
+    # max() se queda con la primera en caso de empate: brotli antes que gzip
+    elegida = max(disponibles, key=lambda nombre: aceptadas.get(nombre, comodin))
+    return elegida if aceptadas.get(elegida, comodin) > 0 else None
+
+
+# Bytes sin comprimir tras los que se vacía el compresor en las respuestas en
+# flujo: sin flush brotli retiene todo hasta el final; con flush en cada
+# bloque pierde buena parte de la compresión.
+BYTES_POR_FLUSH = 64 * 1024
+
+
+class _BrotliEnFlujo:
+    def __init__(self, calidad):
+        self.compresor = brotli.Compressor(quality=calidad)
+        self.pendientes = 0
+
+    def bloque(self, datos):
+        salida = self.compresor.process(datos)
+        self.pendientes += len(datos)
+        if self.pendientes >= BYTES_POR_FLUSH:
+            salida += self.compresor.flush()
+            self.pendientes = 0
+        return salida
+
+
+def _brotli_en_flujo(bloques, calidad):
+    flujo = _BrotliEnFlujo(calidad)
+    for bloque in bloques:
+        datos = flujo.bloque(bloque)
+        if datos:
+            yield datos
+    yield flujo.compresor.finish()
+
+
+async def _abrotli_en_flujo(bloques, calidad):
+    flujo = _BrotliEnFlujo(calidad)
+    async for bloque in bloques:
+        datos = flujo.bloque(bloque)
+        if datos:
+            yield datos
+    yield flujo.compresor.finish()
+
+
+class CompresionMiddleware(GZipMiddleware):
+    def process_response(self, request, response):
+        if response.has_header('Content-Encoding'):
+            return response
+        config = configuracion()
+        if not response.streaming and len(response.content) < config['MINIMO_BYTES']:
+            return response
+
+        codificacion = elegir_codificacion(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if codificacion == GZIP:
+            return super().process_response(request, response)
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if codificacion is None:
+            return response
+
+        calidad = config['CALIDAD_BROTLI']
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = _abrotli_en_flujo(response.streaming_content, calidad)
+            else:
+                response.streaming_content = _brotli_en_flujo(response.streaming_content, calidad)
+            del response.headers['Content-Length']
+        else:
+            comprimido = brotli.compress(response.content, quality=calidad)
+            if len(comprimido) >= len(response.content):
+                return response
+            response.content = comprimido
+            response.headers['Content-Length'] = str(len(comprimido))
+
+        # Igual que GZipMiddleware: un ETag fuerte pasa a débil
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = BROTLI
+        return response
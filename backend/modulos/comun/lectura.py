@@ -0,0 +1,168 @@
+"""
+Listados de solo lectura sin instancias de modelo.
+
+En un listado de 100 filas, ModelSerializer pasa la mayor parte del tiempo
+armando instancias y recorriendo campo por campo con get_attribute. Con
+LecturaRapidaMixin el listado lee con values() (las relaciones que muestra
+el serializer van como joins en la misma consulta) y convierte cada fila con
+una lista de conversores armada una vez por petición, a partir de los
+campos del serializer (después de ?fields= / ?exclude=).
+
+La salida es la misma del serializer: cada conversor es el
+to_representation del propio campo, salvo los que devuelven el valor tal
+cual. Si algún campo no se puede leer desde una columna (un
+SerializerMethodField, un serializer anidado, una relación que puede ser
+nula a mitad de camino...) el listado sigue por el camino normal.
+
+El COUNT de la paginación por números se hace sobre el queryset filtrado,
+sin los joins de las columnas relacionadas (no cambian el total: solo se
+leen rutas que no pueden ser nulas). Para eso la paginación del ViewSet
+lleva ConteoRapidoMixin.
+
+API_LECTURA_RAPIDA = False lo desactiva en todos los ViewSets (p. ej. para
+comparar con medir_api).
+"""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.core.paginator import Paginator
+from django.utils.functional import cached_property
+from rest_framework import serializers
+from rest_framework.response import Response
+
+from .campos import columnas_de_campo
+
+# Campos cuyo to_representation devuelve el valor de la columna sin cambios
+_SIN_CONVERSION = {
+    clase.to_representation for clase in (serializers.IntegerField, serializers.CharField, serializers.BooleanField)
+}
+
+
+def _ruta_segura(modelo, columna):
+    """False si algún tramo intermedio de la ruta puede ser nulo: ahí DRF omite el campo."""
+    partes = columna.split('__')
+    for parte in partes[:-1]:
+        campo = modelo._meta.get_field(parte)
+        if campo.null:
+            return False
+        modelo = campo.related_model
+    return True
+
+
+def _conversor(campo):
+    if isinstance(campo, serializers.PrimaryKeyRelatedField):
+        # values() ya trae el id de la FK
+        if campo.pk_field is None:
+            return None
+        representar = campo.pk_field.to_representation
+    elif type(campo).to_representation in _SIN_CONVERSION:
+        return None
+    else:
+        representar = campo.to_representation
+    # Igual que Serializer.to_representation: None se deja como None
+    return lambda valor: None if valor is None else representar(valor)
+
+
+def compilar(serializer, modelo):
+    """
+    [(nombre, columna, conversor)] para los campos legibles del serializer,
+    o None si alguno no sale de una columna.
+    """
+    mapeo = []
+    for campo in serializer.fields.values():
+        if campo.write_only:
+            continue
+        if isinstance(campo, serializers.RelatedField) and not isinstance(campo, serializers.PrimaryKeyRelatedField):
+            return None
+        traducido = columnas_de_campo(modelo, campo, {})
+        if traducido is None or traducido[2] or len(traducido[0]) != 1:
+            return None
+        columna = traducido[0][0]
+        try:
+            if not _ruta_segura(modelo, columna):
+                return None
+        except FieldDoesNotExist:
+            return None
+        mapeo.append((campo.field_name, columna, _conversor(campo)))
+    return mapeo
+
+
+def convertir(filas, mapeo):
+    return [
+        {
+            nombre: fila[columna] if conversor is None else conversor(fila[columna])
+            for nombre, columna, conversor in mapeo
+        }
+        for fila in filas
+    ]
+
+
+class PaginatorConteo(Paginator):
+    """Paginator de Django cuyo total sale de otro queryset."""
+    def __init__(self, object_list, per_page, queryset_conteo, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.queryset_conteo = queryset_conteo
+
+    @cached_property
+    def count(self):
+        return self.queryset_conteo.count()
+
+
+class ConteoRapidoMixin:
+    """
+    Para las PageNumberPagination de ViewSets con LecturaRapidaMixin: cuenta
+    sobre view.queryset_conteo cuando el listado rápido lo dejó.
+    """
+    def paginate_queryset(self, queryset, request, view=None):
+        self.queryset_conteo = getattr(view, 'queryset_conteo', None)
+        return super().paginate_queryset(queryset, request, view)
+
+    def django_paginator_class(self, object_list, per_page):
+        if self.queryset_conteo is None:
+            return Paginator(object_list, per_page)
+        return PaginatorConteo(object_list, per_page, self.queryset_conteo)
+
+
+class LecturaRapidaMixin:
+    """
+    list (y alist) con values() y conversores precompilados. Va antes de
+    LecturaAsincronaMixin y CamposDinamicosMixin en las bases del ViewSet.
+
+    Las columnas de campos_requeridos y la pk se leen siempre (las usa la
+    paginación por cursor) aunque no se muestren.
+    """
+    # Queryset sin columnas para el COUNT de la paginación (ver ConteoRapidoMixin)
+    queryset_conteo = None
+
+    def mapeo_rapido(self):
+        if not getattr(settings, 'API_LECTURA_RAPIDA', True):
+            return None
+        return compilar(self.get_serializer(), self.get_queryset().model)
+
+    def list(self, request, *args, **kwargs):
+        mapeo = self.mapeo_rapido()
+        if mapeo is None:
+            return super().list(request, *args, **kwargs)
+        return self.listar_rapido(mapeo)
+
+    async def alist(self, request, *args, **kwargs):
+        mapeo = self.mapeo_rapido()
+        if mapeo is None:
+            return await super().alist(request, *args, **kwargs)
+        return await sync_to_async(self.listar_rapido)(mapeo)
+
+    def listar_rapido(self, mapeo):
+        queryset = self.filter_queryset(self.get_queryset())
+        modelo = queryset.model
+        columnas = dict.fromkeys([
+            modelo._meta.pk.name,
+            *getattr(self, 'campos_requeridos', ()),
+            *(columna for _, columna, _ in mapeo),
+        ])
+        # values() descarta only() y select_related: los joins salen de las columnas
+        filas = queryset.values(*columnas)
+        self.queryset_conteo = queryset
+        pagina = self.paginate_queryset(filas)
+        if pagina is None:
+            return Response(convertir(filas, mapeo))
+        return self.get_paginated_response(convertir(pagina, mapeo))
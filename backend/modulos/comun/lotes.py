@@ -0,0 +1,181 @@
+"""
+Operaciones en lote (crear, actualizar y eliminar) en una sola petición.
+
+    POST .../lote/
+    {"operaciones": [
+        {"op": "crear", "datos": {...}},
+        {"op": "actualizar", "id": 12, "datos": {...}},
+        {"op": "eliminar", "id": 15}
+    ]}
+
+Todas las operaciones se validan antes de tocar nada: las filas existentes
+y las relaciones (FK) se cargan con una consulta por tabla, no por ítem. Si
+alguna falla, se responde 400 con el resultado de cada ítem y no se aplica
+ninguna. Si todas son válidas se aplican en una transacción con
+bulk_create, bulk_update y un único DELETE, y la bitácora recibe una
+entrada por fila (con los campos cambiados), escritas juntas.
+"""
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from rest_framework import serializers, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from modulos.bitacora.auditoria import auditoria
+
+OPERACIONES = ('crear', 'actualizar', 'eliminar')
+MAX_OPERACIONES = 500
+
+
+class RelacionPrecargada(serializers.PrimaryKeyRelatedField):
+    """
+    PrimaryKeyRelatedField que, dentro de un lote, resuelve el id desde los
+    objetos ya cargados en context['relaciones'] en vez de hacer un get() por ítem.
+    Fuera de un lote se comporta igual que PrimaryKeyRelatedField.
+    """
+    def to_internal_value(self, data):
+        cargados = self.context.get('relaciones', {}).get(self.field_name)
+        if cargados is None:
+            return super().to_internal_value(data)
+        try:
+            pk = self.get_queryset().model._meta.pk.to_python(data)
+        except (TypeError, ValueError, DjangoValidationError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        if pk not in cargados:
+            self.fail('does_not_exist', pk_value=data)
+        return cargados[pk]
+
+
+def _pk(modelo, valor):
+    try:
+        return modelo._meta.pk.to_python(valor)
+    except (TypeError, ValueError, DjangoValidationError):
+        return None
+
+
+class LoteMixin:
+    lote_max_operaciones = MAX_OPERACIONES
+
+    @action(detail=False, methods=['post'])
+    def lote(self, request, *args, **kwargs):
+        operaciones = request.data.get('operaciones') if isinstance(request.data, dict) else request.data
+        if not isinstance(operaciones, list) or not operaciones:
+            raise ValidationError({'operaciones': 'Se espera una lista de operaciones.'})
+        if len(operaciones) > self.lote_max_operaciones:
+            raise ValidationError({'operaciones': f'Máximo {self.lote_max_operaciones} operaciones por lote.'})
+
+        validas, resultados = self.validar_lote(operaciones)
+        if len(validas) != len(operaciones):
+            return Response({'resultados': resultados}, status=status.HTTP_400_BAD_REQUEST)
+
+        with transaction.atomic(), auditoria.agrupada():
+            # bulk_* no disparan señales; el DELETE en cascada sí, fila por fila
+            with auditoria.suspendida():
+                nuevos, actualizados, eliminados = self.aplicar_lote(validas)
+            self.registrar_lote(nuevos, actualizados, eliminados)
+
+        creados = iter(nuevos)
+        for indice, tipo, instancia, serializer in validas:
+            if tipo == 'crear':
+                instancia = next(creados)
+            resultados[indice] = {'indice': indice, 'op': tipo, 'estado': 'ok', 'id': instancia.pk}
+            if serializer is not None:
+                resultados[indice]['datos'] = serializer.to_representation(instancia)
+        return Response({'resultados': resultados})
+
+    def validar_lote(self, operaciones):
+        modelo = self.get_queryset().model
+        ids = {
+            _pk(modelo, op.get('id')) for op in operaciones
+            if isinstance(op, dict) and op.get('op') in ('actualizar', 'eliminar')
+        }
+        ids.discard(None)
+        existentes = self.get_queryset().in_bulk(ids)
+
+        contexto = self.get_serializer_context()
+        contexto['relaciones'] = self.precargar_relaciones(operaciones)
+        clase = self.get_serializer_class()
+
+        validas, resultados, vistos = [], [], set()
+        for indice, op in enumerate(operaciones):
+            tipo = op.get('op') if isinstance(op, dict) else None
+            errores, instancia, serializer = {}, None, None
+            if tipo not in OPERACIONES:
+                errores['op'] = f"Debe ser una de: {', '.join(OPERACIONES)}."
+            elif tipo != 'crear':
+                pk = _pk(modelo, op.get('id'))
+                instancia = existentes.get(pk)
+                if instancia is None:
+                    errores['id'] = 'No existe.'
+                elif pk in vistos:
+                    errores['id'] = 'Repetido en el lote.'
+                vistos.add(pk)
+            if not errores and tipo != 'eliminar':
+                datos = op.get('datos')
+                if not isinstance(datos, dict):
+                    errores['datos'] = 'Se espera un objeto.'
+                else:
+                    serializer = clase(instancia, data=datos, partial=tipo == 'actualizar', context=contexto)
+                    if not serializer.is_valid():
+                        errores = serializer.errors
+
+            if errores:
+                resultados.append({'indice': indice, 'op': tipo, 'estado': 'error', 'errores': errores})
+            else:
+                resultados.append({'indice': indice, 'op': tipo, 'estado': 'valida'})
+                validas.append((indice, tipo, instancia, serializer))
+        return validas, resultados
+
+    def precargar_relaciones(self, operaciones):
+        """Carga de una vez los objetos referenciados por cada FK del serializer."""
+        relaciones = {}
+        for nombre, campo in self.get_serializer_class()().fields.items():
+            if not isinstance(campo, RelacionPrecargada) or campo.read_only:
+                continue
+            modelo = campo.get_queryset().model
+            valores = {
+                _pk(modelo, op['datos'][nombre]) for op in operaciones
+                if isinstance(op, dict) and isinstance(op.get('datos'), dict) and op['datos'].get(nombre) is not None
+            }
+            valores.discard(None)
+            relaciones[nombre] = campo.get_queryset().in_bulk(valores) if valores else {}
+        return relaciones
+
+    def aplicar_lote(self, validas):
+        modelo = self.get_queryset().model
+        nuevos = [modelo(**serializer.validated_data) for _, tipo, _, serializer in validas if tipo == 'crear']
+        actualizados, campos = [], set()
+        for _, tipo, instancia, serializer in validas:
+            if tipo == 'actualizar':
+                for campo, valor in serializer.validated_data.items():
+                    setattr(instancia, campo, valor)
+                    campos.add(campo)
+                actualizados.append(instancia)
+        eliminados = [instancia for _, tipo, instancia, _ in validas if tipo == 'eliminar']
+
+        if nuevos:
+            modelo.objects.bulk_create(nuevos)
+        if actualizados:
+            # bulk_update no llama a pre_save: los auto_now se asignan a mano
+            for campo in modelo._meta.concrete_fields:
+                if getattr(campo, 'auto_now', False):
+                    for instancia in actualizados:
+                        campo.pre_save(instancia, add=False)
+                    campos.add(campo.name)
+            if campos:
+                modelo.objects.bulk_update(actualizados, campos)
+        if eliminados:
+            modelo.objects.filter(pk__in=[instancia.pk for instancia in eliminados]).delete()
+        return nuevos, actualizados, eliminados
+
+    def registrar_lote(self, nuevos, actualizados, eliminados):
+        for instancia in nuevos:
+            auditoria.emitir(instancia, 'C')
+        for instancia in actualizados:
+            # Las instancias guardan los valores con que se cargaron: solo se registra lo que cambió
+            cambios = auditoria.cambios(instancia) if auditoria.esta_registrado(type(instancia)) else None
+            if cambios is None or cambios:
+                auditoria.emitir(instancia, 'M', cambios)
+        for instancia in eliminados:
+            auditoria.emitir(instancia, 'E')
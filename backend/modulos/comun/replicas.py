@@ -0,0 +1,103 @@
+"""
+Router de base de datos con réplica de lectura.
+
+Las lecturas de peticiones GET/HEAD a /api/* van al alias de lectura
+(BASES_REPLICA['ALIAS']) y todo lo demás a 'default': escrituras, lecturas
+dentro de una transacción, comandos, el escritor de la bitácora y la propia
+autenticación (que corre antes de conocer al usuario).
+
+Lee-tus-escrituras: cuando un usuario escribe, queda fijado a la primaria
+durante BASES_REPLICA['FIJACION'] segundos, así su próxima lectura no llega
+a una réplica que todavía no recibió el cambio. La marca vive en la caché
+(ver CACHES en settings).
+
+Lo que se guarda en una caché bajo la versión actual de un catálogo se lee
+dentro de leer_de_primaria(): leído de una réplica atrasada justo después
+de invalidar, el dato viejo quedaría guardado con la versión nueva hasta la
+próxima invalidación.
+
+Si el alias de lectura no está en DATABASES, el router no hace nada.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils.functional import SimpleLazyObject
+
+from modulos.usuarios.middleware import get_current_request
+
+METODOS_LECTURA = ('GET', 'HEAD')
+
+_primaria = ContextVar('leer_de_primaria', default=False)
+
+
+def _config():
+    return {'ALIAS': 'replica', 'FIJACION': 5, 'PREFIJO_RUTA': '/api/', **getattr(settings, 'BASES_REPLICA', {})}
+
+
+def _clave_fijacion(id_usuario):
+    return f'replica:fijado:{id_usuario}'
+
+
+def _usuario_autenticado(request):
+    # DRF deja el usuario en la HttpRequest al autenticar; antes de eso solo
+    # está el SimpleLazyObject de AuthenticationMiddleware (sesión)
+    usuario = request.__dict__.get('user')
+    if usuario is None or type(usuario) is SimpleLazyObject or not usuario.is_authenticated:
+        return None
+    return usuario
+
+
+def fijar_a_primaria(id_usuario):
+    cache.set(_clave_fijacion(id_usuario), True, _config()['FIJACION'])
+
+
+@contextmanager
+def leer_de_primaria():
+    """Las lecturas del bloque van a 'default' aunque la petición pueda usar la réplica."""
+    token = _primaria.set(True)
+    try:
+        yield
+    finally:
+        _primaria.reset(token)
+
+
+class RouterReplicas:
+    def db_for_read(self, model, **hints):
+        config = _config()
+        alias = config['ALIAS']
+        if alias not in settings.DATABASES:
+            return None
+        request = get_current_request()
+        if (
+            request is None
+            or _primaria.get()
+            or request.method not in METODOS_LECTURA
+            or not request.path.startswith(config['PREFIJO_RUTA'])
+            # Dentro de una transacción se lee lo que la transacción ve
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return None
+        usuario = _usuario_autenticado(request)
+        if usuario is None or cache.get(_clave_fijacion(usuario.pk)):
+            return None
+        return alias
+
+    def db_for_write(self, model, **hints):
+        request = get_current_request()
+        if request is not None and not getattr(request, '_fijada_primaria', False):
+            usuario = _usuario_autenticado(request)
+            if usuario is not None:
+                fijar_a_primaria(usuario.pk)
+                request._fijada_primaria = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Primaria y réplica tienen los mismos datos
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # La réplica recibe el esquema por replicación, no por migrate
+        return db != _config()['ALIAS']
@@ -1,3 +1,5 @@
 from django.contrib import admin
+from modulos.invitados.models import PaseInvitado
 
 # Register your models here.
+admin.site.register(PaseInvitado)
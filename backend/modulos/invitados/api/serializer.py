@@ -0,0 +1,48 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import serializers
+from modulos.invitados.models import PaseInvitado
+from modulos.invitados.tokens import generar_token
+
+
+def horas_maximas():
+    return getattr(settings, 'INVITADOS_DURACION_MAXIMA_HORAS', 72)
+
+
+class PaseInvitadoSerializer(serializers.ModelSerializer):
+    numero_unidad = serializers.CharField(source='propiedad.numero_unidad', read_only=True)
+    token = serializers.SerializerMethodField()
+
+    class Meta:
+        model = PaseInvitado
+        fields = '__all__'
+        read_only_fields = ('revocado',)
+
+    def get_token(self, obj):
+        # Un pase revocado no vuelve a entregar su token
+        return None if obj.revocado else generar_token(obj)
+
+    def validate(self, attrs):
+        residente = attrs['residente']
+        propiedad = attrs['propiedad']
+        if residente.estado != 'A':
+            raise serializers.ValidationError({'residente': 'El residente está dado de baja.'})
+        if residente.idPropiedad_id != propiedad.id:
+            raise serializers.ValidationError({'residente': 'El residente no vive en esa propiedad.'})
+        desde = attrs.get('valido_desde') or timezone.now()
+        hasta = attrs['valido_hasta']
+        if hasta <= desde:
+            raise serializers.ValidationError({'valido_hasta': 'Debe ser posterior a valido_desde.'})
+        if hasta - desde > timedelta(hours=horas_maximas()):
+            raise serializers.ValidationError(
+                {'valido_hasta': f'Un pase dura como máximo {horas_maximas()} horas.'}
+            )
+        if hasta <= timezone.now():
+            raise serializers.ValidationError({'valido_hasta': 'El pase ya estaría vencido.'})
+        return attrs
+
+
+class ValidarPaseSerializer(serializers.Serializer):
+    token = serializers.CharField()
@@ -0,0 +1,10 @@
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+from modulos.invitados.api.views import PaseInvitadoViewSet
+
+router = DefaultRouter()
+router.register(r'pases', PaseInvitadoViewSet, basename='pases')
+
+urlpatterns = [
+    path('', include(router.urls)),
+]
@@ -0,0 +1,80 @@
+from datetime import datetime
+
+from django.utils import timezone
+from rest_framework import filters, mixins, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from modulos.comun.campos import CamposDinamicosMixin
+from modulos.invitados.models import PaseInvitado
+from modulos.invitados.tokens import validar_token
+from .serializer import PaseInvitadoSerializer, ValidarPaseSerializer
+
+
+class StandardResultsSetPagination(PageNumberPagination):
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class PaseInvitadoViewSet(CamposDinamicosMixin,
+                          mixins.CreateModelMixin,
+                          mixins.RetrieveModelMixin,
+                          mixins.ListModelMixin,
+                          viewsets.GenericViewSet):
+    """
+    Pases de invitado. No se editan ni se borran: el token ya entregado
+    lleva la ventana de validez, así que un pase solo puede revocarse.
+    """
+    queryset = PaseInvitado.objects.select_related('propiedad').order_by('-valido_desde', '-id')
+    serializer_class = PaseInvitadoSerializer
+    pagination_class = StandardResultsSetPagination
+    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    search_fields = ['nombre_invitado', 'ci_invitado', 'propiedad__numero_unidad']
+    ordering_fields = ['valido_desde', 'valido_hasta']
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        propiedad = self.request.query_params.get('propiedad')
+        if propiedad:
+            if not propiedad.isdigit():
+                raise ValidationError({'propiedad': 'Debe ser un id.'})
+            queryset = queryset.filter(propiedad_id=propiedad)
+        if self.request.query_params.get('vigentes') in ('1', 'true'):
+            queryset = queryset.filter(revocado=False, valido_hasta__gt=timezone.now())
+        return queryset
+
+    def perform_create(self, serializer):
+        serializer.save(creado_por=self.request.user)
+
+    @action(detail=True, methods=['post'])
+    def revocar(self, request, pk=None):
+        pase = self.get_object()
+        if not pase.revocado:
+            pase.revocado = True
+            pase.fecha_revocacion = timezone.now()
+            pase.save(update_fields=['revocado', 'fecha_revocacion'])
+        return Response(self.get_serializer(pase).data)
+
+    @action(detail=False, methods=['post'])
+    def validar(self, request):
+        """
+        Portería: valida el token, en general sin consultar la base (ver
+        tokens.py). Responde siempre 200 con valido true/false y el motivo
+        del rechazo.
+        """
+        entrada = ValidarPaseSerializer(data=request.data)
+        entrada.is_valid(raise_exception=True)
+        valido, motivo, datos = validar_token(entrada.validated_data['token'])
+        respuesta = {'valido': valido, 'motivo': motivo}
+        if datos is not None:
+            respuesta['pase'] = {
+                'id': datos['id'],
+                'propiedad': datos['p'],
+                'numero_unidad': datos['u'],
+                'nombre_invitado': datos['n'],
+                'valido_desde': datetime.fromtimestamp(datos['d']),
+                'valido_hasta': datetime.fromtimestamp(datos['h']),
+            }
+        return Response(respuesta, status=status.HTTP_200_OK)
@@ -3,4 +3,10 @@ from django.apps import AppConfig
 
 class InvitadosConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'invitados'
+    name = 'modulos.invitados'
+
+    def ready(self):
+        import modulos.invitados.signals
+        from modulos.bitacora.auditoria import auditoria
+        from .models import PaseInvitado
+        auditoria.registrar(PaseInvitado)
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.6 on 2026-10-18 06:42
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('propiedades', '0005_propiedad_numero_residentes'),
+        ('residentes', '0007_vehiculo_placa_normalizada_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PaseInvitado',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('nombre_invitado', models.CharField(max_length=80)),
+                ('ci_invitado', models.CharField(blank=True, max_length=12)),
+                ('valido_desde', models.DateTimeField(default=django.utils.timezone.now)),
+                ('valido_hasta', models.DateTimeField()),
+                ('revocado', models.BooleanField(default=False)),
+                ('fecha_revocacion', models.DateTimeField(blank=True, editable=False, null=True)),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True)),
+                ('creado_por', models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+                ('propiedad', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pases', to='propiedades.propiedad')),
+                ('residente', models.ForeignKey(help_text='Residente que invita.', on_delete=django.db.models.deletion.CASCADE, related_name='pases', to='residentes.residente')),
+            ],
+            options={
+                'verbose_name': 'Pase de invitado',
+                'verbose_name_plural': 'Pases de invitados',
+                'indexes': [models.Index(condition=models.Q(('revocado', False)), fields=['valido_hasta'], name='pase_habilitado_vigente_idx'), models.Index(fields=['propiedad', 'valido_hasta'], name='pase_propiedad_hasta_idx')],
+            },
+        ),
+    ]
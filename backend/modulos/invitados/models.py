@@ -1,3 +1,35 @@
+from django.contrib.auth import get_user_model
 from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+from modulos.propiedades.models import Propiedad
+from modulos.residentes.models import Residente
 
-# Create your models here.
+User = get_user_model()
+
+
+class PaseInvitado(models.Model):
+    id = models.AutoField(primary_key=True)
+    propiedad = models.ForeignKey(Propiedad, on_delete=models.CASCADE, related_name='pases')
+    residente = models.ForeignKey(Residente, on_delete=models.CASCADE, related_name='pases',
+                                  help_text="Residente que invita.")
+    nombre_invitado = models.CharField(max_length=80)
+    ci_invitado = models.CharField(max_length=12, blank=True)
+    valido_desde = models.DateTimeField(default=timezone.now)
+    valido_hasta = models.DateTimeField()
+    revocado = models.BooleanField(default=False)
+    fecha_revocacion = models.DateTimeField(null=True, blank=True, editable=False)
+    creado_por = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, editable=False)
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Pase de invitado"
+        verbose_name_plural = "Pases de invitados"
+        indexes = [
+            # Conjunto de pases habilitados que la portería tiene en memoria (ver tokens.py)
+            models.Index(fields=['valido_hasta'], name='pase_habilitado_vigente_idx', condition=Q(revocado=False)),
+            models.Index(fields=['propiedad', 'valido_hasta'], name='pase_propiedad_hasta_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.nombre_invitado} - {self.propiedad} ({self.valido_desde:%d/%m %H:%M} a {self.valido_hasta:%d/%m %H:%M})"
@@ -0,0 +1,17 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .models import PaseInvitado
+from .tokens import invalidar_habilitados
+
+
+@receiver(post_save, sender=PaseInvitado)
+def pase_guardado(sender, instance, created, **kwargs):
+    # Un pase nuevo se confirma con una consulta hasta la próxima recarga: solo importan las revocaciones
+    if not created:
+        invalidar_habilitados()
+
+
+@receiver(post_delete, sender=PaseInvitado)
+def pase_eliminado(sender, instance, **kwargs):
+    # El token sigue teniendo firma válida: tiene que salir del conjunto de habilitados
+    invalidar_habilitados()
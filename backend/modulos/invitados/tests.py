@@ -1,3 +1,125 @@
-from django.test import TestCase
+import time
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core import signing
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from modulos.propiedades.models import Propiedad
+from modulos.residentes.models import Residente
+from . import tokens
+from .models import PaseInvitado
+
+
+# Las entradas de bitácora se escriben dentro de la transacción del test, sin el hilo de fondo
+SINCRONO = override_settings(BITACORA_ESCRITOR={'MODO': 'sincrono'})
+
+
+class PaseMixin:
+    @classmethod
+    def setUpTestData(cls):
+        cls.propiedad = Propiedad.objects.create(numero_unidad='A-101', direccion='Calle Yotaú # 12')
+        cls.residente = Residente.objects.create(ci='1234567', nombre='Ana', apPaterno='Rojas', idPropiedad=cls.propiedad)
+
+    def setUp(self):
+        tokens.habilitados.limpiar()
+
+    def crear_pase(self, **datos):
+        ahora = timezone.now()
+        datos = {'valido_desde': ahora - timedelta(hours=1), 'valido_hasta': ahora + timedelta(hours=2), **datos}
+        return PaseInvitado.objects.create(
+            propiedad=self.propiedad, residente=self.residente, nombre_invitado='Luis Vaca', **datos
+        )
+
+
+@SINCRONO
+class TokenTests(PaseMixin, TestCase):
+    def test_token_valido(self):
+        pase = self.crear_pase()
+        valido, motivo, datos = tokens.validar_token(tokens.generar_token(pase))
+        self.assertTrue(valido)
+        self.assertIsNone(motivo)
+        self.assertEqual((datos['id'], datos['u'], datos['n']), (pase.id, 'A-101', 'Luis Vaca'))
+
+    def test_token_alterado(self):
+        token = tokens.generar_token(self.crear_pase())
+        cuerpo, firma = token.rsplit(':', 1)
+        alterados = [
+            cuerpo[:-1] + ('A' if cuerpo[-1] != 'A' else 'B') + ':' + firma,
+            cuerpo + ':' + firma[:-1] + ('A' if firma[-1] != 'A' else 'B'),
+            signing.dumps({'id': 1, 'd': 0, 'h': 2 ** 40}, salt='otra-sal'),
+            'basura',
+        ]
+        for token in alterados:
+            with self.subTest(token=token):
+                self.assertEqual(tokens.validar_token(token)[:2], (False, tokens.FIRMA_INVALIDA))
+
+    def test_ventana_de_validez(self):
+        pase = self.crear_pase()
+        token = tokens.generar_token(pase)
+        desde, hasta = pase.valido_desde.timestamp(), pase.valido_hasta.timestamp()
+        self.assertEqual(tokens.validar_token(token, ahora=desde - 1)[1], tokens.NO_VIGENTE_AUN)
+        self.assertTrue(tokens.validar_token(token, ahora=desde + 1)[0])
+        self.assertEqual(tokens.validar_token(token, ahora=hasta)[1], tokens.VENCIDO)
+        self.assertEqual(tokens.validar_token(token, ahora=hasta + 3600)[1], tokens.VENCIDO)
+
+    def test_pase_revocado(self):
+        pase = self.crear_pase()
+        token = tokens.generar_token(pase)
+        self.assertTrue(tokens.validar_token(token)[0])
+        with self.captureOnCommitCallbacks(execute=True):
+            pase.revocado = True
+            pase.save()
+        self.assertEqual(tokens.validar_token(token)[:2], (False, tokens.REVOCADO))
+
+    def test_pase_borrado(self):
+        pase = self.crear_pase()
+        token = tokens.generar_token(pase)
+        self.assertTrue(tokens.validar_token(token)[0])
+        with self.captureOnCommitCallbacks(execute=True):
+            pase.delete()
+        self.assertEqual(tokens.validar_token(token)[:2], (False, tokens.REVOCADO))
+
+    def test_pase_creado_despues_de_la_carga(self):
+        self.assertTrue(tokens.validar_token(tokens.generar_token(self.crear_pase()))[0])
+        nuevo = self.crear_pase()
+        self.assertTrue(tokens.validar_token(tokens.generar_token(nuevo))[0])
+
+    @override_settings(INVITADOS_RECARGA_SEGUNDOS=5)
+    def test_revocacion_en_otro_proceso_llega_en_el_plazo(self):
+        pase = self.crear_pase()
+        token = tokens.generar_token(pase)
+        self.assertTrue(tokens.validar_token(token)[0])
+        # Otro worker revoca: aquí no cambia la versión (LocMemCache es por proceso)
+        PaseInvitado.objects.filter(pk=pase.pk).update(revocado=True)
+        self.assertTrue(tokens.validar_token(token)[0])
+        ahora = time.monotonic()
+        with mock.patch.object(tokens.time, 'monotonic', return_value=ahora + 6):
+            self.assertEqual(tokens.validar_token(token)[:2], (False, tokens.REVOCADO))
+
+
+@SINCRONO
+class PaseInvitadoApiTests(PaseMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('guardia'))
+
+    def validar(self, token):
+        respuesta = self.client.post('/api/invitados/pases/validar/', {'token': token}, format='json')
+        self.assertEqual(respuesta.status_code, 200)
+        return respuesta.json()
+
+    def test_revocar_y_validar(self):
+        pase = self.crear_pase()
+        token = tokens.generar_token(pase)
+        self.assertTrue(self.validar(token)['valido'])
+        with self.captureOnCommitCallbacks(execute=True):
+            respuesta = self.client.post(f'/api/invitados/pases/{pase.id}/revocar/')
+        self.assertEqual(respuesta.status_code, 200)
+        resultado = self.validar(token)
+        self.assertEqual((resultado['valido'], resultado['motivo']), (False, tokens.REVOCADO))
+        self.assertEqual(resultado['pase']['id'], pase.id)
@@ -0,0 +1,111 @@
+"""
+Tokens firmados de los pases de invitado.
+
+El token lleva todo lo que la portería necesita mostrar (pase, unidad,
+invitado y ventana de validez) firmado con HMAC (django.core.signing, que
+compara la firma en tiempo constante). La firma y la ventana se verifican
+con el propio token; que el pase siga existiendo y no esté revocado se mira
+en un conjunto en memoria del proceso con los ids de los pases habilitados
+(no revocados y sin vencer), cargado con una consulta pequeña con índice
+parcial. Un id que no está en el conjunto (un pase creado después de la
+última carga, o uno revocado o borrado) se confirma con una consulta por pk.
+
+El conjunto se recarga cuando cambia su versión en la caché (revocar o
+borrar un pase la cambia al confirmar) y, como máximo, cada
+INVITADOS_RECARGA_SEGUNDOS.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.core import signing
+from django.utils import timezone
+
+from modulos.comun.cache import estado_catalogo, invalidar_catalogo
+from modulos.comun.replicas import leer_de_primaria
+from .models import PaseInvitado
+
+SAL = 'modulos.invitados.pase'
+
+# Motivos de rechazo
+FIRMA_INVALIDA = 'firma_invalida'
+NO_VIGENTE_AUN = 'no_vigente_aun'
+VENCIDO = 'vencido'
+REVOCADO = 'revocado'
+
+
+def _epoch(fecha):
+    return int(fecha.timestamp())
+
+
+def generar_token(pase):
+    datos = {
+        'id': pase.id,
+        'p': pase.propiedad_id,
+        'u': pase.propiedad.numero_unidad,
+        'n': pase.nombre_invitado,
+        'd': _epoch(pase.valido_desde),
+        'h': _epoch(pase.valido_hasta),
+    }
+    return signing.dumps(datos, salt=SAL, compress=True)
+
+
+def invalidar_habilitados():
+    invalidar_catalogo(PaseInvitado)
+
+
+def segundos_recarga():
+    return getattr(settings, 'INVITADOS_RECARGA_SEGUNDOS', 5)
+
+
+class Habilitados:
+    """Ids de los pases no revocados y sin vencer, por proceso."""
+    def __init__(self):
+        self._ids = frozenset()
+        self._version = None
+        self._vence = 0.0
+        self._lock = threading.Lock()
+
+    def vigente(self, id_pase):
+        version, _ = estado_catalogo(PaseInvitado)
+        # Una revocación tiene que verse en cuanto confirma: todo de la primaria
+        with leer_de_primaria():
+            if version != self._version or time.monotonic() >= self._vence:
+                with self._lock:
+                    if version != self._version or time.monotonic() >= self._vence:
+                        self._ids = frozenset(
+                            PaseInvitado.objects.filter(revocado=False, valido_hasta__gt=timezone.now())
+                            .values_list('id', flat=True)
+                        )
+                        self._version = version
+                        self._vence = time.monotonic() + segundos_recarga()
+            if id_pase in self._ids:
+                return True
+            # Creado después de la última carga, o revocado/borrado
+            return PaseInvitado.objects.filter(pk=id_pase, revocado=False).exists()
+
+    def limpiar(self):
+        with self._lock:
+            self._ids, self._version, self._vence = frozenset(), None, 0.0
+
+
+habilitados = Habilitados()
+
+
+def validar_token(token, ahora=None):
+    """
+    Devuelve (valido, motivo, datos). datos trae el contenido del token si
+    la firma es correcta, aunque el pase esté vencido o revocado.
+    """
+    try:
+        datos = signing.loads(token, salt=SAL)
+    except signing.BadSignature:
+        return False, FIRMA_INVALIDA, None
+    ahora = time.time() if ahora is None else ahora
+    if ahora < datos['d']:
+        return False, NO_VIGENTE_AUN, datos
+    if ahora >= datos['h']:
+        return False, VENCIDO, datos
+    if not habilitados.vigente(datos['id']):
+        return False, REVOCADO, datos
+    return True, None, datos
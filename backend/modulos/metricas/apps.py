@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+class MetricasConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'modulos.metricas'
+    verbose_name = 'Métricas'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+        from .middleware import instalar_envoltura
+        connection_created.connect(instalar_envoltura, dispatch_uid='metricas_contar_consultas')
@@ -0,0 +1,118 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from .registro import (
+    consultas_peticion, duracion_peticion, peticiones_total, tamano_respuesta, tiempo_db_peticion,
+)
+
+
+def metricas_habilitadas():
+    return getattr(settings, 'METRICAS_HABILITADAS', False)
+
+
+class ContadorConsultas:
+    """execute_wrapper que cuenta consultas y tiempo en la base de datos."""
+    def __init__(self):
+        self.consultas = 0
+        self.segundos = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.segundos += time.perf_counter() - inicio
+            self.consultas += 1
+
+
+# Contador de la petición en curso. Va en una ContextVar y no en un
+# execute_wrapper por hilo porque bajo ASGI las consultas corren en los
+# hilos de sync_to_async, que heredan el contexto de la petición.
+_contador = ContextVar('contador_consultas', default=None)
+
+
+def _envoltura(execute, sql, params, many, context):
+    contador = _contador.get()
+    if contador is None:
+        return execute(sql, params, many, context)
+    return contador(execute, sql, params, many, context)
+
+
+def instalar_envoltura(connection, **kwargs):
+    """Receptor de connection_created; también se llama para las conexiones ya abiertas."""
+    if _envoltura not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_envoltura)
+
+
+@contextmanager
+def contar_consultas():
+    """Cuenta las consultas hechas dentro del bloque, en todas las conexiones."""
+    for alias in connections:
+        instalar_envoltura(connections[alias])
+    contador = ContadorConsultas()
+    token = _contador.set(contador)
+    try:
+        yield contador
+    finally:
+        _contador.reset(token)
+
+
+class MetricasMiddleware:
+    """
+    Mide cada petición y la acumula por (ViewSet, acción, método).
+
+    Con METRICAS_HABILITADAS = False el middleware se descarta al arrancar
+    y no añade ningún costo.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not metricas_habilitadas():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        inicio = time.perf_counter()
+        with contar_consultas() as contador:
+            response = self.get_response(request)
+        return self.registrar(request, response, time.perf_counter() - inicio, contador)
+
+    async def __acall__(self, request):
+        inicio = time.perf_counter()
+        with contar_consultas() as contador:
+            response = await self.get_response(request)
+        return self.registrar(request, response, time.perf_counter() - inicio, contador)
+
+    def registrar(self, request, response, duracion, contador):
+        etiquetas = self.etiquetas(request)
+        duracion_peticion.observar(duracion, *etiquetas)
+        consultas_peticion.observar(contador.consultas, *etiquetas)
+        tiempo_db_peticion.observar(contador.segundos, *etiquetas)
+        if not response.streaming:
+            tamano_respuesta.observar(len(response.content), *etiquetas)
+        peticiones_total.incrementar(*etiquetas, response.status_code)
+        return response
+
+    def etiquetas(self, request):
+        metodo = request.method
+        match = getattr(request, 'resolver_match', None)
+        if match is None:
+            return ('sin_ruta', '', metodo)
+        vista = match.func
+        clase = getattr(vista, 'cls', None)
+        if clase is None:
+            return (match.view_name or vista.__name__, '', metodo)
+        # Los ViewSets guardan el mapa método -> acción en la función de la vista
+        acciones = getattr(vista, 'actions', None) or {}
+        return (clase.__name__, acciones.get(metodo.lower(), metodo.lower()), metodo)
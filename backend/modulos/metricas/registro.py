@@ -0,0 +1,168 @@
+"""
+Histogramas en memoria del proceso, exportados en formato de texto de Prometheus.
+
+Cada proceso (worker) lleva sus propios contadores; Prometheus los suma al
+consultar cada instancia por separado.
+"""
+import bisect
+import threading
+
+BUCKETS_SEGUNDOS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BUCKETS_CONSULTAS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200, 500)
+BUCKETS_BYTES = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+
+class Histograma:
+    tipo = 'histogram'
+
+    def __init__(self, nombre, descripcion, etiquetas, buckets):
+        self.nombre = nombre
+        self.descripcion = descripcion
+        self.etiquetas = tuple(etiquetas)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observar(self, valor, *valores_etiquetas):
+        indice = bisect.bisect_left(self.buckets, valor)
+        with self._lock:
+            serie = self._series.get(valores_etiquetas)
+            if serie is None:
+                # [conteo por bucket..., +Inf, suma]
+                serie = self._series[valores_etiquetas] = [0] * (len(self.buckets) + 1) + [0.0]
+            serie[indice] += 1
+            serie[-1] += valor
+
+    def exportar(self):
+        with self._lock:
+            series = {clave: list(valor) for clave, valor in self._series.items()}
+        for valores, serie in sorted(series.items()):
+            acumulado = 0
+            for limite, conteo in zip(self.buckets, serie):
+                acumulado += conteo
+                yield _linea(f'{self.nombre}_bucket', self.etiquetas + ('le',), valores + (limite,), acumulado)
+            acumulado += serie[len(self.buckets)]
+            yield _linea(f'{self.nombre}_bucket', self.etiquetas + ('le',), valores + ('+Inf',), acumulado)
+            yield _linea(f'{self.nombre}_sum', self.etiquetas, valores, serie[-1])
+            yield _linea(f'{self.nombre}_count', self.etiquetas, valores, acumulado)
+
+
+class Contador:
+    tipo = 'counter'
+
+    def __init__(self, nombre, descripcion, etiquetas):
+        self.nombre = nombre
+        self.descripcion = descripcion
+        self.etiquetas = tuple(etiquetas)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def incrementar(self, *valores_etiquetas, cantidad=1):
+        with self._lock:
+            self._series[valores_etiquetas] = self._series.get(valores_etiquetas, 0) + cantidad
+
+    def exportar(self):
+        with self._lock:
+            series = dict(self._series)
+        for valores, total in sorted(series.items()):
+            yield _linea(self.nombre, self.etiquetas, valores, total)
+
+
+class Medidor:
+    """Valor leído en el momento de exportar (p. ej. profundidad de una cola)."""
+
+    def __init__(self, nombre, descripcion, funcion, tipo='gauge'):
+        self.nombre = nombre
+        self.descripcion = descripcion
+        self.funcion = funcion
+        self.tipo = tipo
+
+    def exportar(self):
+        yield _linea(self.nombre, (), (), self.funcion())
+
+
+def _linea(nombre, etiquetas, valores, valor):
+    if not etiquetas:
+        return f'{nombre} {valor}'
+    pares = ','.join(f'{etiqueta}="{_escapar(v)}"' for etiqueta, v in zip(etiquetas, valores))
+    return f'{nombre}{{{pares}}} {valor}'
+
+
+def _escapar(valor):
+    return str(valor).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+class Registro:
+    def __init__(self):
+        self._metricas = []
+
+    def agregar(self, metrica):
+        self._metricas.append(metrica)
+        return metrica
+
+    def exportar(self):
+        lineas = []
+        for metrica in self._metricas:
+            lineas.append(f'# HELP {metrica.nombre} {metrica.descripcion}')
+            lineas.append(f'# TYPE {metrica.nombre} {metrica.tipo}')
+            lineas.extend(metrica.exportar())
+        return '\n'.join(lineas) + '\n'
+
+
+registro = Registro()
+
+ETIQUETAS_PETICION = ('vista', 'accion', 'metodo')
+
+duracion_peticion = registro.agregar(Histograma(
+    'condominio_peticion_duracion_segundos',
+    'Tiempo total de la petición por acción de ViewSet.',
+    ETIQUETAS_PETICION, BUCKETS_SEGUNDOS,
+))
+consultas_peticion = registro.agregar(Histograma(
+    'condominio_peticion_consultas_db',
+    'Consultas SQL ejecutadas por petición.',
+    ETIQUETAS_PETICION, BUCKETS_CONSULTAS,
+))
+tiempo_db_peticion = registro.agregar(Histograma(
+    'condominio_peticion_db_segundos',
+    'Tiempo acumulado en la base de datos por petición.',
+    ETIQUETAS_PETICION, BUCKETS_SEGUNDOS,
+))
+tamano_respuesta = registro.agregar(Histograma(
+    'condominio_respuesta_bytes',
+    'Tamaño del cuerpo de la respuesta.',
+    ETIQUETAS_PETICION, BUCKETS_BYTES,
+))
+peticiones_total = registro.agregar(Contador(
+    'condominio_peticiones_total',
+    'Peticiones atendidas por acción y código de estado.',
+    ETIQUETAS_PETICION + ('estado',),
+))
+
+
+def _escritor(clave, escala=1):
+    from modulos.bitacora.escritor import escritor
+    return lambda: escritor.estadisticas()[clave] * escala
+
+
+registro.agregar(Medidor(
+    'condominio_bitacora_en_cola', 'Entradas de bitácora pendientes de escribir.', _escritor('en_cola'),
+))
+registro.agregar(Medidor(
+    'condominio_bitacora_escritas_total', 'Entradas de bitácora escritas.', _escritor('escritas'), 'counter',
+))
+registro.agregar(Medidor(
+    'condominio_bitacora_descartadas_total', 'Entradas de bitácora descartadas por cola llena.',
+    _escritor('descartadas'), 'counter',
+))
+registro.agregar(Medidor(
+    'condominio_bitacora_lotes_total', 'Lotes de bitácora insertados.', _escritor('lotes'), 'counter',
+))
+registro.agregar(Medidor(
+    'condominio_bitacora_vaciado_segundos_total', 'Tiempo acumulado insertando lotes de bitácora.',
+    _escritor('latencia_total_ms', 0.001), 'counter',
+))
+registro.agregar(Medidor(
+    'condominio_bitacora_vaciado_max_segundos', 'Lote de bitácora más lento.',
+    _escritor('latencia_max_ms', 0.001),
+))
@@ -0,0 +1,28 @@
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+
+
+@override_settings(METRICAS_TOKEN=None, METRICAS_PUBLICAS=False)
+class MetricasAccesoTests(TestCase):
+    url = '/api/metricas/'
+
+    def test_anonimo_sin_configuracion(self):
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+    def test_usuario_sin_staff(self):
+        self.client.force_login(User.objects.create_user('guardia'))
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+    def test_sesion_de_staff(self):
+        self.client.force_login(User.objects.create_user('admin', is_staff=True))
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+
+    @override_settings(METRICAS_TOKEN='secreto')
+    def test_token(self):
+        self.assertEqual(self.client.get(self.url, HTTP_AUTHORIZATION='Bearer secreto').status_code, 200)
+        self.assertEqual(self.client.get(self.url, HTTP_AUTHORIZATION='Bearer otro').status_code, 403)
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+    @override_settings(METRICAS_PUBLICAS=True)
+    def test_publicas(self):
+        self.assertEqual(self.client.get(self.url).status_code, 200)
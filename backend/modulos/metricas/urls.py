@@ -0,0 +1,6 @@
+from django.urls import path
+from modulos.metricas.views import metricas
+
+urlpatterns = [
+    path('', metricas, name='metricas'),
+]
@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+
+from .registro import registro
+
+
+def autorizado(request):
+    """
+    Con METRICAS_TOKEN, el scraper manda 'Authorization: Bearer <token>'.
+    Sin token, solo una sesión de staff, salvo METRICAS_PUBLICAS = True.
+    """
+    token = getattr(settings, 'METRICAS_TOKEN', None)
+    if token:
+        enviado = request.headers.get('Authorization', '').removeprefix('Bearer ').strip()
+        if constant_time_compare(enviado, token):
+            return True
+    if request.user.is_authenticated and request.user.is_staff:
+        return True
+    return getattr(settings, 'METRICAS_PUBLICAS', False)
+
+
+def metricas(request):
+    """Expone los histogramas del proceso en formato de texto de Prometheus."""
+    if not autorizado(request):
+        return HttpResponseForbidden()
+    return HttpResponse(registro.exportar(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -1,6 +1,6 @@
 from rest_framework import serializers
 from modulos.propiedades.models import Propiedad
-from modulos.residentes.models import Residente
+from modulos.residentes.signals import ocupacion_denormalizada
 
 class PropiedadSerializer(serializers.ModelSerializer):
     # Campo personalizado para el número de residentes.
@@ -10,7 +10,23 @@ class PropiedadSerializer(serializers.ModelSerializer):
     class Meta:
         model = Propiedad
         fields = '__all__' # O puedes listar los campos que necesites: ['id', 'numero_unidad', 'numero_residentes', ...]
+        # Columnas que lee get_numero_residentes, para que ?fields= pueda podar la consulta
+        columnas_calculadas = {'numero_residentes': ['numero_residentes']}
+
+    def get_extra_kwargs(self):
+        extra = super().get_extra_kwargs()
+        if ocupacion_denormalizada():
+            # habitada la mantienen las señales de Residente; escrita a mano quedaría
+            # en desacuerdo con numero_residentes hasta el próximo recálculo
+            extra['habitada'] = {**extra.get('habitada', {}), 'read_only': True}
+        return extra
 
     def get_numero_residentes(self, obj):
-        # Filtra los residentes por la propiedad (idPropiedad) y por su estado.
-        return Residente.objects.filter(idPropiedad=obj.id, estado='A').count()
\ No newline at end of file
+        # El ViewSet anota residentes_activos en la misma consulta del listado/detalle.
+        anotado = getattr(obj, 'residentes_activos', None)
+        if anotado is not None:
+            return anotado
+        if ocupacion_denormalizada():
+            return obj.numero_residentes
+        # Instancias sin anotar (respuesta de create/update): un solo COUNT
+        return obj.residente_set.filter(estado='A').count()
@@ -1,10 +1,11 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from modulos.propiedades.api.views import PropiedadViewSet
+from modulos.propiedades.api.views import EstadisticasView, PropiedadViewSet
 
 router = DefaultRouter()
 router.register(r'propiedades', PropiedadViewSet, basename='propiedades')
 
 urlpatterns = [
+    path('estadisticas/', EstadisticasView.as_view(), name='estadisticas'),
     path('', include(router.urls)),
 ]
\ No newline at end of file
@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class PropiedadesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'modulos.propiedades'
+
+    def ready(self):
+        from modulos.bitacora.auditoria import auditoria
+        from .models import Propiedad
+        # habitada y numero_residentes los mantiene residentes/signals.py
+        auditoria.registrar(Propiedad, excluir=['habitada', 'numero_residentes'])
@@ -0,0 +1,127 @@
+"""
+Cifras del panel de administración.
+
+Cada métrica es una sola consulta agregada (GROUP BY en la base); en Python
+solo se suman los pocos grupos que devuelve. El resultado se guarda en la
+caché ESTADISTICAS_CACHE_TIMEOUT segundos, así el panel puede refrescarse
+seguido sin repetir las consultas.
+"""
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Exists, OuterRef
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import Propiedad
+
+DIAS_ACTIVIDAD = 7
+RECIENTES = 10
+
+
+def _nombres(choices):
+    return dict(choices)
+
+
+def ocupacion_propiedades():
+    from modulos.residentes.signals import ocupacion_denormalizada
+
+    queryset = Propiedad.objects.order_by()
+    if not ocupacion_denormalizada():
+        # habitada no se mantiene: se calcula en la misma consulta
+        Residente = apps.get_model('residentes', 'Residente')
+        queryset = queryset.annotate(habitada_actual=Exists(
+            Residente.objects.filter(idPropiedad=OuterRef('pk'), estado='A')
+        ))
+        columna = 'habitada_actual'
+    else:
+        columna = 'habitada'
+    nombres = _nombres(Propiedad.tipo)
+    grupos = [
+        {'tipo_propiedad': fila['tipo_propiedad'], 'nombre': nombres.get(fila['tipo_propiedad']),
+         'habitada': fila[columna], 'total': fila['total']}
+        for fila in queryset.values('tipo_propiedad', columna).annotate(total=Count('pk')).order_by('tipo_propiedad', columna)
+    ]
+    total = sum(grupo['total'] for grupo in grupos)
+    habitadas = sum(grupo['total'] for grupo in grupos if grupo['habitada'])
+    return {
+        'total': total,
+        'habitadas': habitadas,
+        'ocupacion': round(100 * habitadas / total, 1) if total else 0,
+        'por_tipo': grupos,
+    }
+
+
+def residentes_activos():
+    Residente = apps.get_model('residentes', 'Residente')
+    nombres = _nombres(Residente.tipoResidente)
+    grupos = [
+        {'tipo': fila['tipo'], 'nombre': nombres.get(fila['tipo']), 'total': fila['total']}
+        for fila in Residente.objects.filter(estado='A').order_by().values('tipo').annotate(total=Count('pk')).order_by('tipo')
+    ]
+    return {'activos': sum(grupo['total'] for grupo in grupos), 'por_tipo': grupos}
+
+
+def flota_vehiculos(top):
+    Vehiculo = apps.get_model('residentes', 'Vehiculo')
+    por_marca = list(
+        Vehiculo.objects.order_by().values('marca_id', 'marca__marca')
+        .annotate(total=Count('pk')).order_by('-total', 'marca__marca')
+    )
+    por_propiedad = (
+        Vehiculo.objects.filter(idResidente__idPropiedad__isnull=False).order_by()
+        .values('idResidente__idPropiedad', 'idResidente__idPropiedad__numero_unidad')
+        .annotate(total=Count('pk')).order_by('-total', 'idResidente__idPropiedad__numero_unidad')[:top]
+    )
+    return {
+        'total': sum(fila['total'] for fila in por_marca),
+        'por_marca': [
+            {'marca_id': fila['marca_id'], 'marca': fila['marca__marca'], 'total': fila['total']}
+            for fila in por_marca
+        ],
+        'por_propiedad': [
+            {'propiedad_id': fila['idResidente__idPropiedad'],
+             'numero_unidad': fila['idResidente__idPropiedad__numero_unidad'], 'total': fila['total']}
+            for fila in por_propiedad
+        ],
+    }
+
+
+def actividad_bitacora():
+    Bitacora = apps.get_model('bitacora', 'Bitacora')
+    ahora = timezone.now()
+    # Rangos sobre hora_fecha: los resuelve el índice (hora_fecha, id)
+    recientes = Bitacora.objects.filter(hora_fecha__gte=ahora - timedelta(days=DIAS_ACTIVIDAD)).order_by()
+    nombres = _nombres(Bitacora.tipoAccion)
+    return {
+        'ultimas_24h': [
+            {'tipo_accion': fila['tipo_accion'], 'nombre': nombres.get(fila['tipo_accion']), 'total': fila['total']}
+            for fila in recientes.filter(hora_fecha__gte=ahora - timedelta(days=1))
+            .values('tipo_accion').annotate(total=Count('pk')).order_by('tipo_accion')
+        ],
+        'por_dia': list(
+            recientes.annotate(dia=TruncDate('hora_fecha')).values('dia')
+            .annotate(total=Count('pk')).order_by('dia')
+        ),
+        'recientes': list(
+            Bitacora.objects.order_by('-hora_fecha', '-id')
+            .values('id', 'hora_fecha', 'accion_realizada', 'tipo_accion', 'usuario_id')[:RECIENTES]
+        ),
+    }
+
+
+def estadisticas(top=10):
+    clave = f'estadisticas:panel:{top}'
+    datos = cache.get(clave)
+    if datos is None:
+        datos = {
+            'generado': timezone.now(),
+            'propiedades': ocupacion_propiedades(),
+            'residentes': residentes_activos(),
+            'vehiculos': flota_vehiculos(top),
+            'bitacora': actividad_bitacora(),
+        }
+        cache.set(clave, datos, getattr(settings, 'ESTADISTICAS_CACHE_TIMEOUT', 30))
+    return datos
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from modulos.propiedades.models import Propiedad
+
+
+class Command(BaseCommand):
+    help = "Recalcula numero_residentes y habitada de todas las propiedades."
+
+    def handle(self, *args, **options):
+        total = Propiedad.objects.all().recalcular_ocupacion()
+        self.stdout.write(self.style.SUCCESS(f"{total} propiedades actualizadas"))
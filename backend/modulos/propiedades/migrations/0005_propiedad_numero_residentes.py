@@ -0,0 +1,33 @@
+# Generated by Django 5.2.6 on 2026-10-18 06:09
+
+from django.db import migrations, models
+from django.db.models import Count, Exists, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def calcular_ocupacion(apps, schema_editor):
+    Propiedad = apps.get_model('propiedades', 'Propiedad')
+    Residente = apps.get_model('residentes', 'Residente')
+    activos = Residente.objects.filter(idPropiedad=OuterRef('pk'), estado='A')
+    conteo = activos.order_by().values('idPropiedad').annotate(total=Count('pk')).values('total')
+    Propiedad.objects.update(
+        numero_residentes=Coalesce(Subquery(conteo, output_field=IntegerField()), Value(0)),
+        habitada=Exists(activos),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('propiedades', '0004_rename_tipopropiedad_propiedad_tipo_propiedad'),
+        ('residentes', '0006_residente_idpropiedad'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='propiedad',
+            name='numero_residentes',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Residentes en Alta. Se mantiene desde las señales de Residente.'),
+        ),
+        migrations.RunPython(calcular_ocupacion, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,31 @@
+from django.apps import apps
 from django.db import models
+from django.db.models import Count, Exists, IntegerField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+class PropiedadQuerySet(models.QuerySet):
+    def con_residentes_activos(self):
+        # Cuenta los residentes en Alta con una sola consulta (evita un COUNT por fila)
+        return self.annotate(
+            residentes_activos=Count('residente', filter=Q(residente__estado='A'))
+        )
+
+    def recalcular_ocupacion(self):
+        """Actualiza numero_residentes y habitada de las propiedades del queryset."""
+        Residente = apps.get_model('residentes', 'Residente')
+        activos = Residente.objects.filter(idPropiedad=OuterRef('pk'), estado='A')
+        conteo = (
+            activos.order_by()
+            .values('idPropiedad')
+            .annotate(total=Count('pk'))
+            .values('total')
+        )
+        return self.update(
+            numero_residentes=Coalesce(Subquery(conteo, output_field=IntegerField()), Value(0)),
+            habitada=Exists(activos),
+        )
 
-from django.db import models
 
 class Propiedad(models.Model):
     id = models.AutoField(primary_key=True)    
@@ -22,6 +47,14 @@ class Propiedad(models.Model):
     tipo = [('V', 'Vivienda'), ('C', 'Comercial')]
     tipo_propiedad = models.CharField(max_length=1, choices=tipo, default='V')
     habitada = models.BooleanField(default=False, help_text="Tickear si la propiedad está habitada")
+    numero_residentes = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Residentes en Alta. Se mantiene desde las señales de Residente."
+    )
+
+    objects = PropiedadQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Propiedad"
         verbose_name_plural = "Propiedades"
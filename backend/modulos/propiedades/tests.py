@@ -1,3 +1,123 @@
-from django.test import TestCase
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from modulos.residentes.models import Residente
+from .models import Propiedad
+
+URL = '/api/propiedades/propiedades/'
+
+
+def crear_residente(propiedad, estado='A', **datos):
+    return Residente.objects.create(
+        ci='1234567', nombre='Ana', apPaterno='Rojas', estado=estado, idPropiedad=propiedad, **datos
+    )
+
+
+class PropiedadListadoTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_user('admin', is_staff=True, is_superuser=True)
+        Propiedad.objects.bulk_create([
+            Propiedad(numero_unidad=f'A-{i:03d}', direccion='Calle 1') for i in range(120)
+        ])
+        propiedades = list(Propiedad.objects.order_by('id')[:60])
+        Residente.objects.bulk_create([
+            # Dos en Alta y uno de Baja en cada una de las primeras 60
+            Residente(ci='1234567', nombre='Ana', apPaterno='Rojas', estado='B' if i >= 120 else 'A', idPropiedad=p)
+            for i, p in enumerate(propiedades * 3)
+        ])
+        Propiedad.objects.all().recalcular_ocupacion()
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.usuario)
+
+    def consultas(self, page_size):
+        with CaptureQueriesContext(connection) as consultas:
+            respuesta = self.client.get(URL, {'page_size': page_size})
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(len(respuesta.json()['results']), page_size)
+        return len(consultas)
+
+    def test_consultas_constantes_por_pagina(self):
+        for denormalizada in (True, False):
+            with self.subTest(denormalizada=denormalizada), \
+                    self.settings(PROPIEDADES_OCUPACION_DENORMALIZADA=denormalizada):
+                # COUNT de la paginación y la página (con el conteo anotado si no está guardado)
+                with self.assertNumQueries(2):
+                    self.client.get(URL, {'page_size': 100})
+                self.assertEqual(self.consultas(5), self.consultas(100))
+
+    def test_conteo_igual_con_y_sin_denormalizar(self):
+        respuestas = []
+        for denormalizada in (True, False):
+            with self.settings(PROPIEDADES_OCUPACION_DENORMALIZADA=denormalizada):
+                datos = self.client.get(URL, {'page_size': 100, 'ordering': 'numero_unidad'}).json()['results']
+            respuestas.append({p['id']: p['numero_residentes'] for p in datos})
+        self.assertEqual(respuestas[0], respuestas[1])
+        self.assertEqual(sorted(set(respuestas[0].values())), [0, 2])
+
+
+@override_settings(PROPIEDADES_OCUPACION_DENORMALIZADA=True)
+class OcupacionDenormalizadaTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.casa = Propiedad.objects.create(numero_unidad='B-101', direccion='Calle 2')
+        cls.otra = Propiedad.objects.create(numero_unidad='B-102', direccion='Calle 2')
+
+    def ocupacion(self, propiedad):
+        propiedad.refresh_from_db(fields=['numero_residentes', 'habitada'])
+        return propiedad.numero_residentes, propiedad.habitada
+
+    def test_alta_y_baja(self):
+        residente = crear_residente(self.casa)
+        crear_residente(self.casa)
+        crear_residente(self.casa, estado='B')
+        self.assertEqual(self.ocupacion(self.casa), (2, True))
+
+        residente.delete()
+        self.assertEqual(self.ocupacion(self.casa), (1, True))
+
+    def test_cambio_de_estado(self):
+        residente = crear_residente(self.casa)
+        residente.estado = 'B'
+        residente.save()
+        self.assertEqual(self.ocupacion(self.casa), (0, False))
+
+        residente.estado = 'A'
+        residente.save()
+        self.assertEqual(self.ocupacion(self.casa), (1, True))
+
+    def test_mudanza(self):
+        residente = crear_residente(self.casa)
+        residente.idPropiedad = self.otra
+        residente.save()
+        self.assertEqual(self.ocupacion(self.casa), (0, False))
+        self.assertEqual(self.ocupacion(self.otra), (1, True))
+
+    def test_guardar_sin_cambios_no_recalcula(self):
+        residente = crear_residente(self.casa)
+        residente.nombre = 'Luis'
+        with self.assertNumQueries(1):
+            residente.save()
+
+    def test_habitada_y_conteo_de_solo_lectura(self):
+        cliente = APIClient()
+        cliente.force_authenticate(User.objects.create_user('admin', is_staff=True, is_superuser=True))
+        respuesta = cliente.patch(
+            f'{URL}{self.casa.pk}/', {'habitada': True, 'numero_residentes': 5}, format='json'
+        )
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual((respuesta.json()['habitada'], respuesta.json()['numero_residentes']), (False, 0))
+        self.assertEqual(self.ocupacion(self.casa), (0, False))
+
+    @override_settings(PROPIEDADES_OCUPACION_DENORMALIZADA=False)
+    def test_habitada_editable_sin_denormalizar(self):
+        cliente = APIClient()
+        cliente.force_authenticate(User.objects.create_user('admin', is_staff=True, is_superuser=True))
+        respuesta = cliente.patch(f'{URL}{self.casa.pk}/', {'habitada': True}, format='json')
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertTrue(respuesta.json()['habitada'])
@@ -0,0 +1,6 @@
+from django.apps import AppConfig
+
+class RendimientoConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'modulos.rendimiento'
+    verbose_name = 'Pruebas de rendimiento'
@@ -0,0 +1,97 @@
+"""
+Escenarios de la suite de rendimiento: una petición representativa por
+endpoint de listado, detalle y escritura de /api/*.
+
+Las rutas se completan con ids reales tomados de la base sembrada
+(ver muestras()), así el detalle y las escrituras apuntan a filas existentes.
+"""
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+from django.contrib.auth.models import User
+from modulos.bitacora.models import Bitacora
+from modulos.propiedades.models import Propiedad
+from modulos.residentes.models import MarcaVehiculo, Residente, TipoVehiculo, Vehiculo
+
+
+@dataclass
+class Escenario:
+    nombre: str
+    tipo: str                  # 'lista', 'detalle' o 'escritura'
+    metodo: str
+    ruta: str                  # admite {propiedad}, {residente}, {vehiculo}, {usuario}, ...
+    cuerpo: Optional[dict] = None
+    # Deshace el efecto de una escritura; corre fuera de la medición
+    deshacer: Optional[Callable] = field(default=None, repr=False)
+
+    def url(self, muestras):
+        return self.ruta.format(**muestras)
+
+    def datos(self, muestras):
+        if self.cuerpo is None:
+            return None
+        # '{residente}' se reemplaza por el id de la muestra (como número, no como texto)
+        return {
+            clave: muestras[valor[1:-1]] if isinstance(valor, str) and valor[:1] == '{' and valor[-1:] == '}' else valor
+            for clave, valor in self.cuerpo.items()
+        }
+
+
+def borrar_vehiculo_creado(respuesta):
+    if respuesta.status_code == 201:
+        Vehiculo.objects.filter(pk=respuesta.json()['id']).delete()
+
+
+ESCENARIOS = [
+    Escenario('propiedades-lista', 'lista', 'GET', '/api/propiedades/propiedades/?page_size=100'),
+    Escenario('propiedades-detalle', 'detalle', 'GET', '/api/propiedades/propiedades/{propiedad}/'),
+    Escenario('propiedades-editar', 'escritura', 'PATCH', '/api/propiedades/propiedades/{propiedad}/',
+              {'descripcion': 'Medición de rendimiento'}),
+
+    Escenario('residentes-lista', 'lista', 'GET', '/api/residentes/residentes/?page_size=100'),
+    Escenario('residentes-detalle', 'detalle', 'GET', '/api/residentes/residentes/{residente}/'),
+    Escenario('residentes-editar', 'escritura', 'PATCH', '/api/residentes/residentes/{residente}/',
+              {'email': 'rendimiento@correo.bo'}),
+
+    Escenario('vehiculos-lista', 'lista', 'GET', '/api/residentes/vehiculos/?page_size=100'),
+    Escenario('vehiculos-detalle', 'detalle', 'GET', '/api/residentes/vehiculos/{vehiculo}/'),
+    Escenario('vehiculos-placa', 'detalle', 'GET', '/api/residentes/vehiculos/placa/{placa}/'),
+    Escenario('vehiculos-por-residente', 'lista', 'GET', '/api/residentes/residentes/{residente}/vehiculos/'),
+    Escenario('vehiculos-crear', 'escritura', 'POST', '/api/residentes/vehiculos/',
+              {'placa': '0000TST', 'color': 'Blanco', 'marca': '{marca}', 'idTipo': '{tipo_vehiculo}',
+               'idResidente': '{residente}'},
+              deshacer=borrar_vehiculo_creado),
+
+    Escenario('tipos-vehiculo-lista', 'lista', 'GET', '/api/residentes/tipos-vehiculo/'),
+    Escenario('marcas-vehiculo-lista', 'lista', 'GET', '/api/residentes/marcas-vehiculo/'),
+
+    Escenario('bitacora-lista', 'lista', 'GET', '/api/bitacora/bitacora/?page_size=100'),
+    Escenario('bitacora-pagina-profunda', 'lista', 'GET', '/api/bitacora/bitacora/?page_size=100&page=2000'),
+    Escenario('bitacora-cursor', 'lista', 'GET', '/api/bitacora/bitacora/?page_size=100&paginacion=cursor'),
+    Escenario('bitacora-por-usuario', 'lista', 'GET', '/api/bitacora/bitacora/?page_size=100&usuario={usuario}'),
+    Escenario('bitacora-actividad', 'lista', 'GET', '/api/bitacora/actividad/?agrupar=hora&por=tipo_accion'),
+    Escenario('bitacora-detalle', 'detalle', 'GET', '/api/bitacora/bitacora/{bitacora}/'),
+
+    Escenario('usuarios-lista', 'lista', 'GET', '/api/usuarios/usuarios/?page_size=100'),
+    Escenario('usuarios-compacto', 'lista', 'GET', '/api/usuarios/usuarios/?page_size=100&compacto=1'),
+    Escenario('usuarios-detalle', 'detalle', 'GET', '/api/usuarios/usuarios/{usuario}/'),
+]
+
+
+def muestras():
+    """Ids reales para completar las rutas (la fila "del medio" de cada tabla)."""
+    def del_medio(modelo, **filtros):
+        queryset = modelo.objects.filter(**filtros).order_by('pk').values_list('pk', flat=True)
+        total = queryset.count()
+        return queryset[total // 2] if total else 0
+
+    return {
+        'propiedad': del_medio(Propiedad),
+        'residente': del_medio(Residente, estado='A'),
+        'vehiculo': del_medio(Vehiculo),
+        'placa': Vehiculo.objects.filter(pk=del_medio(Vehiculo)).values_list('placa', flat=True).first() or '0000TST',
+        'marca': del_medio(MarcaVehiculo),
+        'tipo_vehiculo': del_medio(TipoVehiculo),
+        'usuario': del_medio(User, username__startswith='bench_'),
+        'bitacora': Bitacora.objects.order_by('-hora_fecha', '-id').values_list('pk', flat=True).first() or 0,
+    }
@@ -0,0 +1,195 @@
+import json
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from modulos.comun.renderizadores import JSONRapidoRenderer, MessagePackRenderer
+from modulos.metricas.middleware import contar_consultas
+from modulos.rendimiento.escenarios import ESCENARIOS, muestras
+from modulos.rendimiento.proteccion import agregar_argumento, exigir_confirmacion
+
+BASE_POR_DEFECTO = Path(settings.BASE_DIR) / 'benchmarks' / 'base.json'
+FORMATOS = {'json': JSONRapidoRenderer, 'msgpack': MessagePackRenderer}
+REPETICIONES_FORMATO = 20
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide latencia (p50/p95/p99) y consultas SQL de cada endpoint de /api/* con "
+        "peticiones concurrentes, con bytes y tiempo de serialización en JSON y MessagePack, "
+        "y compara contra una línea base guardada."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--peticiones', type=int, default=200, help="Peticiones medidas por escenario.")
+        parser.add_argument('--concurrencia', type=int, default=8, help="Hilos que envían peticiones a la vez.")
+        parser.add_argument('--calentamiento', type=int, default=10, help="Peticiones previas no medidas.")
+        parser.add_argument('--solo', nargs='*', default=None, help="Nombres (o prefijos) de escenarios a correr.")
+        parser.add_argument('--guardar-base', nargs='?', const=str(BASE_POR_DEFECTO), default=None,
+                            help="Guarda los resultados como línea base.")
+        parser.add_argument('--comparar', nargs='?', const=str(BASE_POR_DEFECTO), default=None,
+                            help="Compara contra la línea base y falla si hay regresiones.")
+        parser.add_argument('--tolerancia', type=float, default=0.25,
+                            help="Aumento relativo de p95 aceptado antes de marcar regresión (0.25 = 25%%).")
+        parser.add_argument('--salida', default=None, help="Escribe los resultados en este archivo JSON.")
+        parser.add_argument('--formato', choices=list(FORMATOS), default='json',
+                            help="Formato pedido en las peticiones medidas (cabecera Accept).")
+        parser.add_argument('--comprimir', action='store_true',
+                            help="Envía Accept-Encoding: br, gzip; los bytes medidos son los comprimidos.")
+        agregar_argumento(parser)
+
+    def handle(self, *args, **options):
+        escenarios = [e for e in ESCENARIOS if self.seleccionado(e.nombre, options['solo'])]
+        if not escenarios:
+            raise CommandError("Ningún escenario coincide con --solo")
+        escrituras = [e.nombre for e in escenarios if e.tipo == 'escritura']
+        if escrituras:
+            exigir_confirmacion(
+                options['confirmar'],
+                f"repite escrituras ({', '.join(escrituras)}; evítelas con --solo)",
+            )
+
+        self.muestras = muestras()
+        usuario, _ = User.objects.get_or_create(username='bench_medidor')
+        # Token JWT real: la medición incluye el costo de autenticación de cada petición
+        self.token = str(RefreshToken.for_user(usuario).access_token)
+        self.local = threading.local()
+        self.cabeceras = {'HTTP_ACCEPT': FORMATOS[options['formato']].media_type}
+        if options['comprimir']:
+            self.cabeceras['HTTP_ACCEPT_ENCODING'] = 'br, gzip'
+
+        resultados = {}
+        with ThreadPoolExecutor(max_workers=options['concurrencia']) as hilos:
+            for escenario in escenarios:
+                resultados[escenario.nombre] = self.medir(escenario, hilos, options)
+                self.imprimir(escenario.nombre, resultados[escenario.nombre])
+
+        if options['salida']:
+            self.escribir(options['salida'], resultados)
+        if options['guardar_base']:
+            self.escribir(options['guardar_base'], resultados)
+            self.stdout.write(self.style.SUCCESS(f"Línea base guardada en {options['guardar_base']}"))
+        if options['comparar']:
+            self.comparar(options['comparar'], resultados, options['tolerancia'])
+
+    def seleccionado(self, nombre, solo):
+        return not solo or any(nombre.startswith(prefijo) for prefijo in solo)
+
+    def cliente(self):
+        if not hasattr(self.local, 'cliente'):
+            host = next((h for h in settings.ALLOWED_HOSTS if h not in ('*',) and not h.startswith('.')), 'localhost')
+            self.local.cliente = Client(HTTP_HOST=host, HTTP_AUTHORIZATION=f'Bearer {self.token}', **self.cabeceras)
+        return self.local.cliente
+
+    def una_peticion(self, escenario):
+        url = escenario.url(self.muestras)
+        datos = escenario.datos(self.muestras)
+        cliente = self.cliente()
+        inicio = time.perf_counter()
+        with contar_consultas() as contador:
+            if datos is None:
+                respuesta = getattr(cliente, escenario.metodo.lower())(url)
+            else:
+                respuesta = getattr(cliente, escenario.metodo.lower())(
+                    url, data=json.dumps(datos), content_type='application/json'
+                )
+        duracion = time.perf_counter() - inicio
+        contenido = b'' if respuesta.streaming else respuesta.content
+        if escenario.deshacer:
+            escenario.deshacer(respuesta)
+        return duracion, contador.consultas, len(contenido), respuesta.status_code, getattr(respuesta, 'data', None)
+
+    def medir(self, escenario, hilos, options):
+        list(hilos.map(lambda _: self.una_peticion(escenario), range(options['calentamiento'])))
+        inicio = time.perf_counter()
+        mediciones = list(hilos.map(lambda _: self.una_peticion(escenario), range(options['peticiones'])))
+        total = time.perf_counter() - inicio
+
+        duraciones = sorted(m[0] * 1000 for m in mediciones)
+        consultas = [m[1] for m in mediciones]
+        percentiles = statistics.quantiles(duraciones, n=100, method='inclusive') if len(duraciones) > 1 else duraciones * 99
+        return {
+            'tipo': escenario.tipo,
+            'peticiones': len(mediciones),
+            'errores': sum(1 for m in mediciones if m[3] >= 400),
+            'p50_ms': round(percentiles[49], 2),
+            'p95_ms': round(percentiles[94], 2),
+            'p99_ms': round(percentiles[98], 2),
+            'max_ms': round(duraciones[-1], 2),
+            'rps': round(len(mediciones) / total, 1) if total else 0,
+            'consultas_media': round(statistics.mean(consultas), 2),
+            'consultas_max': max(consultas),
+            'bytes_media': round(statistics.mean(m[2] for m in mediciones)),
+            **self.medir_formatos(mediciones[-1][4]),
+        }
+
+    def medir_formatos(self, datos):
+        """Bytes y tiempo de serialización de los datos de una respuesta en cada formato."""
+        if datos is None:
+            return {}
+        resultado = {}
+        for nombre, renderer in FORMATOS.items():
+            renderer = renderer()
+            tiempos = []
+            for _ in range(REPETICIONES_FORMATO):
+                inicio = time.perf_counter()
+                contenido = renderer.render(datos)
+                tiempos.append(time.perf_counter() - inicio)
+            resultado[f'{nombre}_bytes'] = len(contenido)
+            resultado[f'{nombre}_ms'] = round(statistics.median(tiempos) * 1000, 3)
+        return resultado
+
+    def imprimir(self, nombre, r):
+        linea = (
+            f"{nombre:<28} p50 {r['p50_ms']:>8.2f}ms  p95 {r['p95_ms']:>8.2f}ms  p99 {r['p99_ms']:>8.2f}ms  "
+            f"{r['rps']:>7.1f} req/s  consultas {r['consultas_media']:>6.1f} (max {r['consultas_max']})  "
+            f"{r['bytes_media']:>8} B"
+        )
+        if 'json_bytes' in r:
+            linea += ''.join(
+                f"  {nombre} {r[f'{nombre}_bytes']:>7} B {r[f'{nombre}_ms']:>6.3f}ms" for nombre in FORMATOS
+            )
+        if r['errores']:
+            linea += self.style.ERROR(f"  {r['errores']} errores")
+        self.stdout.write(linea)
+
+    def escribir(self, ruta, resultados):
+        ruta = Path(ruta)
+        ruta.parent.mkdir(parents=True, exist_ok=True)
+        ruta.write_text(json.dumps(resultados, indent=2, ensure_ascii=False) + '\n', encoding='utf-8')
+
+    def comparar(self, ruta, resultados, tolerancia):
+        try:
+            base = json.loads(Path(ruta).read_text(encoding='utf-8'))
+        except FileNotFoundError:
+            raise CommandError(f"No existe la línea base {ruta}; créela con --guardar-base")
+
+        regresiones = []
+        for nombre, actual in resultados.items():
+            anterior = base.get(nombre)
+            if anterior is None:
+                continue
+            # Margen absoluto de 2 ms para que el ruido en endpoints muy rápidos no cuente
+            limite = anterior['p95_ms'] * (1 + tolerancia) + 2
+            if actual['p95_ms'] > limite:
+                regresiones.append(f"{nombre}: p95 {anterior['p95_ms']}ms -> {actual['p95_ms']}ms")
+            if actual['consultas_max'] > anterior['consultas_max']:
+                regresiones.append(
+                    f"{nombre}: consultas {anterior['consultas_max']} -> {actual['consultas_max']}"
+                )
+            if actual['errores'] > anterior.get('errores', 0):
+                regresiones.append(f"{nombre}: errores {anterior.get('errores', 0)} -> {actual['errores']}")
+
+        if regresiones:
+            for regresion in regresiones:
+                self.stdout.write(self.style.ERROR(f"REGRESIÓN {regresion}"))
+            raise CommandError(f"{len(regresiones)} regresiones respecto de {ruta}")
+        self.stdout.write(self.style.SUCCESS(f"Sin regresiones respecto de {ruta}"))
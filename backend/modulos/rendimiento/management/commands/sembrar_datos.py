@@ -0,0 +1,175 @@
+import random
+import time
+
+from django.contrib.auth.models import Group, User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from modulos.bitacora.models import ResumenBitacora
+from modulos.bitacora.resumen import reconstruir
+from modulos.propiedades.models import Propiedad
+from modulos.rendimiento.proteccion import agregar_argumento, exigir_confirmacion
+from modulos.residentes.models import MarcaVehiculo, Residente, Telefono, TipoVehiculo, Vehiculo
+from modulos.usuarios.models import Phone
+
+NOMBRES = ['Ana', 'Luis', 'María', 'Carlos', 'Lucía', 'Jorge', 'Sofía', 'Diego', 'Valeria', 'Miguel',
+           'Camila', 'José', 'Daniela', 'Juan', 'Paola', 'Andrés', 'Gabriela', 'Fernando', 'Carla', 'Raúl']
+APELLIDOS = ['Rojas', 'Vargas', 'Mamani', 'Quispe', 'Flores', 'Gutiérrez', 'Fernández', 'López', 'Suárez',
+             'Justiniano', 'Pérez', 'Torrez', 'Montaño', 'Ribera', 'Salvatierra', 'Paz', 'Chávez', 'Roca']
+MARCAS = ['Toyota', 'Nissan', 'Suzuki', 'Hyundai', 'Kia', 'Mitsubishi', 'Chevrolet', 'Ford', 'Honda',
+          'Mazda', 'Volkswagen', 'Renault', 'BYD', 'Chery', 'Subaru']
+TIPOS = ['Automóvil', 'Vagoneta', 'Camioneta', 'Motocicleta', 'Minibús', 'Jeep']
+COLORES = ['Blanco', 'Negro', 'Plata', 'Gris', 'Rojo', 'Azul', 'Verde', 'Beige']
+MODELOS = ['Propiedad', 'Residente', 'Vehiculo', 'Telefono', 'User', 'Phone']
+
+
+class Command(BaseCommand):
+    help = (
+        "Genera datos de volumen realista para medir la API "
+        "(por defecto 10k propiedades, 40k residentes, 60k vehículos y 5M entradas de bitácora)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--propiedades', type=int, default=10_000)
+        parser.add_argument('--residentes', type=int, default=40_000)
+        parser.add_argument('--vehiculos', type=int, default=60_000)
+        parser.add_argument('--bitacora', type=int, default=5_000_000)
+        parser.add_argument('--usuarios', type=int, default=50)
+        parser.add_argument('--semilla', type=int, default=2025, help="Semilla del generador (datos reproducibles).")
+        parser.add_argument('--lote', type=int, default=5000, help="Filas por bulk_create.")
+        parser.add_argument('--limpiar', action='store_true', help="Vacía las tablas antes de sembrar.")
+        agregar_argumento(parser)
+
+    def handle(self, *args, **options):
+        if options['limpiar']:
+            exigir_confirmacion(options['confirmar'], "vacía propiedades, residentes, vehículos y la bitácora")
+        self.rng = random.Random(options['semilla'])
+        self.lote = options['lote']
+        if options['limpiar']:
+            self.paso("Limpiando tablas", self.limpiar)
+
+        usuarios = self.paso("Usuarios", self.sembrar_usuarios, options['usuarios'])
+        propiedades = self.paso("Propiedades", self.sembrar_propiedades, options['propiedades'])
+        residentes = self.paso("Residentes y teléfonos", self.sembrar_residentes, options['residentes'], propiedades)
+        self.paso("Vehículos", self.sembrar_vehiculos, options['vehiculos'], residentes)
+        # bulk_create no dispara señales: la ocupación se recalcula al final
+        self.paso("Ocupación de propiedades", lambda: Propiedad.objects.all().recalcular_ocupacion())
+        self.paso("Bitácora", self.sembrar_bitacora, options['bitacora'], usuarios)
+        # Las filas se insertan por SQL, sin pasar por el escritor
+        self.paso("Resumen de bitácora", reconstruir)
+        self.paso("ANALYZE", self.analizar)
+
+    def paso(self, nombre, funcion, *args):
+        inicio = time.perf_counter()
+        resultado = funcion(*args)
+        self.stdout.write(f"{nombre}: {time.perf_counter() - inicio:.1f}s")
+        return resultado
+
+    def limpiar(self):
+        tablas = [modelo._meta.db_table for modelo in (Vehiculo, Telefono, Residente, Propiedad, MarcaVehiculo, TipoVehiculo)]
+        tablas += ['bitacora_bitacora', ResumenBitacora._meta.db_table]
+        with connection.cursor() as cursor:
+            cursor.execute(f"TRUNCATE {', '.join(tablas)} RESTART IDENTITY CASCADE")
+        User.objects.filter(username__startswith='bench_').delete()
+
+    def sembrar_usuarios(self, total):
+        grupo, _ = Group.objects.get_or_create(name='Guardia')
+        existentes = set(User.objects.filter(username__startswith='bench_').values_list('username', flat=True))
+        nuevos = [
+            User(username=f'bench_{i:04d}', first_name=self.rng.choice(NOMBRES), last_name=self.rng.choice(APELLIDOS))
+            for i in range(total) if f'bench_{i:04d}' not in existentes
+        ]
+        User.objects.bulk_create(nuevos, batch_size=self.lote)
+        grupo.user_set.add(*nuevos)
+        Phone.objects.bulk_create(
+            [Phone(idUser=usuario, number=str(self.rng.randint(60000000, 79999999))) for usuario in nuevos],
+            batch_size=self.lote,
+        )
+        return list(User.objects.filter(username__startswith='bench_').values_list('id', flat=True))
+
+    def sembrar_propiedades(self, total):
+        torres = 'ABCDEFGHJK'
+        Propiedad.objects.bulk_create(
+            [
+                Propiedad(
+                    numero_unidad=f'{torres[i % len(torres)]}-{i:05d}',
+                    direccion=f'Calle {self.rng.choice(APELLIDOS)} # {self.rng.randint(1, 999)}',
+                    tipo_propiedad='C' if self.rng.random() < 0.1 else 'V',
+                )
+                for i in range(total)
+            ],
+            batch_size=self.lote,
+            ignore_conflicts=True,
+        )
+        return list(Propiedad.objects.values_list('id', flat=True))
+
+    def sembrar_residentes(self, total, propiedades):
+        with transaction.atomic():
+            for inicio in range(0, total, self.lote):
+                Residente.objects.bulk_create([
+                    Residente(
+                        ci=str(self.rng.randint(1000000, 99999999)),
+                        nombre=self.rng.choice(NOMBRES),
+                        apPaterno=self.rng.choice(APELLIDOS),
+                        apMaterno=self.rng.choice(APELLIDOS),
+                        email=f'residente{inicio + i}@correo.bo',
+                        tipo='I' if self.rng.random() < 0.3 else 'P',
+                        estado='B' if self.rng.random() < 0.15 else 'A',
+                        responsable=self.rng.random() < 0.25,
+                        idPropiedad_id=self.rng.choice(propiedades),
+                    )
+                    for i in range(min(self.lote, total - inicio))
+                ])
+        residentes = list(Residente.objects.values_list('id', flat=True))
+        Telefono.objects.bulk_create(
+            [Telefono(idResidente_id=pk, numero=str(self.rng.randint(60000000, 79999999))) for pk in residentes],
+            batch_size=self.lote,
+        )
+        return residentes
+
+    def sembrar_vehiculos(self, total, residentes):
+        marcas = [MarcaVehiculo.objects.get_or_create(marca=nombre)[0].pk for nombre in MARCAS]
+        tipos = [TipoVehiculo.objects.get_or_create(tipo=nombre)[0].pk for nombre in TIPOS]
+        letras = 'BCDFGHJKLMNPRSTVWXYZ'
+        with transaction.atomic():
+            for inicio in range(0, total, self.lote):
+                Vehiculo.objects.bulk_create([
+                    Vehiculo(
+                        placa=f'{self.rng.randint(1000, 9999)}{"".join(self.rng.choices(letras, k=3))}',
+                        color=self.rng.choice(COLORES),
+                        marca_id=self.rng.choice(marcas),
+                        idTipo_id=self.rng.choice(tipos),
+                        idResidente_id=self.rng.choice(residentes),
+                    )
+                    for _ in range(min(self.lote, total - inicio))
+                ])
+
+    def sembrar_bitacora(self, total, usuarios):
+        # Millones de filas: se generan en el servidor con generate_series en vez de bulk_create
+        if not total:
+            return
+        usuarios = usuarios or [None]
+        acciones = "(ARRAY['Creó', 'Modificó', 'Eliminó'])"
+        tipos = "(ARRAY['C', 'M', 'E'])"
+        modelos = '(ARRAY[' + ', '.join(f"'{m}'" for m in MODELOS) + '])'
+        ids_usuario = '(ARRAY[' + ', '.join('NULL' if u is None else str(u) for u in usuarios) + ']::integer[])'
+        sql = f"""
+            INSERT INTO bitacora_bitacora
+                (hora_fecha, accion_realizada, tipo_accion, modelo, id_accion, ip_origen, usuario_id)
+            SELECT
+                now() - (g * interval '6 seconds'),
+                {acciones}[1 + g %% 3] || ' ' || {modelos}[1 + g %% {len(MODELOS)}] || ' con ID ' || (g %% 50000),
+                {tipos}[1 + g %% 3],
+                {modelos}[1 + g %% {len(MODELOS)}],
+                g %% 50000,
+                ('10.' || (g %% 4) || '.' || (g %% 250) || '.' || (1 + g %% 200))::inet,
+                {ids_usuario}[1 + g %% {len(usuarios)}]
+            FROM generate_series(%s, %s) AS g
+        """
+        paso = 500_000
+        with connection.cursor() as cursor:
+            for inicio in range(1, total + 1, paso):
+                cursor.execute(sql, [inicio, min(inicio + paso - 1, total)])
+
+    def analizar(self):
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
@@ -0,0 +1,29 @@
+"""
+Resguardo de los comandos que borran o escriben datos de prueba.
+
+sembrar_datos --limpiar vacía tablas con TRUNCATE y medir_api repite
+escrituras contra la base configurada. Con DEBUG apagado (una base que
+puede ser la de producción) solo corren si --confirmar trae el nombre de
+esa base.
+"""
+from django.conf import settings
+from django.core.management.base import CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+def agregar_argumento(parser):
+    parser.add_argument(
+        '--confirmar', metavar='BASE', default=None,
+        help="Nombre de la base de datos; necesario con DEBUG = False.",
+    )
+
+
+def exigir_confirmacion(confirmar, accion):
+    if settings.DEBUG:
+        return
+    nombre = connections[DEFAULT_DB_ALIAS].settings_dict['NAME']
+    if confirmar != nombre:
+        raise CommandError(
+            f"DEBUG está apagado y esto {accion} en la base '{nombre}'. "
+            f"Si es una base de pruebas, repita con --confirmar {nombre}."
+        )
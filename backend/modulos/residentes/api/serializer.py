@@ -1,7 +1,10 @@
 from rest_framework import serializers
+from modulos.comun.lotes import RelacionPrecargada
 from ..models import Residente, TipoVehiculo, MarcaVehiculo, Vehiculo
 
 class ResidenteSerializer(serializers.ModelSerializer):
+    serializer_related_field = RelacionPrecargada
+
     class Meta:
         model = Residente
         fields = '__all__'
@@ -21,10 +24,12 @@ class VehiculoSerializer(serializers.ModelSerializer):
     marca_nombre = serializers.CharField(source='marca.marca', read_only=True)
     tipo_nombre = serializers.CharField(source='idTipo.tipo', read_only=True)
     residente_nombre = serializers.CharField(source='idResidente.nombre', read_only=True)
-    
+    serializer_related_field = RelacionPrecargada
+
     class Meta:
         model = Vehiculo
-        fields = '__all__'
+        # placa_normalizada la calcula la base y no se relee después de un UPDATE
+        exclude = ('placa_normalizada',)
         extra_kwargs = {
             'marca': {'write_only': True},
             'idTipo': {'write_only': True},
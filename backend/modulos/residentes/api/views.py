@@ -1,6 +1,17 @@
-from rest_framework import viewsets, filters
+from rest_framework import viewsets, filters, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import ParseError, ValidationError
 from rest_framework.response import Response
+from modulos.comun.asincrono import LecturaAsincronaMixin
+from modulos.comun.cache import CatalogoCacheMixin
+from modulos.comun.campos import CamposDinamicosMixin
+from modulos.comun.exportacion import ExportarMixin
+from modulos.comun.lectura import ConteoRapidoMixin, LecturaRapidaMixin
+from modulos.comun.lotes import LoteMixin
+from modulos.usuarios.middleware import get_current_ip
+from ..importacion import Importador, leer_filas
+from ..placas import invalidar_placas, normalizar_placa, placas
+from ..signals import actualizar_ocupacion, diferir_ocupacion
 from ..models import Residente, TipoVehiculo, MarcaVehiculo, Vehiculo
 from .serializer import (
     ResidenteSerializer, 
@@ -10,30 +21,87 @@ from .serializer import (
 )
 from rest_framework.pagination import PageNumberPagination
 
-class StandardResultsSetPagination(PageNumberPagination):
+class StandardResultsSetPagination(ConteoRapidoMixin, PageNumberPagination):
     page_size = 10
     page_size_query_param = 'page_size'
     max_page_size = 100
 
-class ResidenteViewSet(viewsets.ModelViewSet):
-    queryset = Residente.objects.all().order_by('-fechaCreacion')
+class ResidenteViewSet(LecturaRapidaMixin, LecturaAsincronaMixin, ExportarMixin, LoteMixin, CamposDinamicosMixin, viewsets.ModelViewSet):
     serializer_class = ResidenteSerializer
     pagination_class = StandardResultsSetPagination
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['ci', 'nombre', 'apPaterno', 'apMaterno']
     ordering_fields = ['fechaCreacion', 'apPaterno', 'nombre']
 
-class TipoVehiculoViewSet(viewsets.ModelViewSet):
+    def get_queryset(self):
+        queryset = Residente.objects.all().order_by('-fechaCreacion')
+
+        # Los listados muestran solo residentes en Alta salvo ?include_bajas=1;
+        # el detalle y las escrituras alcanzan a todos (p. ej. para reactivar uno)
+        if self.action in ('list', 'exportar') and self.request.query_params.get('include_bajas') not in ('1', 'true'):
+            queryset = queryset.activos()
+
+        propiedad_id = self.request.query_params.get('idPropiedad')
+        if propiedad_id:
+            if not propiedad_id.isdigit():
+                raise ValidationError({'idPropiedad': 'Debe ser un id.'})
+            queryset = queryset.filter(idPropiedad_id=propiedad_id)
+        ci = self.request.query_params.get('ci')
+        if ci:
+            queryset = queryset.filter(ci=ci)
+
+        return queryset
+
+    @action(detail=False, methods=['post'])
+    def importar(self, request):
+        """
+        Importa residentes con teléfonos y vehículos desde CSV o NDJSON.
+        El cuerpo se lee como flujo: text/csv, application/x-ndjson o un
+        archivo multipart en el campo 'archivo'. ?formato=csv|ndjson fuerza el formato.
+        """
+        tipo_contenido = request.content_type or ''
+        if tipo_contenido.startswith('multipart/'):
+            archivo = request.FILES.get('archivo')
+            if archivo is None:
+                raise ParseError("Falta el archivo en el campo 'archivo'.")
+            flujo, nombre = archivo, archivo.name.lower()
+        else:
+            # Se lee el HttpRequest directamente para no cargar todo el cuerpo en memoria
+            flujo, nombre = request._request, ''
+        formato = request.query_params.get('formato') or (
+            'ndjson' if 'ndjson' in tipo_contenido or 'jsonl' in tipo_contenido
+            or nombre.endswith(('.ndjson', '.jsonl')) else 'csv'
+        )
+        if formato not in ('csv', 'ndjson'):
+            raise ParseError("formato debe ser csv o ndjson.")
+
+        resumen = Importador(usuario=request.user, ip=get_current_ip()).importar(leer_filas(flujo, formato))
+        codigo = status.HTTP_201_CREATED if resumen['importadas'] else status.HTTP_400_BAD_REQUEST
+        return Response(resumen, status=codigo)
+
+    def aplicar_lote(self, validas):
+        # Los borrados en cascada disparan post_delete por residente: se recalcula una vez al final
+        with diferir_ocupacion():
+            nuevos, actualizados, eliminados = super().aplicar_lote(validas)
+            # bulk_create/bulk_update no disparan señales
+            actualizar_ocupacion(
+                *(r.idPropiedad_id for r in nuevos + actualizados),
+                *(r._ocupacion_original[0] for r in actualizados),
+            )
+        invalidar_placas()
+        return nuevos, actualizados, eliminados
+
+class TipoVehiculoViewSet(CatalogoCacheMixin, CamposDinamicosMixin, viewsets.ModelViewSet):
     queryset = TipoVehiculo.objects.all().order_by('tipo')
     serializer_class = TipoVehiculoSerializer
     pagination_class = None  # No necesitamos paginación para tipos de vehículo
 
-class MarcaVehiculoViewSet(viewsets.ModelViewSet):
+class MarcaVehiculoViewSet(CatalogoCacheMixin, CamposDinamicosMixin, viewsets.ModelViewSet):
     queryset = MarcaVehiculo.objects.all().order_by('marca')
     serializer_class = MarcaVehiculoSerializer
     pagination_class = None  # No necesitamos paginación para marcas de vehículo
 
-class VehiculoViewSet(viewsets.ModelViewSet):
+class VehiculoViewSet(LecturaRapidaMixin, LecturaAsincronaMixin, ExportarMixin, LoteMixin, CamposDinamicosMixin, viewsets.ModelViewSet):
     serializer_class = VehiculoSerializer
     pagination_class = StandardResultsSetPagination
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
@@ -46,6 +114,8 @@ class VehiculoViewSet(viewsets.ModelViewSet):
         # Filtrar por idResidente si está presente en los parámetros de consulta
         residente_id = self.request.query_params.get('idResidente')
         if residente_id:
+            if not residente_id.isdigit():
+                raise ValidationError({'idResidente': 'Debe ser un id.'})
             queryset = queryset.filter(idResidente_id=residente_id)
             
         return queryset
@@ -62,4 +132,23 @@ class VehiculoViewSet(viewsets.ModelViewSet):
             return self.get_paginated_response(serializer.data)
             
         serializer = self.get_serializer(vehiculos, many=True)
-        return Response(serializer.data)
\ No newline at end of file
+        return Response(serializer.data)
+
+    @action(detail=False, methods=['get'], url_path=r'placa/(?P<placa>[^/]+)')
+    def buscar_placa(self, request, placa=None):
+        """
+        Control de acceso: dueño, unidad y estado del residente de una placa.
+        Ignora mayúsculas, espacios y guiones; se responde desde el mapa en memoria.
+        """
+        vehiculos = placas.buscar(placa)
+        return Response({
+            'placa': normalizar_placa(placa),
+            'registrada': bool(vehiculos),
+            'vehiculos': vehiculos,
+        })
+
+    def aplicar_lote(self, validas):
+        resultado = super().aplicar_lote(validas)
+        # bulk_create/bulk_update no disparan señales
+        invalidar_placas()
+        return resultado
\ No newline at end of file
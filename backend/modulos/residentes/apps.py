@@ -3,3 +3,10 @@ from django.apps import AppConfig
 class ResidentesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'modulos.residentes'
+    def ready(self):
+        import modulos.residentes.signals
+        from modulos.bitacora.auditoria import auditoria
+        from .models import MarcaVehiculo, Residente, Telefono, TipoVehiculo, Vehiculo
+        auditoria.registrar(Residente, excluir=['fechaCreacion', 'fechaModificacion'])
+        for modelo in (Telefono, TipoVehiculo, MarcaVehiculo, Vehiculo):
+            auditoria.registrar(modelo)
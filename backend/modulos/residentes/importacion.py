@@ -0,0 +1,196 @@
+"""
+Importación masiva de residentes con sus teléfonos y vehículos.
+
+Acepta CSV o NDJSON leídos como flujo (línea a línea), valida por lotes
+sin consultas por fila (propiedades, marcas y tipos se resuelven desde
+diccionarios en memoria) e inserta cada lote con bulk_create dentro de una
+transacción. Cada lote deja una sola entrada en la bitácora.
+
+Columnas / claves:
+    ci, nombre, apPaterno, apMaterno, email, tipo (P/I), estado (A/B),
+    responsable, numero_unidad, telefonos, vehiculos
+
+En NDJSON, telefonos es una lista de números y vehiculos una lista de
+objetos {placa, marca, tipo, color}. En CSV, telefonos va separado por ';'
+y cada vehículo como 'placa|marca|tipo|color', también separados por ';'.
+"""
+import codecs
+import csv
+import json
+from itertools import islice
+
+from django.db import transaction
+from rest_framework import serializers
+
+from modulos.bitacora.escritor import escritor
+from modulos.propiedades.models import Propiedad
+from .models import MarcaVehiculo, Residente, Telefono, TipoVehiculo, Vehiculo
+from .placas import invalidar_placas
+from .signals import actualizar_ocupacion
+
+TAMANO_LOTE = 1000
+MAX_ERRORES_REPORTADOS = 1000
+
+
+class VehiculoImportado(serializers.Serializer):
+    placa = serializers.CharField(max_length=10)
+    marca = serializers.CharField(max_length=30)
+    tipo = serializers.CharField(max_length=30)
+    color = serializers.CharField(max_length=30)
+
+
+class ResidenteImportado(serializers.Serializer):
+    """Validación de una fila; no toca la base de datos."""
+    ci = serializers.CharField(max_length=8)
+    nombre = serializers.CharField(max_length=40)
+    apPaterno = serializers.CharField(max_length=35)
+    apMaterno = serializers.CharField(max_length=35, required=False, allow_blank=True, default='')
+    email = serializers.CharField(max_length=50, required=False, allow_blank=True, default='')
+    tipo = serializers.ChoiceField(choices=Residente.tipoResidente, required=False, default='P')
+    estado = serializers.ChoiceField(choices=Residente.tipoEstado, required=False, default='A')
+    responsable = serializers.BooleanField(required=False, default=False)
+    numero_unidad = serializers.CharField(max_length=10, required=False, allow_blank=True, default='')
+    telefonos = serializers.ListField(
+        child=serializers.RegexField(r'^\d+$', max_length=10), required=False, default=list
+    )
+    vehiculos = VehiculoImportado(many=True, required=False, default=list)
+
+
+def leer_filas(flujo, formato):
+    """Genera (número de fila, dict) desde un iterable de líneas en bytes o texto."""
+    lineas = _como_texto(flujo)
+    if formato == 'ndjson':
+        for numero, linea in enumerate(lineas, start=1):
+            if not linea.strip():
+                continue
+            try:
+                yield numero, json.loads(linea)
+            except ValueError as error:
+                yield numero, {'__error__': f'JSON inválido: {error}'}
+        return
+    lector = csv.DictReader(lineas)
+    for fila in lector:
+        yield lector.line_num, _fila_csv(fila)
+
+
+def _como_texto(flujo):
+    decodificador = codecs.getincrementaldecoder('utf-8-sig')()
+    for linea in flujo:
+        yield decodificador.decode(linea) if isinstance(linea, bytes) else linea
+
+
+def _fila_csv(fila):
+    datos = {clave: valor for clave, valor in fila.items() if clave and valor not in (None, '')}
+    datos['telefonos'] = [t.strip() for t in (fila.get('telefonos') or '').split(';') if t.strip()]
+    vehiculos = []
+    for texto in (fila.get('vehiculos') or '').split(';'):
+        if texto.strip():
+            partes = [p.strip() for p in texto.split('|')] + [''] * 4
+            vehiculos.append(dict(zip(('placa', 'marca', 'tipo', 'color'), partes)))
+    datos['vehiculos'] = vehiculos
+    return datos
+
+
+class Importador:
+    def __init__(self, usuario=None, ip=None, tamano_lote=TAMANO_LOTE):
+        self.usuario = usuario
+        self.ip = ip
+        self.tamano_lote = tamano_lote
+        # Catálogos completos en memoria: son pocos miles de filas como mucho
+        self.propiedades = dict(Propiedad.objects.values_list('numero_unidad', 'id'))
+        self.marcas = {nombre.strip().lower(): pk for pk, nombre in MarcaVehiculo.objects.values_list('id', 'marca')}
+        self.tipos = {nombre.strip().lower(): pk for pk, nombre in TipoVehiculo.objects.values_list('id', 'tipo')}
+        self.resumen = {'procesadas': 0, 'importadas': 0, 'telefonos': 0, 'vehiculos': 0,
+                        'lotes': 0, 'con_errores': 0, 'errores': []}
+
+    def importar(self, filas):
+        filas = iter(filas)
+        while True:
+            lote = list(islice(filas, self.tamano_lote))
+            if not lote:
+                return self.resumen
+            self.importar_lote(lote)
+
+    def importar_lote(self, lote):
+        validas = []
+        for numero, datos in lote:
+            self.resumen['procesadas'] += 1
+            resuelta = self.validar(numero, datos)
+            if resuelta is not None:
+                validas.append(resuelta)
+        if not validas:
+            return
+
+        with transaction.atomic():
+            residentes = Residente.objects.bulk_create([residente for residente, _, _ in validas])
+            telefonos = [
+                Telefono(idResidente=residente, numero=numero)
+                for residente, (_, numeros, _) in zip(residentes, validas) for numero in numeros
+            ]
+            vehiculos = []
+            for residente, (_, _, datos_vehiculos) in zip(residentes, validas):
+                for vehiculo in datos_vehiculos:
+                    vehiculo.idResidente = residente
+                    vehiculos.append(vehiculo)
+            Telefono.objects.bulk_create(telefonos)
+            Vehiculo.objects.bulk_create(vehiculos)
+            # bulk_create no dispara señales: ocupación y bitácora se actualizan una vez por lote
+            actualizar_ocupacion(*{r.idPropiedad_id for r in residentes})
+            invalidar_placas()
+            escritor.registrar(
+                accion_realizada=(
+                    f"Importó {len(residentes)} Residente, {len(telefonos)} Telefono "
+                    f"y {len(vehiculos)} Vehiculo"
+                ),
+                tipo_accion='C',
+                modelo='Residente',
+                ip_origen=self.ip,
+                usuario=self.usuario,
+            )
+
+        self.resumen['importadas'] += len(residentes)
+        self.resumen['telefonos'] += len(telefonos)
+        self.resumen['vehiculos'] += len(vehiculos)
+        self.resumen['lotes'] += 1
+
+    def validar(self, numero, datos):
+        if not isinstance(datos, dict):
+            return self.error(numero, {'fila': 'Se esperaba un objeto.'})
+        if '__error__' in datos:
+            return self.error(numero, {'fila': datos['__error__']})
+        serializer = ResidenteImportado(data=datos)
+        if not serializer.is_valid():
+            return self.error(numero, serializer.errors)
+        valores = serializer.validated_data
+
+        errores = {}
+        id_propiedad = None
+        if valores['numero_unidad']:
+            id_propiedad = self.propiedades.get(valores['numero_unidad'])
+            if id_propiedad is None:
+                errores['numero_unidad'] = f"No existe la propiedad {valores['numero_unidad']}."
+
+        vehiculos = []
+        for indice, vehiculo in enumerate(valores['vehiculos']):
+            marca = self.marcas.get(vehiculo['marca'].strip().lower())
+            tipo = self.tipos.get(vehiculo['tipo'].strip().lower())
+            if marca is None:
+                errores[f'vehiculos[{indice}].marca'] = f"Marca desconocida: {vehiculo['marca']}."
+            if tipo is None:
+                errores[f'vehiculos[{indice}].tipo'] = f"Tipo desconocido: {vehiculo['tipo']}."
+            vehiculos.append(Vehiculo(placa=vehiculo['placa'], color=vehiculo['color'], marca_id=marca, idTipo_id=tipo))
+        if errores:
+            return self.error(numero, errores)
+
+        residente = Residente(
+            ci=valores['ci'], nombre=valores['nombre'], apPaterno=valores['apPaterno'],
+            apMaterno=valores['apMaterno'], email=valores['email'], tipo=valores['tipo'],
+            estado=valores['estado'], responsable=valores['responsable'], idPropiedad_id=id_propiedad,
+        )
+        return residente, valores['telefonos'], vehiculos
+
+    def error(self, numero, errores):
+        self.resumen['con_errores'] += 1
+        if len(self.resumen['errores']) < MAX_ERRORES_REPORTADOS:
+            self.resumen['errores'].append({'fila': numero, 'errores': errores})
+        return None
@@ -0,0 +1,33 @@
+import json
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from modulos.residentes.importacion import TAMANO_LOTE, Importador, leer_filas
+
+
+class Command(BaseCommand):
+    help = "Importa residentes con teléfonos y vehículos desde un archivo CSV o NDJSON ('-' lee de stdin)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('archivo')
+        parser.add_argument('--formato', choices=['csv', 'ndjson'], default=None,
+                            help="Por defecto se deduce de la extensión del archivo.")
+        parser.add_argument('--lote', type=int, default=TAMANO_LOTE)
+
+    def handle(self, *args, **options):
+        ruta = options['archivo']
+        formato = options['formato'] or ('ndjson' if ruta.endswith(('.ndjson', '.jsonl')) else 'csv')
+        try:
+            flujo = sys.stdin.buffer if ruta == '-' else open(ruta, 'rb')
+        except OSError as error:
+            raise CommandError(error)
+        with flujo:
+            resumen = Importador(tamano_lote=options['lote']).importar(leer_filas(flujo, formato))
+
+        for error in resumen.pop('errores'):
+            self.stderr.write(f"Fila {error['fila']}: {json.dumps(error['errores'], ensure_ascii=False)}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{resumen['importadas']} residentes, {resumen['telefonos']} teléfonos y "
+            f"{resumen['vehiculos']} vehículos importados en {resumen['lotes']} lotes; "
+            f"{resumen['con_errores']} filas con errores de {resumen['procesadas']}."
+        ))
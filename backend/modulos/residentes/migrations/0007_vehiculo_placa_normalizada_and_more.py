@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-18 06:39
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('residentes', '0006_residente_idpropiedad'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vehiculo',
+            name='placa_normalizada',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.functions.text.Upper(models.Func(models.F('placa'), models.Value('[^A-Za-z0-9]+'), models.Value(''), models.Value('g'), function='REGEXP_REPLACE')), output_field=models.CharField(max_length=10)),
+        ),
+        migrations.AddIndex(
+            model_name='vehiculo',
+            index=models.Index(fields=['placa_normalizada'], name='vehiculo_placa_norm_idx'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.6 on 2026-10-18 06:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('propiedades', '0005_propiedad_numero_residentes'),
+        ('residentes', '0007_vehiculo_placa_normalizada_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='residente',
+            name='idPropiedad',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, to='propiedades.propiedad'),
+        ),
+        migrations.AddIndex(
+            model_name='residente',
+            index=models.Index(fields=['idPropiedad', 'estado'], name='residente_propiedad_estado_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='residente',
+            index=models.Index(fields=['ci'], name='residente_ci_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='residente',
+            index=models.Index(condition=models.Q(('estado', 'A')), fields=['-fechaCreacion'], name='residente_activo_creacion_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='residente',
+            index=models.Index(fields=['-fechaCreacion'], name='residente_creacion_idx'),
+        ),
+    ]
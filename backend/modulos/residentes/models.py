@@ -1,4 +1,6 @@
 from django.db import models 
+from django.db.models import F, Func, Q, Value
+from django.db.models.functions import Upper
 from django.core.validators import RegexValidator
 from modulos.propiedades.models import Propiedad
 # Create your models here. 
@@ -9,6 +11,11 @@ solo_numeros_validator = RegexValidator(
     'invalid_number' # Código de error
 )
 
+class ResidenteQuerySet(models.QuerySet):
+    def activos(self):
+        return self.filter(estado='A')
+
+
 class Residente(models.Model):
     id = models.AutoField(primary_key=True, unique=True)
     ci = models.CharField(max_length=8)
@@ -23,7 +30,22 @@ class Residente(models.Model):
     tipoEstado = [('A', 'Alta'), ('B', 'Baja')]
     responsable = models.BooleanField(default=False)
     estado = models.CharField(max_length=1, choices=tipoEstado, default='A')
-    idPropiedad = models.ForeignKey(Propiedad, null=True, blank=True, on_delete=models.CASCADE)
+    # Sin índice propio: lo cubre residente_propiedad_estado_idx
+    idPropiedad = models.ForeignKey(Propiedad, null=True, blank=True, on_delete=models.CASCADE, db_index=False)
+
+    objects = ResidenteQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Residentes (en Alta) de una propiedad: filtros de la API y ocupación
+            models.Index(fields=['idPropiedad', 'estado'], name='residente_propiedad_estado_idx'),
+            # Búsqueda exacta por CI en portería
+            models.Index(fields=['ci'], name='residente_ci_idx'),
+            # Listado por defecto: solo en Alta, los más recientes primero
+            models.Index(fields=['-fechaCreacion'], condition=Q(estado='A'), name='residente_activo_creacion_idx'),
+            # Listado con include_bajas
+            models.Index(fields=['-fechaCreacion'], name='residente_creacion_idx'),
+        ]
 
     def __str__(self):
         txt = "{0} {1} {2}"
@@ -72,6 +94,17 @@ class Vehiculo(models.Model):
     marca = models.ForeignKey(MarcaVehiculo, null=False, blank=False, on_delete=models.CASCADE)
     idTipo = models.ForeignKey(TipoVehiculo, null=False, blank=False, on_delete=models.CASCADE)
     idResidente = models.ForeignKey(Residente, null=False, blank=False, on_delete=models.CASCADE)
+    # Placa sin espacios ni guiones y en mayúsculas, calculada por la base (ver placas.py)
+    placa_normalizada = models.GeneratedField(
+        expression=Upper(Func(F('placa'), Value('[^A-Za-z0-9]+'), Value(''), Value('g'), function='REGEXP_REPLACE')),
+        output_field=models.CharField(max_length=10),
+        db_persist=True,
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['placa_normalizada'], name='vehiculo_placa_norm_idx'),
+        ]
 
     def __str__(self):
         txt = "{0}, {1}, placa : {2}"
@@ -0,0 +1,156 @@
+"""
+Búsqueda de placas para el control de acceso.
+
+Las placas se comparan normalizadas (sin espacios, guiones ni otros
+signos, en mayúsculas): 'abc-123', 'ABC 123' y 'ABC123' son la misma.
+Vehiculo.placa_normalizada la calcula la base con la misma regla y tiene
+índice.
+
+Cada proceso mantiene un mapa placa -> vehículos con su dueño y unidad,
+cargado con una sola consulta. Guardar un vehículo, residente, propiedad,
+marca o tipo que cambia algún campo del mapa (CAMPOS_MAPA), o borrarlo,
+cambia la versión del mapa en la caché al confirmar la transacción
+(invalidar_placas). Los update() en bloque no mandan señal, así que el
+mapa vence además a los PLACAS_RECARGA_SEGUNDOS de cargado.
+
+Mientras el mapa está vencido las búsquedas van al índice y un hilo lo
+vuelve a cargar, así ninguna búsqueda espera la recarga completa.
+"""
+import re
+import threading
+import time
+
+from django.conf import settings
+
+from modulos.comun.cache import estado_catalogo, invalidar_catalogo
+from modulos.comun.replicas import leer_de_primaria
+from modulos.propiedades.models import Propiedad
+from .models import MarcaVehiculo, Residente, TipoVehiculo, Vehiculo
+
+_NO_ALFANUMERICO = re.compile(r'[^A-Za-z0-9]+')
+
+COLUMNAS = {
+    'id': 'id',
+    'placa': 'placa',
+    'placa_normalizada': 'placa_normalizada',
+    'color': 'color',
+    'marca': 'marca__marca',
+    'tipo': 'idTipo__tipo',
+    'residente_id': 'idResidente_id',
+    'nombre': 'idResidente__nombre',
+    'apPaterno': 'idResidente__apPaterno',
+    'apMaterno': 'idResidente__apMaterno',
+    'estado': 'idResidente__estado',
+    'propiedad_id': 'idResidente__idPropiedad_id',
+    'numero_unidad': 'idResidente__idPropiedad__numero_unidad',
+}
+
+# Campos de cada modelo que salen en el mapa: guardar una fila sin cambiar
+# ninguno no lo invalida. Deben seguir a COLUMNAS.
+CAMPOS_MAPA = {
+    Vehiculo: ('placa', 'color', 'marca_id', 'idTipo_id', 'idResidente_id'),
+    Residente: ('nombre', 'apPaterno', 'apMaterno', 'estado', 'idPropiedad_id'),
+    Propiedad: ('numero_unidad',),
+    MarcaVehiculo: ('marca',),
+    TipoVehiculo: ('tipo',),
+}
+
+
+def valores_mapa(instancia):
+    # Se lee de __dict__ para no disparar la carga de campos diferidos
+    return tuple(instancia.__dict__.get(campo) for campo in CAMPOS_MAPA[type(instancia)])
+
+
+def segundos_recarga():
+    return getattr(settings, 'PLACAS_RECARGA_SEGUNDOS', 30)
+
+
+def normalizar_placa(placa):
+    # Debe coincidir con la expresión de Vehiculo.placa_normalizada
+    return _NO_ALFANUMERICO.sub('', placa or '').upper()
+
+
+def invalidar_placas():
+    invalidar_catalogo(Vehiculo)
+
+
+def _consulta():
+    return Vehiculo.objects.order_by('id').values(*COLUMNAS.values())
+
+
+def _entrada(fila):
+    datos = {nombre: fila[columna] for nombre, columna in COLUMNAS.items()}
+    return {
+        'id': datos['id'],
+        'placa': datos['placa'],
+        'color': datos['color'],
+        'marca': datos['marca'],
+        'tipo': datos['tipo'],
+        'residente': {
+            'id': datos['residente_id'],
+            'nombre': ' '.join(filter(None, [datos['nombre'], datos['apPaterno'], datos['apMaterno']])),
+            'estado': datos['estado'],
+        },
+        'propiedad': {
+            'id': datos['propiedad_id'],
+            'numero_unidad': datos['numero_unidad'],
+        },
+    }
+
+
+class MapaPlacas:
+    def __init__(self):
+        self._mapa = None
+        self._version = None
+        self._vence = 0.0
+        self._cargando = False
+        self._lock = threading.Lock()
+
+    def buscar(self, placa):
+        """Vehículos con esa placa (normalizada); lista vacía si no hay ninguno."""
+        placa = normalizar_placa(placa)
+        if not placa:
+            return []
+        version, _ = estado_catalogo(Vehiculo)
+        mapa = self._mapa
+        if mapa is not None and self._version == version and time.monotonic() < self._vence:
+            return mapa.get(placa, [])
+        if mapa is None:
+            # Primera búsqueda del proceso: se carga aquí
+            return self.cargar(version).get(placa, [])
+        self._recargar_en_segundo_plano(version)
+        return [_entrada(fila) for fila in _consulta().filter(placa_normalizada=placa)]
+
+    def cargar(self, version):
+        mapa = {}
+        # El mapa queda con la versión actual: se carga de la primaria
+        with leer_de_primaria():
+            for fila in _consulta().iterator(chunk_size=5000):
+                mapa.setdefault(fila['placa_normalizada'], []).append(_entrada(fila))
+        with self._lock:
+            self._mapa, self._version = mapa, version
+            self._vence = time.monotonic() + segundos_recarga()
+        return mapa
+
+    def _recargar_en_segundo_plano(self, version):
+        with self._lock:
+            if self._cargando:
+                return
+            self._cargando = True
+
+        def recargar():
+            from django.db import connection
+            try:
+                self.cargar(version)
+            finally:
+                self._cargando = False
+                connection.close()
+
+        threading.Thread(target=recargar, name='mapa-placas', daemon=True).start()
+
+    def limpiar(self):
+        with self._lock:
+            self._mapa, self._version, self._vence = None, None, 0.0
+
+
+placas = MapaPlacas()
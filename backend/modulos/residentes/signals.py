@@ -0,0 +1,106 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import receiver
+from modulos.comun.cache import invalidar_catalogo
+from modulos.propiedades.models import Propiedad
+from .models import MarcaVehiculo, Residente, TipoVehiculo, Vehiculo
+from .placas import invalidar_placas, valores_mapa
+
+
+def ocupacion_denormalizada():
+    return getattr(settings, 'PROPIEDADES_OCUPACION_DENORMALIZADA', False)
+
+
+_pendientes = ContextVar('ocupacion_pendiente', default=None)
+
+
+def actualizar_ocupacion(*ids_propiedad):
+    """Recalcula numero_residentes/habitada de las propiedades indicadas."""
+    ids = {pk for pk in ids_propiedad if pk is not None}
+    if not ids or not ocupacion_denormalizada():
+        return
+    pendientes = _pendientes.get()
+    if pendientes is not None:
+        pendientes.update(ids)
+        return
+    Propiedad.objects.filter(pk__in=ids).recalcular_ocupacion()
+
+
+@contextmanager
+def diferir_ocupacion():
+    """Junta los recálculos del bloque (p. ej. un borrado en cascada) en un solo UPDATE al final."""
+    pendientes = set()
+    token = _pendientes.set(pendientes)
+    try:
+        yield
+    finally:
+        _pendientes.reset(token)
+    actualizar_ocupacion(*pendientes)
+
+
+@receiver(post_init, sender=Residente)
+def recordar_ocupacion_original(sender, instance, **kwargs):
+    # Guardamos los valores cargados para detectar mudanzas y cambios de estado sin otra consulta.
+    # Se lee de __dict__ para no disparar la carga de campos diferidos.
+    instance._ocupacion_original = (
+        instance.__dict__.get('idPropiedad_id'),
+        instance.__dict__.get('estado'),
+    )
+
+
+@receiver(post_save, sender=Residente)
+def ocupacion_al_guardar(sender, instance, created, **kwargs):
+    propiedad_anterior, estado_anterior = instance._ocupacion_original
+    actual = (instance.idPropiedad_id, instance.estado)
+    if created or (propiedad_anterior, estado_anterior) != actual:
+        actualizar_ocupacion(propiedad_anterior, instance.idPropiedad_id)
+    instance._ocupacion_original = actual
+
+
+@receiver(post_delete, sender=Residente)
+def ocupacion_al_eliminar(sender, instance, **kwargs):
+    actualizar_ocupacion(instance.idPropiedad_id)
+
+
+@receiver(post_save, sender=TipoVehiculo)
+@receiver(post_delete, sender=TipoVehiculo)
+@receiver(post_save, sender=MarcaVehiculo)
+@receiver(post_delete, sender=MarcaVehiculo)
+def catalogo_vehiculos_modificado(sender, **kwargs):
+    invalidar_catalogo(sender)
+
+
+# El mapa de placas guarda marca, tipo, dueño, estado y unidad de cada
+# vehículo: solo se invalida si cambia alguno de esos campos (CAMPOS_MAPA)
+@receiver(post_init, sender=Vehiculo)
+@receiver(post_init, sender=Residente)
+@receiver(post_init, sender=Propiedad)
+@receiver(post_init, sender=MarcaVehiculo)
+@receiver(post_init, sender=TipoVehiculo)
+def recordar_campos_placas(sender, instance, **kwargs):
+    instance._placas_original = valores_mapa(instance)
+
+
+@receiver(post_save, sender=Vehiculo)
+@receiver(post_save, sender=Residente)
+@receiver(post_save, sender=Propiedad)
+@receiver(post_save, sender=MarcaVehiculo)
+@receiver(post_save, sender=TipoVehiculo)
+def placas_al_guardar(sender, instance, created, **kwargs):
+    actual = valores_mapa(instance)
+    # Un residente, propiedad, marca o tipo nuevo todavía no tiene vehículos
+    if (created and sender is Vehiculo) or actual != instance._placas_original:
+        invalidar_placas()
+    instance._placas_original = actual
+
+
+@receiver(post_delete, sender=Vehiculo)
+@receiver(post_delete, sender=Residente)
+@receiver(post_delete, sender=Propiedad)
+@receiver(post_delete, sender=MarcaVehiculo)
+@receiver(post_delete, sender=TipoVehiculo)
+def placas_al_eliminar(sender, **kwargs):
+    invalidar_placas()
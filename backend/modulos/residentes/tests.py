@@ -1,3 +1,226 @@
-from django.test import TestCase
+import time
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from modulos.comun import lectura
+from modulos.comun.cache import estado_catalogo
+from modulos.propiedades.models import Propiedad
+from . import placas as modulo_placas
+from .models import MarcaVehiculo, Residente, TipoVehiculo, Vehiculo
+from .placas import placas
+
+
+class IndicesResidenteTests(TestCase):
+    """
+    Cada índice de Residente debe servir a la consulta que lo justifica.
+    Con pocas filas el planificador prefiere recorrer la tabla, así que se
+    desactiva el recorrido secuencial: si el plan no usa el índice es porque
+    no sirve para esa consulta.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.propiedad = Propiedad.objects.create(numero_unidad='A-101', direccion='Calle Yotaú # 12')
+        Residente.objects.create(ci='1234567', nombre='Ana', apPaterno='Rojas', idPropiedad=cls.propiedad)
+        Residente.objects.create(ci='7654321', nombre='Luis', apPaterno='Vaca', estado='B', idPropiedad=cls.propiedad)
+
+    def setUp(self):
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+
+    def assertUsaIndice(self, queryset, indice):
+        plan = queryset.explain()
+        self.assertIn(indice, plan, plan)
+
+    def test_activos_de_una_propiedad(self):
+        self.assertUsaIndice(
+            Residente.objects.activos().filter(idPropiedad=self.propiedad),
+            'residente_propiedad_estado_idx',
+        )
+
+    def test_residentes_de_una_propiedad(self):
+        # Borrar o recorrer una propiedad usa el índice compuesto en lugar del de la FK
+        self.assertUsaIndice(
+            Residente.objects.filter(idPropiedad=self.propiedad),
+            'residente_propiedad_estado_idx',
+        )
+
+    def test_busqueda_por_ci(self):
+        self.assertUsaIndice(Residente.objects.filter(ci='1234567'), 'residente_ci_idx')
+
+    def test_listado_de_activos(self):
+        self.assertUsaIndice(
+            Residente.objects.activos().order_by('-fechaCreacion')[:10],
+            'residente_activo_creacion_idx',
+        )
+
+    def test_listado_con_bajas(self):
+        self.assertUsaIndice(
+            Residente.objects.order_by('-fechaCreacion')[:10],
+            'residente_creacion_idx',
+        )
+
+
+class ResidenteViewSetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_user('guardia', password='clave')
+        propiedad = Propiedad.objects.create(numero_unidad='A-101', direccion='Calle Yotaú # 12')
+        cls.alta = Residente.objects.create(ci='1234567', nombre='Ana', apPaterno='Rojas', idPropiedad=propiedad)
+        cls.baja = Residente.objects.create(ci='7654321', nombre='Luis', apPaterno='Vaca', estado='B', idPropiedad=propiedad)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.usuario)
+
+    def ids(self, consulta=''):
+        respuesta = self.client.get(f'/api/residentes/residentes/{consulta}')
+        self.assertEqual(respuesta.status_code, 200)
+        return {residente['id'] for residente in respuesta.json()['results']}
+
+    def test_listado_solo_activos(self):
+        self.assertEqual(self.ids(), {self.alta.id})
+
+    def test_listado_con_bajas(self):
+        self.assertEqual(self.ids('?include_bajas=1'), {self.alta.id, self.baja.id})
+
+    def test_filtro_por_ci(self):
+        self.assertEqual(self.ids('?include_bajas=1&ci=7654321'), {self.baja.id})
+
+    def test_filtro_por_propiedad(self):
+        self.assertEqual(self.ids(f'?include_bajas=1&idPropiedad={self.alta.idPropiedad_id}'), {self.alta.id, self.baja.id})
+
+    def test_ids_no_numericos(self):
+        for url, parametro in (('residentes', 'idPropiedad'), ('vehiculos', 'idResidente')):
+            with self.subTest(parametro=parametro):
+                respuesta = self.client.get(f'/api/residentes/{url}/?{parametro}=abc')
+                self.assertEqual(respuesta.status_code, 400)
+                self.assertIn(parametro, respuesta.json())
+
+    def test_detalle_de_una_baja(self):
+        respuesta = self.client.get(f'/api/residentes/residentes/{self.baja.id}/')
+        self.assertEqual(respuesta.status_code, 200)
+
+
+# Las entradas de bitácora se escriben dentro de la transacción del test, sin el hilo de fondo
+@override_settings(BITACORA_ESCRITOR={'MODO': 'sincrono'})
+class MapaPlacasTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.propiedad = Propiedad.objects.create(numero_unidad='A-101', direccion='Calle Yotau # 12')
+        cls.residente = Residente.objects.create(ci='1234567', nombre='Ana', apPaterno='Rojas', idPropiedad=cls.propiedad)
+        cls.vehiculo = Vehiculo.objects.create(
+            placa='abc-123', color='Rojo', marca=MarcaVehiculo.objects.create(marca='Toyota'),
+            idTipo=TipoVehiculo.objects.create(tipo='Auto'), idResidente=cls.residente,
+        )
+
+    def setUp(self):
+        placas.limpiar()
+
+    def version(self):
+        return estado_catalogo(Vehiculo)[0]
+
+    def assertInvalida(self, cambio, invalida=True):
+        antes = self.version()
+        with self.captureOnCommitCallbacks(execute=True):
+            cambio()
+        (self.assertNotEqual if invalida else self.assertEqual)(self.version(), antes)
+
+    def test_busqueda_normalizada(self):
+        for placa in ('ABC123', 'abc 123', 'Abc-123'):
+            with self.subTest(placa=placa):
+                [vehiculo] = placas.buscar(placa)
+                self.assertEqual(vehiculo['id'], self.vehiculo.id)
+                self.assertEqual(vehiculo['residente']['nombre'], 'Ana Rojas')
+                self.assertEqual(vehiculo['propiedad']['numero_unidad'], 'A-101')
+        self.assertEqual(placas.buscar('XYZ999'), [])
+
+    def test_guardar_sin_cambios_del_mapa_no_invalida(self):
+        residente = Residente.objects.get(pk=self.residente.pk)
+        residente.ci = '7777777'
+        self.assertInvalida(residente.save, invalida=False)
+        propiedad = Propiedad.objects.get(pk=self.propiedad.pk)
+        propiedad.direccion = 'Otra calle'
+        self.assertInvalida(propiedad.save, invalida=False)
+        self.assertInvalida(
+            lambda: Residente.objects.create(ci='5555555', nombre='Luis', apPaterno='Vaca', idPropiedad=self.propiedad),
+            invalida=False,
+        )
+
+    def test_cambio_de_un_campo_del_mapa_invalida(self):
+        residente = Residente.objects.get(pk=self.residente.pk)
+        residente.nombre = 'Ana Maria'
+        self.assertInvalida(residente.save)
+        propiedad = Propiedad.objects.get(pk=self.propiedad.pk)
+        propiedad.numero_unidad = 'B-202'
+        self.assertInvalida(propiedad.save)
+        vehiculo = Vehiculo.objects.get(pk=self.vehiculo.pk)
+        vehiculo.placa = 'XYZ-999'
+        self.assertInvalida(vehiculo.save)
+        self.assertEqual(placas.buscar('XYZ999')[0]['propiedad']['numero_unidad'], 'B-202')
+
+    @override_settings(PLACAS_RECARGA_SEGUNDOS=30)
+    def test_cambio_en_otro_proceso_llega_en_el_plazo(self):
+        self.assertEqual(len(placas.buscar('ABC123')), 1)
+        # Otro worker cambia la placa: aquí no cambia la versión (LocMemCache es por proceso)
+        Vehiculo.objects.filter(pk=self.vehiculo.pk).update(placa='XYZ-999')
+        self.assertEqual(len(placas.buscar('ABC123')), 1)
+        ahora = time.monotonic()
+        with mock.patch.object(modulo_placas.time, 'monotonic', return_value=ahora + 31), \
+                mock.patch.object(placas, '_recargar_en_segundo_plano') as recargar:
+            # Vencido: responde desde el índice y pide la recarga
+            self.assertEqual(placas.buscar('ABC123'), [])
+            self.assertEqual(len(placas.buscar('XYZ999')), 1)
+        recargar.assert_called()
+
+
+class LecturaRapidaTests(TestCase):
+    """El listado con values() tiene que responder lo mismo que el serializer."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_user('guardia')
+        propiedad = Propiedad.objects.create(numero_unidad='A-101', direccion='Calle Yotau # 12')
+        marca, tipo = MarcaVehiculo.objects.create(marca='Toyota'), TipoVehiculo.objects.create(tipo='Auto')
+        for i in range(12):
+            residente = Residente.objects.create(
+                ci=f'100{i:02}', nombre=f'Residente {i}', apPaterno='Rojas',
+                # Algunos sin propiedad: FK nula
+                idPropiedad=propiedad if i % 3 else None,
+            )
+            Vehiculo.objects.create(placa=f'ABC-{i:03}', color='Rojo', marca=marca, idTipo=tipo, idResidente=residente)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.usuario)
+
+    def comparar(self, url):
+        with mock.patch.object(lectura, 'convertir', wraps=lectura.convertir) as convertir:
+            rapida = self.client.get(url)
+        self.assertTrue(convertir.called, 'no se usó la lectura rápida')
+        with self.settings(API_LECTURA_RAPIDA=False):
+            normal = self.client.get(url)
+        self.assertEqual(rapida.status_code, 200)
+        self.assertEqual(rapida.json(), normal.json())
+        return rapida.json()
+
+    def test_residentes(self):
+        for consulta in ('', '?page=2', '?fields=id,nombre,idPropiedad', '?exclude=ci&ordering=nombre', '?search=Residente%2011'):
+            with self.subTest(consulta=consulta):
+                self.comparar(f'/api/residentes/residentes/{consulta}')
+
+    def test_vehiculos(self):
+        for consulta in ('?ordering=placa', '?ordering=placa&page=2', '?fields=id,placa,marca_nombre,residente_nombre&ordering=-placa',
+                         '?search=Toyota&ordering=placa'):
+            with self.subTest(consulta=consulta):
+                self.assertEqual(self.comparar(f'/api/residentes/vehiculos/{consulta}')['count'], 12)
+
+    def test_conteo_sin_joins(self):
+        with self.assertNumQueries(2) as consultas:
+            self.client.get('/api/residentes/vehiculos/?ordering=placa')
+        conteo = next(c['sql'] for c in consultas.captured_queries if 'COUNT(' in c['sql'])
+        self.assertNotIn('JOIN', conteo)
@@ -1,3 +1,5 @@
 from django.contrib import admin
+from modulos.trabajadores.models import Trabajador
 
 # Register your models here.
+admin.site.register(Trabajador)
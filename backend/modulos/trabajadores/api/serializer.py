@@ -0,0 +1,36 @@
+from rest_framework import serializers
+from modulos.trabajadores.models import EventoAsistencia, ResumenDiario, Trabajador
+
+
+class TrabajadorSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Trabajador
+        fields = '__all__'
+        read_only_fields = ('fechaCreacion',)
+
+
+class EventoAsistenciaSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = EventoAsistencia
+        fields = '__all__'
+
+
+class EventoEntranteSerializer(serializers.Serializer):
+    """Un evento del lote; el trabajador se resuelve aparte, con una consulta para todo el lote."""
+    id_evento = serializers.CharField(max_length=64)
+    dispositivo = serializers.CharField(max_length=40)
+    trabajador = serializers.IntegerField(min_value=1)
+    tipo = serializers.ChoiceField(choices=EventoAsistencia.tipoEvento)
+    hora = serializers.DateTimeField()
+
+
+class ResumenDiarioSerializer(serializers.ModelSerializer):
+    horas = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ResumenDiario
+        fields = '__all__'
+        columnas_calculadas = {'horas': ['minutos']}
+
+    def get_horas(self, obj):
+        return round(obj.minutos / 60, 2)
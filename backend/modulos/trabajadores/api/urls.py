@@ -0,0 +1,12 @@
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+from modulos.trabajadores.api.views import EventoAsistenciaViewSet, ResumenDiarioViewSet, TrabajadorViewSet
+
+router = DefaultRouter()
+router.register(r'trabajadores', TrabajadorViewSet, basename='trabajadores')
+router.register(r'asistencia', EventoAsistenciaViewSet, basename='asistencia')
+router.register(r'resumenes', ResumenDiarioViewSet, basename='resumenes')
+
+urlpatterns = [
+    path('', include(router.urls)),
+]
@@ -0,0 +1,170 @@
+from datetime import date, datetime, time, timedelta
+
+from django.db.models import Count, ProtectedError, Q, Sum
+from rest_framework import filters, mixins, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from modulos.comun.campos import CamposDinamicosMixin
+from modulos.trabajadores.asistencia import ingerir
+from modulos.trabajadores.models import EventoAsistencia, ResumenDiario, Trabajador
+from .serializer import (
+    EventoAsistenciaSerializer,
+    EventoEntranteSerializer,
+    ResumenDiarioSerializer,
+    TrabajadorSerializer,
+)
+
+MAX_EVENTOS = 5000
+
+
+class StandardResultsSetPagination(PageNumberPagination):
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+def _fecha(parametros, nombre):
+    valor = parametros.get(nombre)
+    if not valor:
+        return None
+    try:
+        return date.fromisoformat(valor)
+    except ValueError:
+        raise ValidationError({nombre: 'Use el formato AAAA-MM-DD.'})
+
+
+def _filtrar_trabajador(queryset, parametros):
+    trabajador = parametros.get('trabajador')
+    if not trabajador:
+        return queryset
+    if not trabajador.isdigit():
+        raise ValidationError({'trabajador': 'Debe ser un id.'})
+    return queryset.filter(trabajador_id=trabajador)
+
+
+class TrabajadorViewSet(CamposDinamicosMixin, viewsets.ModelViewSet):
+    queryset = Trabajador.objects.all().order_by('apPaterno', 'nombre', 'id')
+    serializer_class = TrabajadorSerializer
+    pagination_class = StandardResultsSetPagination
+    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    search_fields = ['ci', 'nombre', 'apPaterno', 'apMaterno', 'empresa']
+    ordering_fields = ['apPaterno', 'nombre', 'cargo']
+
+    def destroy(self, request, *args, **kwargs):
+        # Los eventos y resúmenes protegen al trabajador: con asistencia se da de baja con activo=False
+        try:
+            return super().destroy(request, *args, **kwargs)
+        except ProtectedError:
+            return Response(
+                {'detail': 'El trabajador tiene asistencia registrada; desactívelo con activo=false.'},
+                status=status.HTTP_409_CONFLICT,
+            )
+
+
+class EventoAsistenciaViewSet(CamposDinamicosMixin, mixins.ListModelMixin, viewsets.GenericViewSet):
+    """Eventos en crudo (solo lectura); se cargan por lote/."""
+    serializer_class = EventoAsistenciaSerializer
+    pagination_class = StandardResultsSetPagination
+
+    def get_queryset(self):
+        queryset = EventoAsistencia.objects.order_by('-hora', '-id')
+        parametros = self.request.query_params
+        queryset = _filtrar_trabajador(queryset, parametros)
+        desde, hasta = _fecha(parametros, 'fecha_inicio'), _fecha(parametros, 'fecha_fin')
+        if desde:
+            queryset = queryset.filter(hora__gte=desde)
+        if hasta:
+            queryset = queryset.filter(hora__lt=datetime.combine(hasta + timedelta(days=1), time.min))
+        return queryset
+
+    @action(detail=False, methods=['post'])
+    def lote(self, request):
+        """
+        Recibe {"eventos": [{id_evento, dispositivo, trabajador, tipo, hora}, ...]}.
+        Los eventos ya recibidos (mismo dispositivo e id_evento) se ignoran,
+        así el dispositivo puede reintentar el lote completo. Los inválidos se
+        informan por índice y el resto se guarda.
+        """
+        eventos = request.data.get('eventos') if isinstance(request.data, dict) else request.data
+        if not isinstance(eventos, list) or not eventos:
+            raise ValidationError({'eventos': 'Se espera una lista de eventos.'})
+        if len(eventos) > MAX_EVENTOS:
+            raise ValidationError({'eventos': f'Máximo {MAX_EVENTOS} eventos por lote.'})
+
+        # Un solo serializer para todo el lote: instanciar uno por evento cuesta más que validar
+        validador = EventoEntranteSerializer()
+        errores, validos = {}, []
+        for indice, evento in enumerate(eventos):
+            try:
+                validos.append((indice, validador.run_validation(evento)))
+            except ValidationError as exc:
+                errores[indice] = exc.detail
+
+        activos = set(
+            Trabajador.objects.filter(pk__in={datos['trabajador'] for _, datos in validos}, activo=True)
+            .values_list('pk', flat=True)
+        )
+        registrar = []
+        for indice, datos in validos:
+            if datos['trabajador'] not in activos:
+                errores[indice] = {'trabajador': 'No existe o no está activo.'}
+                continue
+            datos['trabajador_id'] = datos.pop('trabajador')
+            registrar.append(EventoAsistencia(**datos))
+
+        nuevos, duplicados = ingerir(registrar) if registrar else (0, 0)
+        return Response({
+            'recibidos': len(eventos),
+            'nuevos': nuevos,
+            'duplicados': duplicados,
+            'errores': [{'indice': indice, 'errores': error} for indice, error in sorted(errores.items())],
+        }, status=status.HTTP_200_OK)
+
+
+class ResumenDiarioViewSet(CamposDinamicosMixin, mixins.ListModelMixin, viewsets.GenericViewSet):
+    serializer_class = ResumenDiarioSerializer
+    pagination_class = StandardResultsSetPagination
+
+    def get_queryset(self):
+        queryset = ResumenDiario.objects.order_by('-fecha', 'trabajador_id')
+        parametros = self.request.query_params
+        queryset = _filtrar_trabajador(queryset, parametros)
+        desde, hasta = _fecha(parametros, 'fecha_inicio'), _fecha(parametros, 'fecha_fin')
+        if desde:
+            queryset = queryset.filter(fecha__gte=desde)
+        if hasta:
+            queryset = queryset.filter(fecha__lte=hasta)
+        return queryset
+
+    @action(detail=False, methods=['get'])
+    def reporte(self, request):
+        """Horas del mes por trabajador (?mes=AAAA-MM), agregadas sobre los resúmenes diarios."""
+        try:
+            inicio = datetime.strptime(request.query_params.get('mes', ''), '%Y-%m').date()
+        except ValueError:
+            raise ValidationError({'mes': 'Use el formato AAAA-MM.'})
+        fin = date(inicio.year + inicio.month // 12, inicio.month % 12 + 1, 1)
+        filas = (
+            ResumenDiario.objects.filter(fecha__gte=inicio, fecha__lt=fin).order_by()
+            .values('trabajador_id', 'trabajador__nombre', 'trabajador__apPaterno', 'trabajador__cargo')
+            .annotate(minutos=Sum('minutos'), turnos=Sum('turnos'), dias=Count('id'),
+                      dias_abiertos=Count('id', filter=Q(abierto=True)))
+            .order_by('trabajador__apPaterno', 'trabajador__nombre')
+        )
+        return Response({
+            'mes': f'{inicio:%Y-%m}',
+            'trabajadores': [
+                {
+                    'trabajador': fila['trabajador_id'],
+                    'nombre': f"{fila['trabajador__nombre']} {fila['trabajador__apPaterno']}",
+                    'cargo': fila['trabajador__cargo'],
+                    'dias': fila['dias'],
+                    'turnos': fila['turnos'],
+                    'horas': round(fila['minutos'] / 60, 2),
+                    'dias_sin_salida': fila['dias_abiertos'],
+                }
+                for fila in filas
+            ],
+        })
@@ -3,4 +3,10 @@ from django.apps import AppConfig
 
 class TrabajadoresConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'trabajadores'
+    name = 'modulos.trabajadores'
+
+    def ready(self):
+        from modulos.bitacora.auditoria import auditoria
+        from .models import Trabajador
+        # Los eventos y resúmenes son de alto volumen y los escribe el sistema: no se auditan
+        auditoria.registrar(Trabajador)
@@ -0,0 +1,175 @@
+"""
+Ingesta de marcaciones y resúmenes diarios de asistencia.
+
+Los relojes envían lotes de eventos (a veces repetidos: reintentan si no
+reciben respuesta). Cada evento se identifica por (dispositivo, id_evento):
+los repetidos se descartan con una consulta por lote y, si dos reintentos
+llegan a la vez, la restricción única y ON CONFLICT DO NOTHING los frenan.
+
+Después de insertar se recalculan solo los resúmenes afectados (trabajador,
+día) con los eventos de esos días, en una consulta, y se guardan con un
+upsert. Un evento tardío o fuera de orden corrige su día y los de los
+turnos que pueden terminar en él (dias_afectados) sin tocar los demás, y los reportes leen ResumenDiario sin volver a los eventos.
+
+Turnos: cada entrada se empareja con la siguiente salida (hasta
+TRABAJADORES_TURNO_MAXIMO_HORAS después) y el turno cuenta para el día de
+la entrada, aunque termine pasada la medianoche.
+"""
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import EventoAsistencia, ResumenDiario, Trabajador
+
+ENTRADA, SALIDA = 'E', 'S'
+
+FILAS_POR_INSERT = 1000
+
+
+def turno_maximo():
+    return timedelta(hours=getattr(settings, 'TRABAJADORES_TURNO_MAXIMO_HORAS', 16))
+
+
+def dias_afectados(evento):
+    """Días cuyo resumen puede cambiar con el evento."""
+    # Cualquier evento puede cambiar el turno de una entrada de hasta
+    # turno_maximo() antes: una salida lo cierra, y una entrada tardía que
+    # llega antes de esa salida lo deja abierto (cada entrada se empareja
+    # con la siguiente salida)
+    dia = evento.hora.date()
+    primero = (evento.hora - turno_maximo()).date()
+    return [primero + timedelta(days=n) for n in range((dia - primero).days + 1)]
+
+
+def ingerir(eventos):
+    """
+    Inserta los eventos nuevos (instancias sin guardar) y actualiza sus
+    resúmenes. Devuelve (nuevos, duplicados).
+    """
+    unicos = {}
+    for evento in eventos:
+        unicos.setdefault((evento.dispositivo, evento.id_evento), evento)
+    existentes = set(
+        EventoAsistencia.objects.filter(
+            dispositivo__in={d for d, _ in unicos}, id_evento__in={i for _, i in unicos}
+        ).values_list('dispositivo', 'id_evento')
+    )
+    candidatos = [evento for clave, evento in unicos.items() if clave not in existentes]
+    nuevos = []
+    if candidatos:
+        with transaction.atomic():
+            # Un lote por trabajador a la vez: el resumen se recalcula con lo que la
+            # transacción ve, y sin esto dos lotes simultáneos (el cambio de turno)
+            # se pisan el resumen sin ver los eventos del otro. En orden de pk, para
+            # que dos lotes con los mismos trabajadores no se bloqueen en cruz.
+            list(
+                Trabajador.objects.select_for_update(no_key=True)
+                .filter(pk__in={e.trabajador_id for e in candidatos}).order_by('pk').values_list('pk', flat=True)
+            )
+            nuevos = _insertar(candidatos)
+            recalcular({(e.trabajador_id, dia) for e in nuevos for dia in dias_afectados(e)})
+    return len(nuevos), len(eventos) - len(nuevos)
+
+
+def _insertar(eventos):
+    """
+    INSERT ... ON CONFLICT DO NOTHING de los eventos. Devuelve los que se
+    insertaron de verdad: un reintento que llegó a la vez por otro lote se
+    omite y no cuenta como nuevo.
+    """
+    tabla = connection.ops.quote_name(EventoAsistencia._meta.db_table)
+    recibido = timezone.now()
+    insertados = set()
+    with connection.cursor() as cursor:
+        for inicio in range(0, len(eventos), FILAS_POR_INSERT):
+            tramo = eventos[inicio:inicio + FILAS_POR_INSERT]
+            valores = ', '.join(['(%s, %s, %s, %s, %s, %s)'] * len(tramo))
+            cursor.execute(
+                f"""
+                INSERT INTO {tabla} (trabajador_id, tipo, hora, dispositivo, id_evento, recibido)
+                VALUES {valores}
+                ON CONFLICT (dispositivo, id_evento) DO NOTHING
+                RETURNING dispositivo, id_evento
+                """,
+                [
+                    valor for e in tramo
+                    for valor in (e.trabajador_id, e.tipo, e.hora, e.dispositivo, e.id_evento, recibido)
+                ],
+            )
+            insertados.update(cursor.fetchall())
+    return [e for e in eventos if (e.dispositivo, e.id_evento) in insertados]
+
+
+def recalcular(afectados):
+    """Recalcula y guarda los resúmenes de los pares (id de trabajador, día)."""
+    if not afectados:
+        return 0
+    limite = turno_maximo()
+    dias = defaultdict(set)
+    for trabajador, dia in afectados:
+        dias[trabajador].add(dia)
+
+    # Una consulta: los eventos de cada trabajador desde su primer día afectado
+    # hasta el último más un turno (índice trabajador, hora)
+    filtro = Q()
+    for trabajador, fechas in dias.items():
+        filtro |= Q(
+            trabajador_id=trabajador,
+            hora__gte=datetime.combine(min(fechas), time.min),
+            hora__lt=datetime.combine(max(fechas) + timedelta(days=1), time.min) + limite,
+        )
+    eventos = defaultdict(list)
+    for fila in EventoAsistencia.objects.filter(filtro).order_by('hora', 'id').values_list('trabajador_id', 'tipo', 'hora'):
+        eventos[fila[0]].append(fila[1:])
+
+    resumenes = []
+    for trabajador, fechas in dias.items():
+        for dia in fechas:
+            resumen = resumir_dia(trabajador, dia, eventos[trabajador], limite)
+            if resumen is not None:
+                resumenes.append(resumen)
+    ResumenDiario.objects.bulk_create(
+        resumenes,
+        update_conflicts=True,
+        unique_fields=['trabajador', 'fecha'],
+        update_fields=['minutos', 'turnos', 'primera_entrada', 'ultima_salida', 'abierto'],
+    )
+    return len(resumenes)
+
+
+def resumir_dia(trabajador, dia, eventos, limite):
+    """eventos: (tipo, hora) del trabajador ordenados por hora. None si ese día no tuvo entradas."""
+    inicio = datetime.combine(dia, time.min)
+    fin = inicio + timedelta(days=1)
+    minutos, turnos = 0, 0
+    abierta = primera = ultima = None
+    for tipo, hora in eventos:
+        if hora < inicio:
+            continue
+        if hora >= fin:
+            # Después del día solo interesa la salida que cierra un turno abierto
+            if abierta is not None and tipo == SALIDA and hora - abierta <= limite:
+                minutos += int((hora - abierta).total_seconds() // 60)
+                turnos += 1
+                ultima, abierta = hora, None
+            break
+        if tipo == ENTRADA:
+            # Una segunda entrada sin salida se ignora: cuenta la primera
+            if abierta is None:
+                abierta = hora
+                primera = primera or hora
+        elif abierta is not None:
+            minutos += int((hora - abierta).total_seconds() // 60)
+            turnos += 1
+            ultima, abierta = hora, None
+        # Una salida sin entrada ese día cierra un turno del día anterior
+    if primera is None:
+        return None
+    return ResumenDiario(
+        trabajador_id=trabajador, fecha=dia, minutos=minutos, turnos=turnos,
+        primera_entrada=primera, ultima_salida=ultima, abierto=abierta is not None,
+    )
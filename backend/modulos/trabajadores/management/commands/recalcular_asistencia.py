@@ -0,0 +1,27 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from modulos.trabajadores.asistencia import recalcular
+from modulos.trabajadores.models import EventoAsistencia
+
+
+class Command(BaseCommand):
+    help = "Recalcula los resúmenes diarios de asistencia desde los eventos (p. ej. tras cambiar la regla de turnos)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--desde', help="Primer día a recalcular (AAAA-MM-DD). Por defecto, todos.")
+
+    def handle(self, *args, **options):
+        eventos = EventoAsistencia.objects.all()
+        if options['desde']:
+            try:
+                eventos = eventos.filter(hora__gte=date.fromisoformat(options['desde']))
+            except ValueError:
+                raise CommandError("--desde debe tener el formato AAAA-MM-DD")
+        pares = set(eventos.order_by().values_list('trabajador_id', 'hora__date').distinct())
+        total = 0
+        # Por tandas, para que cada consulta de eventos quede acotada
+        pares = sorted(pares, key=lambda par: (par[1], par[0]))
+        for inicio in range(0, len(pares), 2000):
+            total += recalcular(set(pares[inicio:inicio + 2000]))
+        self.stdout.write(self.style.SUCCESS(f"{total} resúmenes recalculados"))
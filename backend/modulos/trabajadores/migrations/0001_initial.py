@@ -0,0 +1,66 @@
+# Generated by Django 5.2.6 on 2026-10-18 06:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Trabajador',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('ci', models.CharField(max_length=12, unique=True)),
+                ('nombre', models.CharField(max_length=40)),
+                ('apPaterno', models.CharField(max_length=35)),
+                ('apMaterno', models.CharField(blank=True, max_length=35)),
+                ('cargo', models.CharField(choices=[('G', 'Guardia'), ('L', 'Limpieza'), ('M', 'Mantenimiento')], max_length=1)),
+                ('empresa', models.CharField(blank=True, help_text='Contratista, si no es personal propio.', max_length=60)),
+                ('activo', models.BooleanField(default=True)),
+                ('fechaCreacion', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Trabajador',
+                'verbose_name_plural': 'Trabajadores',
+            },
+        ),
+        migrations.CreateModel(
+            name='ResumenDiario',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('fecha', models.DateField()),
+                ('minutos', models.PositiveIntegerField(default=0)),
+                ('turnos', models.PositiveSmallIntegerField(default=0, help_text='Pares entrada-salida completos.')),
+                ('primera_entrada', models.DateTimeField(blank=True, null=True)),
+                ('ultima_salida', models.DateTimeField(blank=True, null=True)),
+                ('abierto', models.BooleanField(default=False, help_text='Hay una entrada todavía sin salida.')),
+                ('trabajador', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='resumenes', to='trabajadores.trabajador')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['fecha', 'trabajador'], name='resumen_fecha_trabajador_idx')],
+                'constraints': [models.UniqueConstraint(fields=('trabajador', 'fecha'), name='resumen_trabajador_fecha_unico')],
+            },
+        ),
+        migrations.CreateModel(
+            name='EventoAsistencia',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('tipo', models.CharField(choices=[('E', 'Entrada'), ('S', 'Salida')], max_length=1)),
+                ('hora', models.DateTimeField()),
+                ('dispositivo', models.CharField(max_length=40)),
+                ('id_evento', models.CharField(max_length=64)),
+                ('recibido', models.DateTimeField(auto_now_add=True)),
+                ('trabajador', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='eventos', to='trabajadores.trabajador')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['trabajador', 'hora'], name='evento_trabajador_hora_idx')],
+                'constraints': [models.UniqueConstraint(fields=('dispositivo', 'id_evento'), name='evento_dispositivo_id_unico')],
+            },
+        ),
+    ]
@@ -1,3 +1,68 @@
 from django.db import models
 
-# Create your models here.
+
+class Trabajador(models.Model):
+    id = models.AutoField(primary_key=True)
+    ci = models.CharField(max_length=12, unique=True)
+    nombre = models.CharField(max_length=40)
+    apPaterno = models.CharField(max_length=35)
+    apMaterno = models.CharField(max_length=35, blank=True)
+    tipoCargo = [('G', 'Guardia'), ('L', 'Limpieza'), ('M', 'Mantenimiento')]
+    cargo = models.CharField(max_length=1, choices=tipoCargo)
+    empresa = models.CharField(max_length=60, blank=True, help_text="Contratista, si no es personal propio.")
+    activo = models.BooleanField(default=True)
+    fechaCreacion = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Trabajador"
+        verbose_name_plural = "Trabajadores"
+
+    def __str__(self):
+        return f"{self.nombre} {self.apPaterno} ({self.get_cargo_display()})"
+
+
+class EventoAsistencia(models.Model):
+    """Marcación de un reloj de asistencia. Solo se insertan, nunca se editan."""
+    id = models.BigAutoField(primary_key=True)
+    trabajador = models.ForeignKey(Trabajador, on_delete=models.PROTECT, related_name='eventos')
+    tipoEvento = [('E', 'Entrada'), ('S', 'Salida')]
+    tipo = models.CharField(max_length=1, choices=tipoEvento)
+    # Hora marcada en el dispositivo (puede llegar tarde o fuera de orden)
+    hora = models.DateTimeField()
+    dispositivo = models.CharField(max_length=40)
+    # Id que asigna el dispositivo: un reintento trae el mismo y se descarta
+    id_evento = models.CharField(max_length=64)
+    recibido = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['dispositivo', 'id_evento'], name='evento_dispositivo_id_unico'),
+        ]
+        indexes = [
+            # Recalcular el resumen de un trabajador lee sus eventos de uno o dos días
+            models.Index(fields=['trabajador', 'hora'], name='evento_trabajador_hora_idx'),
+        ]
+
+
+class ResumenDiario(models.Model):
+    """
+    Horas de un trabajador en un día (el de la entrada de cada turno). Lo
+    mantiene asistencia.py a medida que llegan eventos; los reportes leen
+    solo esta tabla.
+    """
+    id = models.BigAutoField(primary_key=True)
+    trabajador = models.ForeignKey(Trabajador, on_delete=models.PROTECT, related_name='resumenes')
+    fecha = models.DateField()
+    minutos = models.PositiveIntegerField(default=0)
+    turnos = models.PositiveSmallIntegerField(default=0, help_text="Pares entrada-salida completos.")
+    primera_entrada = models.DateTimeField(null=True, blank=True)
+    ultima_salida = models.DateTimeField(null=True, blank=True)
+    abierto = models.BooleanField(default=False, help_text="Hay una entrada todavía sin salida.")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['trabajador', 'fecha'], name='resumen_trabajador_fecha_unico'),
+        ]
+        indexes = [
+            models.Index(fields=['fecha', 'trabajador'], name='resumen_fecha_trabajador_idx'),
+        ]
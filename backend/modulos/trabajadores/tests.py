@@ -1,3 +1,188 @@
-from django.test import TestCase
+import random
+import threading
+from io import StringIO
+from unittest import mock
+from datetime import datetime, timedelta
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from rest_framework.test import APIClient
+
+from . import asistencia
+from .asistencia import ENTRADA, SALIDA, ingerir
+from .models import EventoAsistencia, ResumenDiario, Trabajador
+
+CAMPOS_RESUMEN = ('trabajador_id', 'fecha', 'minutos', 'turnos', 'primera_entrada', 'ultima_salida', 'abierto')
+
+
+class AsistenciaMixin:
+    @classmethod
+    def setUpTestData(cls):
+        cls.trabajadores = [
+            Trabajador.objects.create(ci=f'100{i}', nombre=f'Trabajador {i}', apPaterno='Rojas', cargo='G')
+            for i in range(3)
+        ]
+
+    def evento(self, trabajador, tipo, hora, numero):
+        return EventoAsistencia(
+            trabajador=trabajador, tipo=tipo, hora=hora, dispositivo='porteria', id_evento=str(numero)
+        )
+
+    def resumenes(self):
+        return sorted(ResumenDiario.objects.values_list(*CAMPOS_RESUMEN))
+
+
+class IngestaOrdenTests(AsistenciaMixin, TestCase):
+    """Los resúmenes incrementales deben ser los mismos que recalcular todo, en cualquier orden de llegada."""
+
+    def eventos_aleatorios(self, semilla):
+        azar = random.Random(semilla)
+        eventos, numero = [], 0
+        inicio = datetime(2024, 3, 1, 6)
+        for trabajador in self.trabajadores:
+            hora = inicio
+            for _ in range(40):
+                # Turnos de día y de noche, con entradas o salidas sueltas de vez en cuando
+                hora += timedelta(minutes=azar.randrange(30, 20 * 60))
+                tipo = ENTRADA if azar.random() < 0.5 else SALIDA
+                numero += 1
+                eventos.append(self.evento(trabajador, tipo, hora, numero))
+        return eventos
+
+    def assertIgualAlRecalculo(self):
+        incremental = self.resumenes()
+        ResumenDiario.objects.all().delete()
+        call_command('recalcular_asistencia', stdout=StringIO())
+        self.assertEqual(incremental, self.resumenes())
+
+    def test_orden_aleatorio(self):
+        for semilla in range(5):
+            with self.subTest(semilla=semilla):
+                EventoAsistencia.objects.all().delete()
+                ResumenDiario.objects.all().delete()
+                eventos = self.eventos_aleatorios(semilla)
+                random.Random(semilla).shuffle(eventos)
+                for inicio in range(0, len(eventos), 7):
+                    ingerir(eventos[inicio:inicio + 7])
+                self.assertIgualAlRecalculo()
+
+    def test_entrada_tardia_reabre_el_turno_del_dia_anterior(self):
+        trabajador = self.trabajadores[0]
+        ingerir([
+            self.evento(trabajador, ENTRADA, datetime(2024, 3, 1, 22), 1),
+            self.evento(trabajador, SALIDA, datetime(2024, 3, 2, 6), 2),
+        ])
+        anterior = ResumenDiario.objects.get(trabajador=trabajador, fecha='2024-03-01')
+        self.assertEqual((anterior.turnos, anterior.abierto), (1, False))
+
+        # Llega tarde una entrada entre las dos: la salida cierra esa, no la de la noche anterior
+        ingerir([self.evento(trabajador, ENTRADA, datetime(2024, 3, 2, 1), 3)])
+        anterior.refresh_from_db()
+        self.assertEqual((anterior.turnos, anterior.abierto), (0, True))
+        self.assertIgualAlRecalculo()
+
+
+# Las entradas de bitácora se escriben en el hilo del test, sin el hilo de fondo
+@override_settings(BITACORA_ESCRITOR={'MODO': 'sincrono'})
+class IngestaConcurrenteTests(AsistenciaMixin, TransactionTestCase):
+    """
+    Dos lotes del mismo trabajador a la vez. El primero (A) recalcula y
+    queda con la transacción abierta; el segundo (B) entra en ese momento.
+    Sin serializar por trabajador, B recalcula sin ver los eventos de A y
+    pisa su resumen al confirmar.
+    """
+
+    def setUp(self):
+        self.setUpTestData()
+
+    def en_paralelo(self, lote_a, lote_b):
+        recalcular = asistencia.recalcular
+        a_recalculo, b_termino = threading.Event(), threading.Event()
+        resultados = {}
+
+        def recalcular_y_esperar(afectados):
+            total = recalcular(afectados)
+            if threading.current_thread().name == 'A':
+                a_recalculo.set()
+                # B no puede terminar mientras A no confirme: se espera un poco y se sigue
+                b_termino.wait(0.5)
+            return total
+
+        def correr(nombre, lote):
+            try:
+                if nombre == 'B':
+                    a_recalculo.wait(5)
+                resultados[nombre] = ingerir(lote)
+                if nombre == 'B':
+                    b_termino.set()
+            finally:
+                connection.close()
+
+        with mock.patch.object(asistencia, 'recalcular', recalcular_y_esperar):
+            hilos = [threading.Thread(target=correr, args=args, name=args[0]) for args in (('A', lote_a), ('B', lote_b))]
+            for hilo in hilos:
+                hilo.start()
+            for hilo in hilos:
+                hilo.join(10)
+        return resultados
+
+    def test_lotes_simultaneos_no_pierden_eventos(self):
+        trabajador = self.trabajadores[0]
+        resultados = self.en_paralelo(
+            [self.evento(trabajador, ENTRADA, datetime(2024, 3, 1, 8), 1),
+             self.evento(trabajador, SALIDA, datetime(2024, 3, 1, 12), 2)],
+            [self.evento(trabajador, ENTRADA, datetime(2024, 3, 1, 13), 3),
+             self.evento(trabajador, SALIDA, datetime(2024, 3, 1, 17), 4)],
+        )
+        self.assertEqual(resultados, {'A': (2, 0), 'B': (2, 0)})
+        resumen = ResumenDiario.objects.get(trabajador=trabajador, fecha='2024-03-01')
+        self.assertEqual((resumen.turnos, resumen.minutos), (2, 480))
+
+    def test_reintento_simultaneo_no_cuenta_como_nuevo(self):
+        trabajador = self.trabajadores[0]
+        lote = lambda: [  # noqa: E731
+            self.evento(trabajador, ENTRADA, datetime(2024, 3, 1, 8), 1),
+            self.evento(trabajador, SALIDA, datetime(2024, 3, 1, 12), 2),
+        ]
+        resultados = self.en_paralelo(lote(), lote())
+        # B no ve los eventos de A al buscar repetidos (A no confirmó) pero el INSERT los omite
+        self.assertEqual(resultados, {'A': (2, 0), 'B': (0, 2)})
+        self.assertEqual(EventoAsistencia.objects.count(), 2)
+
+
+class AsistenciaApiTests(AsistenciaMixin, TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('rrhh'))
+
+    def test_filtro_por_trabajador(self):
+        trabajador = self.trabajadores[0]
+        ingerir([
+            self.evento(trabajador, ENTRADA, datetime(2024, 3, 1, 8), 1),
+            self.evento(self.trabajadores[1], ENTRADA, datetime(2024, 3, 1, 8), 2),
+        ])
+        for ruta in ('asistencia', 'resumenes'):
+            with self.subTest(ruta=ruta):
+                respuesta = self.client.get(f'/api/trabajadores/{ruta}/?trabajador={trabajador.id}')
+                self.assertEqual(respuesta.status_code, 200)
+                self.assertEqual({fila['trabajador'] for fila in respuesta.json()['results']}, {trabajador.id})
+
+    def test_trabajador_no_numerico(self):
+        for ruta in ('asistencia', 'resumenes'):
+            with self.subTest(ruta=ruta):
+                respuesta = self.client.get(f'/api/trabajadores/{ruta}/?trabajador=abc')
+                self.assertEqual(respuesta.status_code, 400)
+                self.assertIn('trabajador', respuesta.json())
+
+    def test_borrar_trabajador(self):
+        sin_asistencia, con_asistencia = self.trabajadores[1], self.trabajadores[0]
+        ingerir([self.evento(con_asistencia, ENTRADA, datetime(2024, 3, 1, 8), 1)])
+
+        respuesta = self.client.delete(f'/api/trabajadores/trabajadores/{con_asistencia.id}/')
+        self.assertEqual(respuesta.status_code, 409)
+        self.assertTrue(Trabajador.objects.filter(pk=con_asistencia.pk).exists())
+
+        respuesta = self.client.delete(f'/api/trabajadores/trabajadores/{sin_asistencia.id}/')
+        self.assertEqual(respuesta.status_code, 204)
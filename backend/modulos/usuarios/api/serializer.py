@@ -26,6 +26,16 @@ class UserSerializer(serializers.ModelSerializer):
                   'last_name', 'is_active', 'groups', 'phones']
 
 
+class UserCompactoSerializer(serializers.ModelSerializer):
+    """Listado liviano para selectores: sin teléfonos ni nombres de grupo"""
+    nombre_completo = serializers.CharField(source='get_full_name', read_only=True)
+    groups = serializers.PrimaryKeyRelatedField(many=True, read_only=True)
+
+    class Meta:
+        model = User
+        fields = ['id', 'username', 'nombre_completo', 'groups']
+
+
 class UserCreateUpdateSerializer(serializers.ModelSerializer):
     """Serializer separado para creación/actualización de usuarios"""
     password = serializers.CharField(write_only=True, required=False)
@@ -1,25 +1,64 @@
-from rest_framework import viewsets, permissions
+from rest_framework import viewsets, permissions, filters
+from rest_framework.pagination import PageNumberPagination
 from django.contrib.auth.models import User, Group
+from django.db.models import Prefetch
+from modulos.comun.asincrono import LecturaAsincronaMixin
+from modulos.comun.campos import CamposDinamicosMixin
 from modulos.usuarios.models import Phone
-from .serializer import UserSerializer, UserCreateUpdateSerializer, PhoneSerializer, GroupSerializer
+from .serializer import (
+    UserSerializer,
+    UserCompactoSerializer,
+    UserCreateUpdateSerializer,
+    PhoneSerializer,
+    GroupSerializer
+)
 
-class UserViewSet(viewsets.ModelViewSet):
-    queryset = User.objects.all().order_by('id')
+class StandardResultsSetPagination(PageNumberPagination):
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+class UserViewSet(LecturaAsincronaMixin, CamposDinamicosMixin, viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = StandardResultsSetPagination
+    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    search_fields = ['username', 'first_name', 'last_name', 'email']
+    ordering_fields = ['id', 'username', 'last_name']
+    ordering = ['id']
+
+    def es_compacto(self):
+        # ?compacto=1 para selectores y autocompletado: id, username, nombre y grupos
+        return self.action == 'list' and self.request.query_params.get('compacto') in ('1', 'true')
+
+    def get_queryset(self):
+        queryset = User.objects.all()
+        if self.es_compacto():
+            return queryset.only('id', 'username', 'first_name', 'last_name').prefetch_related(
+                Prefetch('groups', queryset=Group.objects.only('id'))
+            )
+        if self.action in ['list', 'retrieve']:
+            # Teléfonos y grupos en dos consultas fijas, no dos por usuario
+            queryset = queryset.prefetch_related(
+                Prefetch('phone_set', queryset=Phone.objects.order_by('id')),
+                Prefetch('groups', queryset=Group.objects.only('id', 'name')),
+            )
+        return queryset
 
     def get_serializer_class(self):
         if self.action in ['create', 'update', 'partial_update']:
             return UserCreateUpdateSerializer
+        if self.es_compacto():
+            return UserCompactoSerializer
         return UserSerializer
 
 
-class PhoneViewSet(viewsets.ModelViewSet):
+class PhoneViewSet(CamposDinamicosMixin, viewsets.ModelViewSet):
     queryset = Phone.objects.all().order_by('id')
     serializer_class = PhoneSerializer
     permission_classes = [permissions.IsAuthenticated]
 
 
-class GroupViewSet(viewsets.ModelViewSet):
+class GroupViewSet(CamposDinamicosMixin, viewsets.ModelViewSet):
     queryset = Group.objects.all().order_by('id')
     serializer_class = GroupSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -4,4 +4,16 @@ class UsuariosConfig(AppConfig):
     name = 'modulos.usuarios'
     verbose_name = 'Gestión de Usuarios'
     def ready(self):
+        import modulos.comun.checks
         import modulos.usuarios.signals
+        from django.contrib.auth.models import Group, User
+        from modulos.bitacora.auditoria import auditoria
+        from .models import Phone
+        # last_login cambia en cada inicio de sesión: no se audita
+        auditoria.registrar(
+            User,
+            campos=['username', 'email', 'first_name', 'last_name', 'is_active', 'is_staff', 'is_superuser', 'password'],
+            ocultar=['password'],
+        )
+        auditoria.registrar(Group)
+        auditoria.registrar(Phone)
@@ -0,0 +1,69 @@
+"""
+Autenticación JWT con caché del usuario y sus permisos.
+
+JWTAuthentication valida la firma y carga el User en cada petición; luego
+has_perm() y user.groups consultan auth_group/auth_permission. Aquí cada
+token ya validado se guarda en memoria junto con su usuario, con los grupos
+y permisos precargados, hasta que vence el token, pasa el TTL o una señal
+invalida al usuario (ver signals.py). En estado estable una petición
+autenticada no hace consultas de autenticación.
+
+La caché es por proceso: con varios workers, un cambio hecho en otro proceso
+se ve como mucho tras USUARIOS_CACHE_AUTENTICACION['TTL'] segundos.
+"""
+import copy
+import time
+
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.db.models import prefetch_related_objects
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from modulos.comun.cache import CacheTTL
+
+_config = getattr(settings, 'USUARIOS_CACHE_AUTENTICACION', {})
+tokens = CacheTTL(maximo=_config.get('MAXIMO', 2048), ttl=_config.get('TTL', 60))
+# Cambia con cada invalidación; evita guardar un usuario leído antes de una
+_generacion = [0]
+
+
+def precargar_permisos(usuario):
+    """Deja grupos y permisos en las cachés del propio objeto (2-3 consultas, una sola vez)."""
+    prefetch_related_objects([usuario], 'groups')
+    # Llena _user_perm_cache, _group_perm_cache y _perm_cache que usa has_perm()
+    ModelBackend().get_all_permissions(usuario)
+    return usuario
+
+
+def invalidar_usuario(*ids_usuario):
+    ids = set(ids_usuario)
+    _generacion[0] += 1
+    tokens.descartar(lambda clave, valor: valor[1].pk in ids)
+
+
+def invalidar_todos():
+    _generacion[0] += 1
+    tokens.limpiar()
+
+
+class JWTAuthenticationCacheada(JWTAuthentication):
+    def authenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        guardado = tokens.obtener(raw_token)
+        if guardado is None:
+            generacion = _generacion[0]
+            token = self.get_validated_token(raw_token)
+            usuario = precargar_permisos(self.get_user(token))
+            if generacion == _generacion[0]:
+                # No se guarda más allá del vencimiento del token
+                tokens.guardar(raw_token, (token, usuario), ttl=token.get('exp', 0) - time.time())
+        else:
+            token, usuario = guardado
+        # Copia superficial: cada petición puede asignar atributos sin afectar a las demás
+        return copy.copy(usuario), token
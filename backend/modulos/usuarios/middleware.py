@@ -1,35 +1,57 @@
-import threading
-from django.contrib.auth.models import AnonymousUser # Importa AnonymousUser para comparar
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+# Un valor por petición: contextvars se propaga a las tareas async y a los
+# hilos de sync_to_async, a diferencia de threading.local
+_peticion = ContextVar('peticion', default=None)
 
-_user_data = threading.local()
 
 class RequestMiddleware:
-    """Middleware para guardar el usuario y la IP del request en una variable local de thread."""
+    """Middleware que deja la petición en curso disponible para señales y bitácora (WSGI o ASGI)."""
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
 
     def __call__(self, request):
-        _user_data.user = getattr(request, "user", None)
-        _user_data.ip = self.get_client_ip(request)
-        # *** AQUÍ PUEDES PONER UN PRINT PARA VERIFICAR EL USUARIO ***
-        if _user_data.user and _user_data.user.is_authenticated:
-            print(f"DEBUG MIDDLEWARE: Usuario autenticado en RequestMiddleware: {_user_data.user.username}")
-        elif _user_data.user and isinstance(_user_data.user, AnonymousUser):
-            print("DEBUG MIDDLEWARE: Usuario es AnonymousUser en RequestMiddleware")
-        else:
-            print("DEBUG MIDDLEWARE: No se encontró usuario en RequestMiddleware (o es None)")
-        # ************************************************************
-        response = self.get_response(request)
-        return response
-
-    def get_client_ip(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = _peticion.set(request)
+        try:
+            return self.get_response(request)
+        finally:
+            _peticion.reset(token)
+
+    async def __acall__(self, request):
+        token = _peticion.set(request)
+        try:
+            return await self.get_response(request)
+        finally:
+            _peticion.reset(token)
+
+    @staticmethod
+    def get_client_ip(request):
         x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
         if x_forwarded_for:
             return x_forwarded_for.split(',')[0]
         return request.META.get('REMOTE_ADDR')
 
+
+def get_current_request():
+    return _peticion.get()
+
+
 def get_current_user():
-    return getattr(_user_data, 'user', None)
+    # Se lee al momento de usarlo: DRF autentica (JWT) después de este middleware
+    # y deja el usuario en la HttpRequest original
+    request = _peticion.get()
+    return getattr(request, 'user', None) if request is not None else None
+
 
 def get_current_ip():
-    return getattr(_user_data, 'ip', None)
+    request = _peticion.get()
+    return RequestMiddleware.get_client_ip(request) if request is not None else None
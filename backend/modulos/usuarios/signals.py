@@ -1,59 +1,37 @@
-from django.db.models.signals import post_save, post_delete
+from django.contrib.auth.models import Group, User
+from django.db.models.signals import post_save, post_delete, m2m_changed
 from django.dispatch import receiver
-from django.utils import timezone
-from modulos.bitacora.models import Bitacora
-from .middleware import get_current_user, get_current_ip
+from .autenticacion import invalidar_todos, invalidar_usuario
 
-from django.contrib.auth.models import AnonymousUser # Importa AnonymousUser para comparar
+# Caché de autenticación (ver autenticacion.py)
 
-@receiver(post_save)
-def registrar_accion_guardar(sender, instance, created, **kwargs):
-    if sender.__name__ == 'Bitacora':  # evitar bucle infinito
-        return
-    
-    user = get_current_user()
-    ip = get_current_ip()
-    # *** AQUÍ PUEDES PONER UN PRINT PARA VERIFICAR EL USUARIO ***
-    if user and user.is_authenticated:
-        print(f"DEBUG SIGNAL (POST_SAVE): Usuario autenticado: {user.username}")
-    elif user and isinstance(user, AnonymousUser):
-        print("DEBUG SIGNAL (POST_SAVE): Usuario es AnonymousUser")
-    else:
-        print("DEBUG SIGNAL (POST_SAVE): No se encontró usuario (o es None)")
-    # ************************************************************
-    accion = "Creó" if created else "Modificó"
-    accion_texto = f"{accion} {sender.__name__} con ID {instance.id}"
-    
-    Bitacora.objects.create(        
-        accion_realizada=accion_texto,
-        hora_fecha=timezone.now(),
-        id_accion=instance.id,
-        ip_origen=ip,
-        usuario=user
-    )
-
-@receiver(post_delete)
-def registrar_accion_eliminar(sender, instance, **kwargs):
-    if sender.__name__ == 'Bitacora':
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def usuario_modificado(sender, instance, **kwargs):
+    invalidar_usuario(instance.pk)
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def grupo_modificado(sender, instance, **kwargs):
+    invalidar_todos()
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=User.user_permissions.through)
+def permisos_de_usuario_modificados(sender, instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith('post_'):
         return
-    
-    user = get_current_user()
-    # *** AQUÍ PUEDES PONER UN PRINT PARA VERIFICAR EL USUARIO ***
-    if user and user.is_authenticated:
-        print(f"DEBUG SIGNAL (POST_SAVE): Usuario autenticado: {user.username}")
-    elif user and isinstance(user, AnonymousUser):
-        print("DEBUG SIGNAL (POST_SAVE): Usuario es AnonymousUser")
+    if not reverse:
+        invalidar_usuario(instance.pk)
+    elif pk_set:
+        invalidar_usuario(*pk_set)
     else:
-        print("DEBUG SIGNAL (POST_SAVE): No se encontró usuario (o es None)")
-    # ************************************************************
-    ip = get_current_ip()
-    
-    accion_texto = f"Eliminó {sender.__name__} con ID {instance.id}"
-    
-    Bitacora.objects.create(        
-        accion_realizada=accion_texto,
-        hora_fecha=timezone.now(),
-        id_accion=instance.id,
-        ip_origen=ip,
-        usuario=user
-    )
+        # group.user_set.clear(): no sabemos qué usuarios tenía
+        invalidar_todos()
+
+
+@receiver(m2m_changed, sender=Group.permissions.through)
+def permisos_de_grupo_modificados(sender, action, **kwargs):
+    if action.startswith('post_'):
+        invalidar_todos()
@@ -1,3 +1,169 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser, Group, Permission, User
+from django.core.cache import cache
+from django.db import transaction
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.utils.functional import SimpleLazyObject
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken
+
+from modulos.comun import checks
+from modulos.comun.replicas import RouterReplicas, leer_de_primaria
+from .autenticacion import JWTAuthenticationCacheada, invalidar_todos
+from .middleware import _peticion
+
+CACHE_LOCAL = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'pruebas'}}
+
+
+# TransactionTestCase: TestCase corre todo dentro de un atomic y el router
+# manda a la primaria las lecturas dentro de una transacción
+class RouterReplicasTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.router = RouterReplicas()
+        self.factory = RequestFactory()
+        self.usuario = User(pk=7, username='lector')
+        # La réplica solo tiene que figurar en DATABASES: el router no abre conexión
+        replica = mock.patch.dict(settings.DATABASES, {'replica': settings.DATABASES['default']})
+        replica.start()
+        self.addCleanup(replica.stop)
+
+    def peticion(self, metodo='get', ruta='/api/propiedades/', usuario=None):
+        request = getattr(self.factory, metodo)(ruta)
+        request.user = self.usuario if usuario is None else usuario
+        token = _peticion.set(request)
+        self.addCleanup(_peticion.reset, token)
+        return request
+
+    def lectura(self):
+        return self.router.db_for_read(User)
+
+    def test_get_autenticado_va_a_la_replica(self):
+        self.peticion()
+        self.assertEqual(self.lectura(), 'replica')
+
+    def test_escritura_fija_al_usuario_a_la_primaria(self):
+        self.peticion('post')
+        self.assertEqual(self.router.db_for_write(User), 'default')
+        self.assertIsNone(self.lectura())
+
+        # La siguiente petición del mismo usuario sigue en la primaria...
+        self.peticion()
+        self.assertIsNone(self.lectura())
+        # ...y la de otro usuario no
+        self.peticion(usuario=User(pk=8, username='otro'))
+        self.assertEqual(self.lectura(), 'replica')
+
+    def test_fijacion_vence(self):
+        self.peticion('post')
+        self.router.db_for_write(User)
+        cache.clear()
+        self.peticion()
+        self.assertEqual(self.lectura(), 'replica')
+
+    def test_dentro_de_una_transaccion_lee_de_la_primaria(self):
+        self.peticion()
+        with transaction.atomic():
+            self.assertIsNone(self.lectura())
+        self.assertEqual(self.lectura(), 'replica')
+
+    def test_leer_de_primaria(self):
+        self.peticion()
+        with leer_de_primaria():
+            self.assertIsNone(self.lectura())
+
+    def test_sin_autenticar_lee_de_la_primaria(self):
+        self.peticion(usuario=AnonymousUser())
+        self.assertIsNone(self.lectura())
+        # El usuario perezoso de la sesión todavía no pasó por la autenticación de DRF
+        self.peticion(usuario=SimpleLazyObject(lambda: self.usuario))
+        self.assertIsNone(self.lectura())
+
+    def test_fuera_de_la_api_o_sin_peticion_lee_de_la_primaria(self):
+        self.peticion(ruta='/admin/')
+        self.assertIsNone(self.lectura())
+        self.peticion('post')
+        self.assertIsNone(self.lectura())
+        _peticion.set(None)
+        self.assertIsNone(self.lectura())
+
+    def test_sin_replica_configurada_no_hace_nada(self):
+        del settings.DATABASES['replica']
+        self.peticion()
+        self.assertIsNone(self.lectura())
+
+    @override_settings(CACHES=CACHE_LOCAL)
+    def test_check_exige_cache_compartida(self):
+        self.assertEqual([e.id for e in checks.fijacion_compartida(None)], ['comun.E001'])
+        with mock.patch.object(checks, '_cache_local', return_value=False):
+            self.assertEqual(checks.fijacion_compartida(None), [])
+        del settings.DATABASES['replica']
+        self.assertEqual(checks.fijacion_compartida(None), [])
+
+
+class AutenticacionCacheadaTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.permiso = Permission.objects.get(codename='view_propiedad')
+        cls.grupo = Group.objects.create(name='Guardias')
+        cls.usuario = User.objects.create_user('guardia', password='clave-1')
+        cls.usuario.groups.add(cls.grupo)
+
+    def setUp(self):
+        invalidar_todos()
+        self.factory = RequestFactory()
+        self.token = str(AccessToken.for_user(self.usuario))
+
+    def autenticar(self):
+        request = self.factory.get('/api/propiedades/', HTTP_AUTHORIZATION=f'Bearer {self.token}')
+        usuario, _ = JWTAuthenticationCacheada().authenticate(request)
+        return usuario
+
+    def puede_ver(self):
+        return self.autenticar().has_perm('propiedades.view_propiedad')
+
+    def test_estado_estable_sin_consultas(self):
+        self.grupo.permissions.add(self.permiso)
+        self.autenticar()
+        with self.assertNumQueries(0):
+            usuario = self.autenticar()
+            self.assertTrue(usuario.has_perm('propiedades.view_propiedad'))
+            self.assertEqual([g.name for g in usuario.groups.all()], ['Guardias'])
+
+    def test_cada_peticion_recibe_su_copia(self):
+        self.autenticar().atributo = 'x'
+        self.assertFalse(hasattr(self.autenticar(), 'atributo'))
+
+    def test_usuario_desactivado(self):
+        self.autenticar()
+        self.usuario.is_active = False
+        self.usuario.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.autenticar()
+
+    def test_cambio_de_clave(self):
+        self.autenticar()
+        self.usuario.set_password('clave-2')
+        self.usuario.save()
+        self.assertTrue(self.autenticar().check_password('clave-2'))
+
+    def test_quitar_grupo_al_usuario(self):
+        self.grupo.permissions.add(self.permiso)
+        self.assertTrue(self.puede_ver())
+        self.usuario.groups.remove(self.grupo)
+        self.assertFalse(self.puede_ver())
+
+    def test_vaciar_usuarios_del_grupo(self):
+        self.grupo.permissions.add(self.permiso)
+        self.assertTrue(self.puede_ver())
+        self.grupo.user_set.clear()
+        self.assertFalse(self.puede_ver())
+
+    def test_permisos_del_grupo(self):
+        self.assertFalse(self.puede_ver())
+        self.grupo.permissions.add(self.permiso)
+        self.assertTrue(self.puede_ver())
+        self.grupo.permissions.remove(self.permiso)
+        self.assertFalse(self.puede_ver())